@@ -1,14 +1,388 @@
 import streamlit as st
 import pandas as pd
-from datetime import datetime
 import io
 
 from styles import set_page, inject_css
+from processing.cache import ResultCache, content_key
 from processing.customers import process_customer_data
 from processing.companies import process_company_data
+from processing.ingest import prepare_quotations
+from processing.indexes import ClientIndex, NavigationIndex, SortIndex
+from processing.profiling import Profiler, profiling_enabled
+from processing.schema import read_quotations
+from processing.search import SearchIndex
+from processing.services import SERVICE_COLUMNS, service_metric_columns
+from processing.snapshots import DEFAULT_SNAPSHOT_DIR, SnapshotStore, dataset_key
 from ui.metrics import display_summary_metrics
 from ui.visualizations import create_visualizations
 from ui.customer_detail import display_individual_customer
+from ui.company_detail import display_company_overview
+from ui.exports import export_download_button, export_format_selector
+from ui.explorer import EXPLORER_SORT_COLUMNS, page_bounds, style_page
+from ui.sections import section, section_timings
+from ui.session_store import clear_session_artifacts, display_session_memory, get_session_artifacts
+
+
+QUICK_SEARCH_RESULTS = 25
+
+
+@st.cache_resource
+def get_result_cache():
+    # Shared across sessions and reruns; bounded by CRA_CACHE_MAX_MB, spills to CRA_CACHE_DIR if set
+    return ResultCache()
+
+
+@st.cache_resource
+def get_snapshot_store():
+    # Columnar snapshots of previous uploads, only when CRA_SNAPSHOT_DIR is set
+    return SnapshotStore(DEFAULT_SNAPSHOT_DIR) if DEFAULT_SNAPSHOT_DIR else None
+
+
+def load_analytics(uploaded_file):
+    """
+    Read and process an upload, reusing cached results for identical file contents.
+    Falls back to on-disk snapshots of a previous ingest before parsing the CSV.
+    Returns a dict with 'raw', 'customers', 'error', 'companies', 'company_error', the per-client row 'index',
+    the explorer 'sort_index' over the customers, the customer 'search' index, the Country -> Company -> Client
+    'navigation' index, the stage 'profile' of the run that computed it and the dataset
+    'fingerprint' (its cache key).
+    """
+    file_bytes = uploaded_file.getvalue()
+    fingerprint = content_key(file_bytes)
+
+    def compute():
+        profiler = Profiler('upload')
+        store = get_snapshot_store()
+        key = dataset_key(file_bytes)
+        if store is not None:
+            with profiler.stage('snapshot_load'):
+                snapshot = store.load(key, ['raw', 'customers', 'companies'])
+            if snapshot is not None:
+                index = profiler.call('client_index', ClientIndex, snapshot['raw'])
+                sort_index = profiler.call('sort_index', SortIndex, snapshot['customers'], EXPLORER_SORT_COLUMNS)
+                search = profiler.call('search_index', SearchIndex, snapshot['raw'])
+                navigation = profiler.call('navigation_index', NavigationIndex, snapshot['companies'],
+                                           snapshot['customers'])
+                return {'raw': snapshot['raw'], 'customers': snapshot['customers'], 'error': None,
+                        'companies': snapshot['companies'], 'company_error': None, 'index': index,
+                        'sort_index': sort_index, 'search': search, 'navigation': navigation, 'profile': finish_profile(profiler), 'fingerprint': fingerprint}
+
+        # Shared ingest stage: both pipelines below reuse this frame without re-parsing it
+        df_raw = profiler.call('read_csv', read_quotations, io.BytesIO(file_bytes))
+        df_raw = profiler.call('ingest', prepare_quotations, df_raw)
+        processed_data, error = process_customer_data(df_raw, profiler=profiler)
+        top_company_data, company_error = process_company_data(df_raw, profiler=profiler)
+        if store is not None and error is None and company_error is None:
+            with profiler.stage('snapshot_save'):
+                store.save(key, {'raw': df_raw, 'customers': processed_data, 'companies': top_company_data})
+        index = profiler.call('client_index', ClientIndex, df_raw)
+        sort_index = None
+        if processed_data is not None:
+            sort_index = profiler.call('sort_index', SortIndex, processed_data, EXPLORER_SORT_COLUMNS)
+        search = profiler.call('search_index', SearchIndex, df_raw)
+        navigation = profiler.call('navigation_index', NavigationIndex, top_company_data, processed_data)
+        return {'raw': df_raw, 'customers': processed_data, 'error': error, 'companies': top_company_data,
+                'company_error': company_error, 'index': index, 'sort_index': sort_index, 'search': search,
+                'navigation': navigation, 'profile': finish_profile(profiler), 'fingerprint': fingerprint}
+
+    return get_result_cache().get_or_compute(fingerprint, compute)
+
+
+def finish_profile(profiler: Profiler) -> dict:
+    # Logged as JSON when CRA_PROFILE is set; always kept for the sidebar Performance panel
+    if profiling_enabled():
+        profiler.log()
+    return profiler.to_dict()
+
+
+def display_performance_panel(profile: dict):
+    with st.sidebar.expander("⏱️ Performance", expanded=True):
+        st.caption("Stage timings of the run that produced the current results (cached reruns reuse them).")
+        stages = pd.DataFrame(profile['stages'])
+        if stages.empty:
+            st.write("No stages recorded.")
+            return
+        stages = stages.astype({'rows_in': 'Int64', 'rows_out': 'Int64'})
+        stages['seconds'] = stages['seconds'].round(3)
+        stages['memory_delta_mb'] = stages['memory_delta_mb'].round(1)
+        st.dataframe(stages.rename(columns={'name': 'Stage', 'seconds': 'Seconds', 'rows_in': 'Rows in',
+                                            'rows_out': 'Rows out', 'memory_delta_mb': 'Δ Memory (MB)'}),
+                     hide_index=True, width='stretch')
+        st.write(f"**Total:** {profile['total_seconds']:.2f}s")
+
+        timings = section_timings()
+        if not timings.empty:
+            st.caption("Dashboard sections: a widget reruns only its section ('section') instead of the whole "
+                       "page ('full'). Updated on the next full rerun.")
+            timings[['last_seconds', 'median_seconds']] = timings[['last_seconds', 'median_seconds']].round(3)
+            st.dataframe(timings.rename(columns={'section': 'Section', 'rerun': 'Rerun', 'runs': 'Runs',
+                                                 'last_seconds': 'Last (s)', 'median_seconds': 'Median (s)'}),
+                         hide_index=True, width='stretch')
+
+
+@section('quick_lookup')
+def quick_lookup_section(analytics: dict):
+    processed_data, df_raw = analytics['customers'], analytics['raw']
+    # Quick Search Options (placed BEFORE KPIs)
+    st.header("🔎 Find a Customer")
+    st.markdown("""
+    <div class="stats-container">
+        <p>Choose how you'd like to look up a customer: by company or directly by client name.</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    if analytics['company_error']:
+        st.error(analytics['company_error'])
+
+    search_mode = st.radio(
+        "Lookup mode:",
+        options=["Search by Company", "Search by Client"],
+        horizontal=True,
+    )
+
+    selected_customer_quick = None
+    if search_mode == "Search by Client":
+        # Ranked fuzzy matches from the search index; the best match opens straight away
+        query = st.text_input(
+            "Search customers:", placeholder="Client ID, company, client representative or project name...",
+            key="quick_client_search"
+        )
+        if query:
+            matches = analytics['search'].search(query, limit=QUICK_SEARCH_RESULTS)
+            if matches.empty:
+                st.warning("No customers match your search.")
+            else:
+                labels = [f"{client_id} ({field}: {match})" for client_id, field, match
+                          in matches[['ClientID', 'Field', 'Match']].itertuples(index=False)]
+                sel_pos = st.selectbox("Select customer:", options=range(len(labels)),
+                                       format_func=labels.__getitem__, key="quick_client_select")
+                selected_customer_quick = matches['ClientID'].iloc[sel_pos]
+
+    else:  # Search by Company: Country -> Company -> Customer, each level a lookup in the navigation index
+        navigation = analytics['navigation']
+        if navigation.countries:
+            country_totals = navigation.country_totals
+            sel_country = st.selectbox(
+                "Choose a Country:", options=["-- Select Country --"] + navigation.countries,
+                format_func=lambda c: c if c not in country_totals
+                else f"{c} ({country_totals[c]['Companies']:,} companies)",
+                key="quick_country_select"
+            )
+            if sel_country and sel_country != "-- Select Country --":
+                sel_company = st.selectbox(
+                    "Choose a Company:", options=["-- Select Company --"] + navigation.companies(sel_country),
+                    key="quick_company_select"
+                )
+                if sel_company and sel_company != "-- Select Company --":
+                    all_clients = navigation.clients(sel_country, sel_company)
+                    if all_clients:
+                        company_select_options = ["-- Select Customer --"] + all_clients
+                        sel_cust = st.selectbox(
+                            "Choose a Customer:", options=company_select_options, index=0, key="quick_company_client_select"
+                        )
+                        selected_customer_quick = None if sel_cust == "-- Select Customer --" else sel_cust
+                    else:
+                        st.warning("No customers found for the selected company.")
+                    if selected_customer_quick is None:
+                        # Company drill-down until a customer is picked
+                        st.markdown("---")
+                        display_company_overview(navigation, sel_country, sel_company, analytics['fingerprint'])
+        else:
+            st.warning("Company data is not available for quick search.")
+
+    # If a customer is selected via quick lookup, show their analytics immediately
+    if selected_customer_quick:
+        st.markdown("---")
+        st.subheader(f"📊 Quick View: {selected_customer_quick}")
+        if selected_customer_quick in processed_data['ClientID'].values:
+            cust_row = processed_data[processed_data['ClientID'] == selected_customer_quick].iloc[0]
+            display_individual_customer(cust_row, selected_customer_quick, df_raw, analytics['index'],
+                                        analytics['fingerprint'])
+        else:
+            st.warning("Selected customer not found in processed data.")
+
+    # Exports available within Find a Customer
+    st.markdown("---")
+    st.markdown("### 📥 Export Your Analytics")
+
+    export_format_fc = export_format_selector("export_format_find")
+    export_col1, export_col2 = st.columns(2)
+    with export_col1:
+        # Download all analytics
+        export_download_button(processed_data, "📋 Download All Analytics", "complete_customer_analytics",
+                               export_format_fc, analytics['fingerprint'], key="download_all_from_find")
+    with export_col2:
+        # Download selected customer's analytics when available
+        if selected_customer_quick:
+            single_row = processed_data[processed_data['ClientID'] == selected_customer_quick]
+            export_download_button(single_row, f"👤 Download {selected_customer_quick}",
+                                   f"{selected_customer_quick}_analytics", export_format_fc,
+                                   analytics['fingerprint'], key="download_single_from_find")
+        else:
+            st.info("Select a customer above to enable single-customer export.")
+
+
+@section('kpis')
+def kpi_section(processed_data: pd.DataFrame):
+    # Display summary metrics
+    st.header("📈 Key Performance Indicators")
+    display_summary_metrics(processed_data)
+
+
+@section('visual_analytics')
+def visual_analytics_section(processed_data: pd.DataFrame, fingerprint: str):
+    # Display visualizations
+    st.header("📊 Interactive Visual Analytics")
+    create_visualizations(processed_data, fingerprint=fingerprint)
+
+
+@section('data_explorer')
+def data_explorer_section(analytics: dict):
+    processed_data = analytics['customers']
+    # Enhanced Filters with colorful styling
+    st.markdown("""
+    <div class=\"stats-container\">
+        <h3>🎛️ Filter Controls</h3>
+    </div>
+    """, unsafe_allow_html=True)
+
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        segment_filter = st.multiselect(
+            "🎯 Filter by Customer Segment",
+            options=processed_data['Customer_Segment'].unique(),
+            default=processed_data['Customer_Segment'].unique()
+        )
+
+    with col2:
+        min_clv = st.number_input(
+            "💰 Minimum CLV",
+            min_value=0,
+            value=0,
+            step=1000
+        )
+
+    with col3:
+        min_win_rate = st.slider(
+            "📈 Minimum Win Rate (%)",
+            min_value=0,
+            max_value=100,
+            value=0
+        )
+
+    with col4:
+        min_retention = st.slider(
+            "🔄 Minimum Retention Rate",
+            min_value=0.0,
+            max_value=1.0,
+            value=0.0,
+            step=0.1,
+            format="%.1f"
+        )
+
+    # Apply filters as a row mask; rows are only gathered for the visible page and the exports
+    filter_mask = (
+        (processed_data['Customer_Segment'].isin(segment_filter)) &
+        (processed_data['CLV'] >= min_clv) &
+        (processed_data['Win_Rate_%'] >= min_win_rate) &
+        (processed_data['Retention_Rate'] >= min_retention)
+    ).to_numpy()
+    filtered_count = int(filter_mask.sum())
+
+    # Enhanced filter results display
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown(f"""
+        <div class=\"success-highlight\">
+            📊 Showing {filtered_count} customers
+        </div>
+        """, unsafe_allow_html=True)
+    with col2:
+        st.markdown(f"""
+        <div class=\"stats-container\">
+            📉 Filtered from {len(processed_data)} total customers
+        </div>
+        """, unsafe_allow_html=True)
+
+    # Customer search with enhanced styling
+    st.markdown("""
+    <div class=\"stats-container\">\n                    <h4>🔍 Customer Search</h4>\n                </div>
+    """, unsafe_allow_html=True)
+
+    search_term = st.text_input(
+        "Customer Search", 
+        placeholder="Enter a client ID, company, client representative or project name...",
+        label_visibility="collapsed"
+    )
+    if search_term:
+        matching_clients = analytics['search'].matching_clients(search_term)
+        filter_mask = filter_mask & processed_data['ClientID'].isin(matching_clients).to_numpy()
+        filtered_count = int(filter_mask.sum())
+        st.markdown(f"""
+        <div class=\"success-highlight\">
+            🎯 Search results: {filtered_count} customers found
+        </div>
+        """, unsafe_allow_html=True)
+
+    # Display filtered data with enhanced controls
+    if filtered_count > 0:
+        # Sort options with colorful styling
+        st.markdown("""
+        <div class=\"stats-container\">\n                        <h4>📊 Data Display Controls</h4>\n                    </div>
+        """, unsafe_allow_html=True)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            sort_by = st.selectbox(
+                "🔤 Sort by:",
+                options=EXPLORER_SORT_COLUMNS,
+                index=0
+            )
+
+        with col2:
+            sort_order = st.radio("📈 Sort order:", ['Descending', 'Ascending'])
+            ascending = sort_order == 'Ascending'
+
+        # Sort through the precomputed argsorts, then style and render only the visible page
+        order = analytics['sort_index'].order(sort_by, ascending, filter_mask)
+        start, stop = page_bounds(len(order))
+
+        # Per-service metric columns are left to the exports
+        page = processed_data.iloc[order[start:stop]].drop(
+            columns=service_metric_columns(SERVICE_COLUMNS), errors='ignore'
+        )
+        st.dataframe(
+            style_page(page),
+            width='stretch',
+            height=400
+        )
+
+        # Download processed data with enhanced buttons
+        st.header("📥 Export Your Analytics")
+
+        export_format = export_format_selector("export_format_explorer")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("""
+            <div class=\"stats-container\">\n                            <h4>📊 Filtered Data Export</h4>\n                        </div>
+            """, unsafe_allow_html=True)
+            export_download_button(processed_data, "📊 Download Filtered Data", "customer_analytics_filtered",
+                                   export_format, analytics['fingerprint'], rows=order)
+
+        with col2:
+            st.markdown("""
+            <div class=\"stats-container\">\n                            <h4>📋 Complete Analytics Export</h4>\n                        </div>
+            """, unsafe_allow_html=True)
+            # Download full processed data
+            export_download_button(processed_data, "📋 Download All Analytics", "complete_customer_analytics",
+                                   export_format, analytics['fingerprint'])
+    else:
+        st.markdown("""
+        <div class=\"warning-highlight\">\n                        ⚠️ No customers match the current filters. Try adjusting your criteria.\n                    </div>
+        """, unsafe_allow_html=True)
+
 
 def main():
     set_page()
@@ -34,6 +408,7 @@ def main():
         type=['csv'],
         help="Upload a CSV file with customer quotation data"
     )
+    show_performance = st.sidebar.checkbox("⏱️ Show performance panel", value=profiling_enabled())
     
     # Sample data info with enhanced styling
     with st.sidebar.expander("📋 Required CSV Format", expanded=False):
@@ -54,9 +429,14 @@ def main():
     
     if uploaded_file is not None:
         try:
-            # Load the data
+            # Load the data once per upload for this session (and across sessions by file contents),
+            # so widget reruns skip reading, parsing and processing entirely
             with st.spinner("🔄 Loading and processing data..."):
-                df_raw = pd.read_csv(uploaded_file)
+                analytics = get_session_artifacts(uploaded_file, load_analytics)
+                df_raw = analytics['raw']
+            if show_performance:
+                display_performance_panel(analytics['profile'])
+            display_session_memory(get_result_cache().stats())
                 
             st.markdown(f"""
             <div class="success-highlight">
@@ -69,9 +449,7 @@ def main():
                 st.dataframe(df_raw.head(10), width='stretch')
                 st.write(f"**Shape:** {df_raw.shape[0]} rows × {df_raw.shape[1]} columns")
             
-            # Process the data
-            with st.spinner("🎨 Processing customer analytics..."):
-                processed_data, error = process_customer_data(df_raw)
+            processed_data, error = analytics['customers'], analytics['error']
             
             if error:
                 st.markdown(f"""
@@ -100,313 +478,14 @@ def main():
                 st.dataframe(processed_data.head(10), width='stretch')
                 st.write(f"**Shape:** {processed_data.shape[0]} rows × {processed_data.shape[1]} columns")
             
-            # Quick Search Options (placed BEFORE KPIs)
-            st.header("🔎 Find a Customer")
-            st.markdown("""
-            <div class="stats-container">
-                <p>Choose how you'd like to look up a customer: by company or directly by client name.</p>
-            </div>
-            """, unsafe_allow_html=True)
-
-            # Prepare lightweight company data for quick search
-            with st.spinner("⚙️ Preparing quick search options..."):
-                top_company_data = process_company_data(df_raw)
-
-            search_mode = st.radio(
-                "Lookup mode:",
-                options=["Search by Company", "Search by Client"],
-                horizontal=True,
-            )
-
-            selected_customer_quick = None
-            if search_mode == "Search by Client":
-                # Always show all clients (as requested), but don't select by default
-                candidates = sorted(processed_data['ClientID'].dropna().unique().tolist())
-                select_options = ["-- Select Customer --"] + candidates
-                sel_val = st.selectbox("Select customer:", options=select_options, index=0, key="quick_client_select")
-                selected_customer_quick = None if sel_val == "-- Select Customer --" else sel_val
-
-            else:  # Search by Company: Country -> Company -> Customer
-                if top_company_data is not None and not top_company_data.empty:
-                    available_countries = sorted(top_company_data['Country'].dropna().unique().tolist())
-                    sel_country = st.selectbox(
-                        "Choose a Country:", options=["-- Select Country --"] + available_countries, key="quick_country_select"
-                    )
-                    if sel_country and sel_country != "-- Select Country --":
-                        sub_country = top_company_data[top_company_data['Country'] == sel_country]
-                        available_companies = sorted(sub_country['Company'].dropna().unique().tolist())
-                        sel_company = st.selectbox(
-                            "Choose a Company:", options=["-- Select Company --"] + available_companies, key="quick_company_select"
-                        )
-                        if sel_company and sel_company != "-- Select Company --":
-                            # Get the row for this country+company
-                            row = sub_country[sub_country['Company'] == sel_company]
-                            all_clients = []
-                            for lst in row['ClientIDs'].values:
-                                all_clients.extend(lst)
-                            all_clients = sorted(set(all_clients))
-                            if all_clients:
-                                company_select_options = ["-- Select Customer --"] + all_clients
-                                sel_cust = st.selectbox(
-                                    "Choose a Customer:", options=company_select_options, index=0, key="quick_company_client_select"
-                                )
-                                selected_customer_quick = None if sel_cust == "-- Select Customer --" else sel_cust
-                            else:
-                                st.warning("No customers found for the selected company.")
-                else:
-                    st.warning("Company data is not available for quick search.")
-
-            # If a customer is selected via quick lookup, show their analytics immediately
-            if selected_customer_quick:
-                st.markdown("---")
-                st.subheader(f"📊 Quick View: {selected_customer_quick}")
-                if selected_customer_quick in processed_data['ClientID'].values:
-                    cust_row = processed_data[processed_data['ClientID'] == selected_customer_quick].iloc[0]
-                    display_individual_customer(cust_row, selected_customer_quick, df_raw)
-                else:
-                    st.warning("Selected customer not found in processed data.")
-            
-            # Exports available within Find a Customer
-            st.markdown("---")
-            st.markdown("### 📥 Export Your Analytics")
-            
-            export_col1, export_col2 = st.columns(2)
-            with export_col1:
-                # Download all analytics
-                full_csv_buffer_fc = io.StringIO()
-                processed_data.to_csv(full_csv_buffer_fc, index=False)
-                full_csv_data_fc = full_csv_buffer_fc.getvalue()
-                st.download_button(
-                    label="📋 Download All Analytics (CSV)",
-                    data=full_csv_data_fc,
-                    file_name=f"complete_customer_analytics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                    mime="text/csv",
-                    key="download_all_from_find"
-                )
-            with export_col2:
-                # Download selected customer's analytics when available
-                if selected_customer_quick:
-                    single_row = processed_data[processed_data['ClientID'] == selected_customer_quick]
-                    single_csv_buffer = io.StringIO()
-                    single_row.to_csv(single_csv_buffer, index=False)
-                    single_csv_data = single_csv_buffer.getvalue()
-                    st.download_button(
-                        label=f"👤 Download {selected_customer_quick} (CSV)",
-                        data=single_csv_data,
-                        file_name=f"{selected_customer_quick}_analytics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                        mime="text/csv",
-                        key="download_single_from_find"
-                    )
-                else:
-                    st.info("Select a customer above to enable single-customer export.")
-            
-            # Display summary metrics
-            st.header("📈 Key Performance Indicators")
-            display_summary_metrics(processed_data)
-            
-            # Display visualizations
-            st.header("📊 Interactive Visual Analytics")
-            create_visualizations(processed_data)
+            # Each section reruns on its own when one of its widgets changes
+            quick_lookup_section(analytics)
+            kpi_section(processed_data)
+            visual_analytics_section(processed_data, analytics['fingerprint'])
             
             # Interactive data exploration (moved into an expander to declutter main flow)
             with st.expander("🔍 Advanced Customer Data Explorer", expanded=False):
-                # Enhanced Filters with colorful styling
-                st.markdown("""
-                <div class=\"stats-container\">
-                    <h3>🎛️ Filter Controls</h3>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                col1, col2, col3, col4 = st.columns(4)
-                
-                with col1:
-                    segment_filter = st.multiselect(
-                        "🎯 Filter by Customer Segment",
-                        options=processed_data['Customer_Segment'].unique(),
-                        default=processed_data['Customer_Segment'].unique()
-                    )
-                
-                with col2:
-                    min_clv = st.number_input(
-                        "💰 Minimum CLV",
-                        min_value=0,
-                        value=0,
-                        step=1000
-                    )
-                
-                with col3:
-                    min_win_rate = st.slider(
-                        "📈 Minimum Win Rate (%)",
-                        min_value=0,
-                        max_value=100,
-                        value=0
-                    )
-                
-                with col4:
-                    min_retention = st.slider(
-                        "🔄 Minimum Retention Rate",
-                        min_value=0.0,
-                        max_value=1.0,
-                        value=0.0,
-                        step=0.1,
-                        format="%.1f"
-                    )
-                
-                # Apply filters
-                filtered_data = processed_data[
-                    (processed_data['Customer_Segment'].isin(segment_filter)) &
-                    (processed_data['CLV'] >= min_clv) &
-                    (processed_data['Win_Rate_%'] >= min_win_rate) &
-                    (processed_data['Retention_Rate'] >= min_retention)
-                ]
-                
-                # Enhanced filter results display
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.markdown(f"""
-                    <div class=\"success-highlight\">
-                        📊 Showing {len(filtered_data)} customers
-                    </div>
-                    """, unsafe_allow_html=True)
-                with col2:
-                    st.markdown(f"""
-                    <div class=\"stats-container\">
-                        📉 Filtered from {len(processed_data)} total customers
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                # Customer search with enhanced styling
-                st.markdown("""
-                <div class=\"stats-container\">\n                    <h4>🔍 Customer Search</h4>\n                </div>
-                """, unsafe_allow_html=True)
-                
-                search_term = st.text_input(
-                    "Customer Search", 
-                    placeholder="Enter customer name or ID to search...",
-                    label_visibility="collapsed"
-                )
-                if search_term:
-                    filtered_data = filtered_data[
-                        filtered_data['ClientID'].str.contains(search_term, case=False, na=False)
-                    ]
-                    st.markdown(f"""
-                    <div class=\"success-highlight\">
-                        🎯 Search results: {len(filtered_data)} customers found
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                # Display filtered data with enhanced controls
-                if len(filtered_data) > 0:
-                    # Sort options with colorful styling
-                    st.markdown("""
-                    <div class=\"stats-container\">\n                        <h4>📊 Data Display Controls</h4>\n                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        sort_by = st.selectbox(
-                            "🔤 Sort by:",
-                            options=['CLV', 'Win_Rate_%', 'Retention_Rate', 'Churn_Rate', 'Total_Quotations', 'Years_Active', 'Projects_Per_Year'],
-                            index=0
-                        )
-                    
-                    with col2:
-                        sort_order = st.radio("📈 Sort order:", ['Descending', 'Ascending'])
-                        ascending = sort_order == 'Ascending'
-                    
-                    # Sort and display with color-coded segments
-                    display_data = filtered_data.sort_values(by=sort_by, ascending=ascending)
-                    
-                    # Color-code the dataframe based on customer segments
-                    def highlight_segments(val, column_name):
-                        if column_name == 'Customer_Segment':
-                            if val == 'High':
-                                return 'background-color: #4facfe; color: white; font-weight: bold'
-                            elif val == 'Medium':
-                                return 'background-color: #43e97b; color: white; font-weight: bold'
-                            else:
-                                return 'background-color: #fa709a; color: white; font-weight: bold'
-                        elif column_name == 'Retention_Rate':
-                            if val >= 0.7:
-                                return 'background-color: #00ff88; color: white; font-weight: bold'
-                            elif val >= 0.4:
-                                return 'background-color: #ffaa00; color: white; font-weight: bold'
-                            else:
-                                return 'background-color: #ff4757; color: white; font-weight: bold'
-                        elif column_name == 'CLV' and val >= 75000:
-                            return 'background-color: #667eea; color: white; font-weight: bold'
-                        elif column_name == 'Win_Rate_%' and val >= 70:
-                            return 'background-color: #764ba2; color: white; font-weight: bold'
-                        return ''
-                    
-                    # Apply styling to dataframe
-                    styled_df = display_data.style.map(
-                        lambda x: highlight_segments(x, 'Customer_Segment'), 
-                        subset=['Customer_Segment']
-                    ).map(
-                        lambda x: highlight_segments(x, 'Retention_Rate'), 
-                        subset=['Retention_Rate']
-                    ).map(
-                        lambda x: highlight_segments(x, 'CLV'), 
-                        subset=['CLV']
-                    ).map(
-                        lambda x: highlight_segments(x, 'Win_Rate_%'), 
-                        subset=['Win_Rate_%']
-                    ).format({
-                        'CLV': 'E£{:,.2f}',
-                        'Total_Project_Value': 'E£{:,.2f}',
-                        'Revenue_by_Service': 'E£{:,.2f}',
-                        'Win_Rate_%': '{:.1f}%','Loss_Rate_%': '{:.1f}%',
-                        'Retention_Rate': '{:.2f}',
-                        'Churn_Rate': '{:.2f}',
-                        'Years_Active': '{:.1f}',
-                        'Projects_Per_Year': '{:.1f}'
-                    })
-                    
-                    st.dataframe(
-                        styled_df,
-                        width='stretch',
-                        height=400
-                    )
-                    
-                    # Download processed data with enhanced buttons
-                    st.header("📥 Export Your Analytics")
-                    
-                    csv_buffer = io.StringIO()
-                    display_data.to_csv(csv_buffer, index=False)
-                    csv_data = csv_buffer.getvalue()
-                    
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.markdown("""
-                        <div class=\"stats-container\">\n                            <h4>📊 Filtered Data Export</h4>\n                        </div>
-                        """, unsafe_allow_html=True)
-                        st.download_button(
-                            label="📊 Download Filtered Data (CSV)",
-                            data=csv_data,
-                            file_name=f"customer_analytics_filtered_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                            mime="text/csv"
-                        )
-                    
-                    with col2:
-                        st.markdown("""
-                        <div class=\"stats-container\">\n                            <h4>📋 Complete Analytics Export</h4>\n                        </div>
-                        """, unsafe_allow_html=True)
-                        # Download full processed data
-                        full_csv_buffer = io.StringIO()
-                        processed_data.to_csv(full_csv_buffer, index=False)
-                        full_csv_data = full_csv_buffer.getvalue()
-                        
-                        st.download_button(
-                            label="📋 Download All Analytics (CSV)",
-                            data=full_csv_data,
-                            file_name=f"complete_customer_analytics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                            mime="text/csv"
-                        )
-                else:
-                    st.markdown("""
-                    <div class=\"warning-highlight\">\n                        ⚠️ No customers match the current filters. Try adjusting your criteria.\n                    </div>
-                    """, unsafe_allow_html=True)
+                data_explorer_section(analytics)
                 
         except Exception as e:
             st.markdown(f"""
@@ -417,6 +496,8 @@ def main():
             st.write("Please ensure your CSV file is properly formatted and try again.")
     
     else:
+        # The upload was removed: release this session's artifacts
+        clear_session_artifacts()
         # Enhanced instructions when no file is uploaded
         st.markdown("""
         <div class="stats-container">
@@ -0,0 +1,134 @@
+"""
+Per-interaction latency of the dashboard on a synthetic upload: for each widget interaction, the time of
+a whole-script rerun (what every interaction cost before the dashboard was split into sections) and the
+time of the section that owns the widget (what the interaction re-executes now).
+
+    python -m benchmarks.interactions --rows 100000 --out interactions.json
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.run import RESULTS_VERSION, compare, environment
+from benchmarks.synthetic import generate_quotations
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RUN_TIMEOUT = 600
+
+
+def dashboard():
+    # Runs inside AppTest: the upload widget returns the benchmark CSV named in session state
+    from pathlib import Path
+
+    import streamlit as st
+
+    import app
+
+    class BenchmarkUpload:
+        def __init__(self, path):
+            self.name = Path(path).name
+            self.file_id = path
+            self._data = Path(path).read_bytes()
+            self.size = len(self._data)
+
+        def getvalue(self):
+            return self._data
+
+    upload = BenchmarkUpload(st.session_state['benchmark_csv'])
+    st.sidebar.file_uploader = lambda *args, **kwargs: upload
+    app.main()
+
+
+def _widget(at, kind: str, key: str | None = None, label: str | None = None, key_prefix: str | None = None):
+    for widget in getattr(at, kind):
+        if (key is not None and widget.key == key) or (label is not None and widget.label == label) or \
+                (key_prefix is not None and widget.key and widget.key.startswith(key_prefix)):
+            return widget
+    raise LookupError(f"No {kind} widget matching key={key} label={label} key_prefix={key_prefix}")
+
+
+# name -> (owning section, action(at, client_id)); run in this order, later ones rely on earlier state
+INTERACTIONS = {
+    'quick_search': ('quick_lookup',
+                     lambda at, client_id: _widget(at, 'text_input', key='quick_client_search').set_value(client_id)),
+    'project_select': ('project_explorer',
+                       lambda at, client_id: (lambda box: box.set_value(box.options[1]))(
+                           _widget(at, 'selectbox', key_prefix='project_selector_'))),
+    'explorer_sort_order': ('data_explorer',
+                            lambda at, client_id: _widget(at, 'radio', label="📈 Sort order:").set_value('Ascending')),
+    'explorer_page': ('data_explorer',
+                      lambda at, client_id: _widget(at, 'number_input', key='explorer_page').set_value(2)),
+}
+
+
+def benchmark_interactions(csv_path: Path, client_id: str) -> list[dict]:
+    from streamlit.testing.v1 import AppTest
+
+    from ui.sections import SECTION_LOG_KEY
+
+    at = AppTest.from_function(dashboard, default_timeout=RUN_TIMEOUT)
+    at.session_state['benchmark_csv'] = str(csv_path)
+    at.run()
+    _widget(at, 'radio', label="Lookup mode:").set_value("Search by Client")
+    at.run()
+    if at.exception:
+        raise RuntimeError([e.value for e in at.exception])
+
+    results = []
+    for name, (owner, action) in INTERACTIONS.items():
+        action(at, client_id)
+        logged = len(at.session_state[SECTION_LOG_KEY])
+        start = time.perf_counter()
+        at.run()
+        full_rerun = time.perf_counter() - start
+        if at.exception:
+            raise RuntimeError([e.value for e in at.exception])
+        records = list(at.session_state[SECTION_LOG_KEY])[logged:]
+        section = sum(record['seconds'] for record in records if record['section'] == owner)
+        results.append({'interaction': name, 'section': owner, 'full_rerun_seconds': full_rerun,
+                        'section_seconds': section})
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.interactions',
+                                     description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000, help="Quotation rows in the synthetic upload")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='interaction-results.json', help="JSON results file")
+    parser.add_argument('--compare', default=None, help="Previous JSON results file to compare against")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, str(REPO_ROOT))
+    with tempfile.TemporaryDirectory() as tmp:
+        df = generate_quotations(args.rows, args.seed)
+        csv_path = Path(tmp) / f"quotations_{args.rows}_{args.seed}.csv"
+        df.to_csv(csv_path, index=False)
+        measured = benchmark_interactions(csv_path, str(df['ClientID'].iloc[0]))
+
+    results = []
+    print(f"{'interaction':<22} {'section':<18} {'full rerun':>11} {'section':>9}")
+    for record in measured:
+        print(f"{record['interaction']:<22} {record['section']:<18} {record['full_rerun_seconds']:10.3f}s "
+              f"{record['section_seconds']:8.3f}s", flush=True)
+        # Same record layout as benchmarks.run, so --compare works across runs
+        for kind in ('full_rerun', 'section'):
+            results.append({'rows': args.rows, 'stage': f"{record['interaction']}.{kind}",
+                            'seconds': round(record[f'{kind}_seconds'], 4)})
+
+    report = {'version': RESULTS_VERSION, 'seed': args.seed, 'environment': environment(), 'results': results}
+    Path(args.out).write_text(json.dumps(report, indent=2))
+    print(f"Results written to {args.out}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())['results']
+        print('\n'.join(compare(results, baseline)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,203 @@
+"""
+Benchmark suite for the processing pipeline: times each stage and measures its peak traced memory
+on synthetic exports of increasing size, and writes the results as JSON. The customer and company
+stages also record their profiled sub-stages (quote table, client aggregates, cadence, scoring, ...)
+with wall time and resident memory change, so a regression can be traced to the step that caused it.
+
+    python -m benchmarks.run --sizes 10000 100000 --out results.json
+    python -m benchmarks.run --sizes 10000 --compare results.json
+"""
+import argparse
+import gc
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import generate_quotations
+from processing.cache import CODE_VERSION
+from processing.companies import process_company_data
+from processing.customers import process_customer_data
+from processing.ingest import prepare_quotations
+from processing.profiling import NULL_PROFILER, Profiler
+from processing.schema import read_quotations
+from processing.streaming import process_customer_csv
+
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000, 5_000_000)
+RESULTS_VERSION = 2
+
+
+def _checked(result):
+    """Unwrap a (value, error) pair from the processing functions, raising on error."""
+    value, error = result
+    if error:
+        raise RuntimeError(error)
+    return value
+
+
+# name -> callable(state) returning the stage output; outputs are stored in state under the stage name.
+# Stages that take state['profiler'] record their sub-stages on it.
+STAGES = {
+    'read_csv': lambda state: read_quotations(state['csv']),
+    'ingest': lambda state: prepare_quotations(state['read_csv']),
+    'customers': lambda state: _checked(process_customer_data(state['ingest'], profiler=state['profiler'])),
+    'companies': lambda state: _checked(process_company_data(state['ingest'], profiler=state['profiler'])),
+    'customers_chunked': lambda state: _checked(process_customer_csv(state['csv'])),
+}
+
+
+def _time_stage(name: str, func, state, repeat: int) -> tuple[float, Profiler]:
+    """Best wall time over `repeat` runs, and the profiler holding the sub-stages of that run."""
+    best, best_profiler = float('inf'), None
+    for _ in range(repeat):
+        gc.collect()
+        state['profiler'] = Profiler(name)
+        start = time.perf_counter()
+        state['_out'] = func(state)
+        seconds = time.perf_counter() - start
+        if seconds < best:
+            best, best_profiler = seconds, state['profiler']
+    return best, best_profiler
+
+
+def _peak_memory(func, state) -> float:
+    """
+    Peak traced allocation (MB) while running the stage, on top of what was already allocated.
+    tracemalloc sees Python and NumPy allocations but not the CSV parser's internal buffers.
+    """
+    gc.collect()
+    state['profiler'] = NULL_PROFILER
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        func(state)
+        return (tracemalloc.get_traced_memory()[1] - baseline) / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark_size(n_rows: int, data_dir: Path, seed: int = 0, repeat: int = 1, memory: bool = True,
+                   stages=None) -> list[dict]:
+    """
+    Run every stage on one synthetic export of `n_rows` rows; returns one record per stage, each followed
+    by one record per profiled sub-stage (with `parent` set to the stage name).
+    """
+    csv_path = data_dir / f"quotations_{n_rows}_{seed}.csv"
+    if not csv_path.exists():
+        generate_quotations(n_rows, seed).to_csv(csv_path, index=False)
+
+    state = {'csv': csv_path}
+    records = []
+    for name in stages or STAGES:
+        func = STAGES[name]
+        seconds, profiler = _time_stage(name, func, state, repeat)
+        output = state.pop('_out')
+        state[name] = output
+        records.append({
+            'rows': n_rows,
+            'stage': name,
+            'parent': None,
+            'seconds': round(seconds, 4),
+            'rows_per_second': round(n_rows / seconds) if seconds else None,
+            'output_rows': len(output) if isinstance(output, pd.DataFrame) else None,
+            'peak_mb': round(_peak_memory(func, state), 1) if memory else None,
+        })
+        for sub_stage in profiler.records:
+            records.append({
+                'rows': n_rows,
+                'stage': sub_stage.name,
+                'parent': name,
+                'seconds': round(sub_stage.seconds, 4),
+                'rows_in': sub_stage.rows_in,
+                'output_rows': sub_stage.rows_out,
+                'memory_delta_mb': None if sub_stage.memory_delta_mb is None else round(sub_stage.memory_delta_mb, 1),
+            })
+    return records
+
+
+def _memory_mb(record: dict) -> float | None:
+    # Stages report traced peak memory, sub-stages the change in resident memory
+    return record.get('peak_mb') if record.get('parent') is None else record.get('memory_delta_mb')
+
+
+def format_record(record: dict) -> str:
+    memory = _memory_mb(record)
+    unit = 'MB' if record.get('parent') is None else 'MB RSS change'
+    name = record['stage'] if record.get('parent') is None else f"  {record['stage']}"
+    return f"{record['rows']:>9} {name:<30} {record['seconds']:9.3f}s" + \
+        (f" {memory:9.1f} {unit}" if memory is not None else '')
+
+
+def environment() -> dict:
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'code_version': CODE_VERSION,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+    }
+
+
+def compare(current: list[dict], baseline: list[dict]) -> list[str]:
+    """
+    Human-readable speedup lines (and memory before -> after where both runs measured it) for the
+    (rows, stage) pairs present in both result sets, sub-stages indented under their stage.
+    """
+    previous = {(r['rows'], r['stage']): r for r in baseline}
+    lines = []
+    for record in current:
+        before = previous.get((record['rows'], record['stage']))
+        if before and record['seconds']:
+            name = record['stage'] if record.get('parent') is None else f"  {record['stage']}"
+            line = (f"{record['rows']:>9} {name:<30} {before['seconds']:9.3f}s -> "
+                    f"{record['seconds']:9.3f}s  x{before['seconds'] / record['seconds']:.2f}")
+            memory_before, memory_after = _memory_mb(before), _memory_mb(record)
+            if memory_before is not None and memory_after is not None:
+                line += f"  {memory_before:9.1f} -> {memory_after:9.1f} MB"
+            lines.append(line)
+    return lines
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help="Row counts to benchmark")
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), default=None,
+                        help="Stages to run (default: all; later stages need the earlier ones they consume)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=1, help="Timing runs per stage; the best is kept")
+    parser.add_argument('--no-memory', action='store_true', help="Skip the traced peak memory pass")
+    parser.add_argument('--data-dir', default=None, help="Where generated CSVs are kept (default: a temp dir)")
+    parser.add_argument('--out', default='benchmark-results.json', help="JSON results file")
+    parser.add_argument('--compare', default=None, help="Previous JSON results file to compare against")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(args.data_dir or tmp)
+        data_dir.mkdir(parents=True, exist_ok=True)
+        results = []
+        for n_rows in args.sizes:
+            for record in benchmark_size(n_rows, data_dir, args.seed, args.repeat, not args.no_memory, args.stages):
+                results.append(record)
+                print(format_record(record), flush=True)
+
+    report = {'version': RESULTS_VERSION, 'seed': args.seed, 'environment': environment(), 'results': results}
+    Path(args.out).write_text(json.dumps(report, indent=2))
+    print(f"Results written to {args.out}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())['results']
+        print('\n'.join(compare(results, baseline)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Cold start measurements for the Streamlit app, each taken in a fresh interpreter:
+import time of the app module and first render of the landing page (no upload).
+
+    python -m benchmarks.startup --runs 5 --out startup.json
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.run import RESULTS_VERSION, compare, environment
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RENDER_TIMEOUT = 120
+
+# name -> snippet printing the elapsed seconds of the measured step
+PROBES = {
+    'import_streamlit': "import time; t = time.perf_counter(); import streamlit; print(time.perf_counter() - t)",
+    'import_app': "import time; t = time.perf_counter(); import app; print(time.perf_counter() - t)",
+    # Script run of app.py with no upload; streamlit itself is already imported by AppTest
+    'first_render': (
+        "import time; from streamlit.testing.v1 import AppTest; at = AppTest.from_file('app.py'); "
+        f"t = time.perf_counter(); at.run(timeout={RENDER_TIMEOUT}); elapsed = time.perf_counter() - t; "
+        "assert not at.exception, [e.value for e in at.exception]; print(elapsed)"
+    ),
+    # Deferred until the first chart is drawn
+    'first_chart_import': (
+        "import streamlit, time; t = time.perf_counter(); import plotly.express; print(time.perf_counter() - t)"
+    ),
+}
+
+
+def measure(probe: str, runs: int) -> list[float]:
+    """Run `probe` in `runs` fresh interpreters from the repository root; returns the timings."""
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', PROBES[probe]], cwd=REPO_ROOT, check=True,
+                                capture_output=True, text=True).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return timings
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.startup', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help="Fresh interpreters per measurement; the median is kept")
+    parser.add_argument('--probes', nargs='+', choices=list(PROBES), default=list(PROBES))
+    parser.add_argument('--out', default='startup-results.json', help="JSON results file")
+    parser.add_argument('--compare', default=None, help="Previous JSON results file to compare against")
+    args = parser.parse_args(argv)
+
+    results = []
+    for probe in args.probes:
+        timings = measure(probe, args.runs)
+        # rows is 0: startup cost does not depend on a dataset, but keeps records comparable with benchmarks.run
+        results.append({'rows': 0, 'stage': probe, 'seconds': round(statistics.median(timings), 4),
+                        'min_seconds': round(min(timings), 4), 'runs': len(timings)})
+        print(f"{probe:<20} {results[-1]['seconds']:8.3f}s (min {results[-1]['min_seconds']:.3f}s)", flush=True)
+
+    report = {'version': RESULTS_VERSION, 'environment': environment(), 'results': results}
+    Path(args.out).write_text(json.dumps(report, indent=2))
+    print(f"Results written to {args.out}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())['results']
+        print('\n'.join(compare(results, baseline)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
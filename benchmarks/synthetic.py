@@ -0,0 +1,118 @@
+"""
+Seeded synthetic quotation exports following the documented CSV schema (see README "Data Format").
+
+    python -m benchmarks.synthetic 100000 quotations.csv --seed 1
+"""
+import argparse
+import string
+
+import numpy as np
+import pandas as pd
+
+from processing.services import SERVICE_COLUMNS
+
+
+# Number prefix -> Location value; the last two fall into the 'Others' country bucket
+COUNTRIES = {'UAE': 'UAE', 'KSA': 'KSA', 'KWT': 'Kuwait', 'EGY': 'Egypt', 'OMN': 'Oman',
+             'JOR': 'Jordan', 'LBN': 'Lebanon', 'QAT': 'Qatar', 'BHR': 'Bahrain'}
+COUNTRY_WEIGHTS = [0.35, 0.25, 0.08, 0.08, 0.06, 0.06, 0.05, 0.04, 0.03]
+PROJECT_THEMES = ['Launch', 'Congress', 'Symposium', 'Campaign', 'Portal', 'Workshop', 'Advisory Board', 'Roadshow']
+DATE_FORMAT = '%d/%m/%Y'
+START_DATE = '2019-01-01'
+SPAN_DAYS = 5 * 365
+CLOSED_SHARE = 0.35
+LETTER_SUFFIX_SHARE = 0.1
+
+
+def _codes(count: int, length: int = 3) -> np.ndarray:
+    """Distinct upper-case codes ('AAA', 'AAB', ...) used as client abbreviations."""
+    letters = np.array(list(string.ascii_uppercase))
+    idx = np.arange(count)
+    parts = [letters[(idx // 26 ** p) % 26] for p in reversed(range(length))]
+    codes = parts[0].astype(object)
+    for part in parts[1:]:
+        codes = codes + part
+    # Abbreviations are mixed case in real exports (e.g. 'Abb')
+    return np.array([code.capitalize() for code in codes], dtype=object)
+
+
+def generate_quotations(n_rows: int, seed: int = 0, n_clients: int | None = None) -> pd.DataFrame:
+    """
+    Return `n_rows` quotation rows. Quotations are grouped into projects of one or more versions
+    (e.g. KSA.Abb.QU.1002.1, KSA.Abb.QU.1002.2a) quoted to a skewed population of clients; a share of
+    projects is Closed on its last version and every other version is Rejected.
+    """
+    rng = np.random.default_rng(seed)
+    n_clients = n_clients or max(10, n_rows // 40)
+
+    # Clients: country prefix, abbreviation, company and one or two representatives
+    client_country = rng.choice(len(COUNTRIES), n_clients, p=COUNTRY_WEIGHTS)
+    client_abbr = _codes(n_clients)
+    client_company = rng.integers(0, max(3, n_clients // 3), n_clients)
+    client_weights = rng.pareto(1.2, n_clients) + 1
+    client_weights /= client_weights.sum()
+
+    # Projects: owner, size (number of versions), first date, value, outcome and service mix
+    n_projects = int(n_rows / 1.7) + 1
+    project_client = rng.choice(n_clients, n_projects, p=client_weights)
+    project_versions = rng.geometric(0.6, n_projects)
+    while project_versions.sum() < n_rows:
+        n_more = int((n_rows - project_versions.sum()) / 1.7) + 1
+        project_client = np.append(project_client, rng.choice(n_clients, n_more, p=client_weights))
+        project_versions = np.append(project_versions, rng.geometric(0.6, n_more))
+        n_projects += n_more
+    project_start = rng.integers(0, SPAN_DAYS, n_projects)
+    project_value = rng.gamma(2.0, 25_000, n_projects)
+    project_closed = rng.random(n_projects) < CLOSED_SHARE
+    service_mask = rng.random((n_projects, len(SERVICE_COLUMNS))) < 0.25
+    service_mask[np.arange(n_projects), rng.integers(0, len(SERVICE_COLUMNS), n_projects)] = True
+    service_share = rng.random((n_projects, len(SERVICE_COLUMNS))) * service_mask
+    service_share /= service_share.sum(axis=1, keepdims=True)
+
+    # Rows: one per project version, truncated to n_rows
+    project = np.repeat(np.arange(n_projects), project_versions)[:n_rows]
+    first_row = np.repeat(np.cumsum(project_versions) - project_versions, project_versions)[:n_rows]
+    version = np.arange(n_rows) - first_row + 1
+    last_version = np.append(project[1:] != project[:-1], True)
+    client = project_client[project]
+
+    days = np.minimum(project_start[project] + (version - 1) * rng.integers(1, 30, n_rows), SPAN_DAYS - 1)
+    day_labels = (pd.Timestamp(START_DATE) + pd.to_timedelta(np.arange(SPAN_DAYS), unit='D')).strftime(DATE_FORMAT)
+    version_labels = version.astype(str).astype(object)
+    suffixed = rng.random(n_rows) < LETTER_SUFFIX_SHARE
+    version_labels[suffixed] = version_labels[suffixed] + rng.choice(['a', 'b'], suffixed.sum())
+
+    prefixes = np.array(list(COUNTRIES), dtype=object)[client_country] + '.' + client_abbr + '.QU.'
+    project_numbers = (1000 + np.arange(n_projects)).astype(str).astype(object)
+    closed = project_closed[project] & last_version
+    amount = np.round(project_value[project] * rng.uniform(0.85, 1.15, n_rows), 2)
+
+    df = pd.DataFrame({
+        'Date': np.asarray(day_labels, dtype=object)[days],
+        'Number': prefixes[client] + project_numbers[project] + '.' + version_labels,
+        'Estimate status': np.where(closed, 'Closed', 'Rejected'),
+        'Taxable amount': amount,
+        'ClientID': np.char.add('CL', (10_000 + client).astype(str)),
+        'converted to invoice (AMOUNT)': np.where(closed, amount, 0.0),
+        'Name': np.array(PROJECT_THEMES, dtype=object)[project % len(PROJECT_THEMES)] + ' ' + (project % 97).astype(str),
+        'Location': np.array(list(COUNTRIES.values()), dtype=object)[client_country[client]],
+        'Company': np.char.add('Company ', client_company[client].astype(str)),
+        'Client': np.char.add('Rep ', (client * 2 + (project % 2)).astype(str)),
+    })
+    services = np.round(service_share[project] * amount[:, None], 2)
+    for i, service in enumerate(SERVICE_COLUMNS):
+        df[service] = services[:, i]
+    return df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic quotation CSV")
+    parser.add_argument('rows', type=int)
+    parser.add_argument('out')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    generate_quotations(args.rows, args.seed).to_csv(args.out, index=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+Headless entry point for batch runs, e.g.
+
+    python -m processing run quotations.csv --out out/ --format csv parquet
+    python -m processing run quotations.csv --out out/ --as-of 2024-03-31
+    python -m processing history quotations.csv --out history/ --start 2023-01-01
+    python -m processing append --state state/ --init history.csv
+    python -m processing append --state state/ new_quotations.csv --verify history_with_new.csv
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from processing.exports import EXPORT_FORMATS, export_file_name, write_export
+from processing.history import customer_history, history_summary, month_ends, segment_migration
+from processing.incremental import apply_delta, build_state, has_state, load_state, save_state, verify_state
+from processing.pipeline import OUTPUT_FORMATS, run_stage, run_pipeline, write_outputs
+from processing.profiling import Profiler
+from processing.schema import read_quotations
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m processing', description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="Process a quotation CSV into customer and company analytics")
+    run.add_argument('input', help="Quotation CSV export")
+    run.add_argument('--out', required=True, help="Directory for the output files")
+    run.add_argument('--format', nargs='+', choices=list(EXPORT_FORMATS), default=list(OUTPUT_FORMATS),
+                     help="Output formats (default: csv parquet)")
+    run.add_argument('--date-format', default=None, help="strftime format of the Date column (default: detected)")
+    run.add_argument('--as-of', default=None,
+                     help="Only use quotations dated on or before this date; idle time is measured up to it")
+    run.add_argument('--chunksize', type=int, default=None,
+                     help="Stream the CSV in chunks of this many rows instead of loading it whole")
+    run.add_argument('--json', action='store_true', help="Print the stage report as JSON")
+    run.add_argument('--profile', action='store_true',
+                     help="Also report the sub-stages of the customer and company pipelines")
+
+    append = commands.add_parser('append', help="Fold delta exports of new quotations into saved customer analytics")
+    append.add_argument('deltas', nargs='*', help="Delta CSVs with only the new quotation rows, in export order")
+    append.add_argument('--state', required=True, help="Directory holding the incremental state")
+    append.add_argument('--init', default=None, help="Full quotation CSV to (re)build the state from first")
+    append.add_argument('--verify', default=None,
+                        help="Full CSV (history plus every delta); fail unless a full recompute matches the state")
+    append.add_argument('--out', default=None, help="Also write the updated customer analytics to this directory")
+    append.add_argument('--format', nargs='+', choices=list(EXPORT_FORMATS), default=['csv'],
+                        help="Output formats for --out (default: csv)")
+    append.add_argument('--date-format', default=None, help="strftime format of the Date column (default: detected)")
+
+    history = commands.add_parser('history', help="Customer analytics as of every month end, with retention and "
+                                                  "segment migration over time")
+    history.add_argument('input', help="Quotation CSV export")
+    history.add_argument('--out', required=True, help="Directory for the output files")
+    history.add_argument('--start', default=None,
+                         help="First month end on or after this date (default: first quotation)")
+    history.add_argument('--end', default=None, help="Last month end on or before this date (default: last quotation)")
+    history.add_argument('--format', nargs='+', choices=list(EXPORT_FORMATS), default=['csv'],
+                         help="Output formats (default: csv)")
+    history.add_argument('--date-format', default=None, help="strftime format of the Date column (default: detected)")
+    return parser
+
+
+def run_command(args) -> int:
+    profiler = Profiler('cli') if args.profile else None
+    result = run_pipeline(args.input, date_format=args.date_format, profiler=profiler, as_of=args.as_of,
+                          chunksize=args.chunksize)
+    if result.frames():
+        run_stage(result, 'write', lambda: (write_outputs(result, args.out, args.format), None))
+
+    if args.json:
+        report = {
+            'input': args.input,
+            'out': args.out,
+            'ok': result.ok,
+            'stages': [vars(stage) for stage in result.stages],
+        }
+        if profiler is not None:
+            report['profile'] = profiler.to_dict()
+        print(json.dumps(report, indent=2))
+    else:
+        for stage in result.stages:
+            status = f"FAILED: {stage.error}" if stage.error else (f"{stage.rows} rows" if stage.rows else "ok")
+            print(f"{stage.name:<10} {stage.seconds:8.3f}s  {status}")
+        print(f"{'total':<10} {sum(result.timings().values()):8.3f}s")
+        if profiler is not None:
+            print()
+            print(profiler.to_frame().to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    return 0 if result.ok else 1
+
+
+def append_command(args) -> int:
+    if args.init:
+        start = time.perf_counter()
+        state = build_state(read_quotations(args.init, args.date_format))
+        print(f"{'init':<10} {time.perf_counter() - start:8.3f}s  {len(state.customers)} customers")
+    elif has_state(args.state):
+        state = load_state(args.state)
+    else:
+        print(f"No incremental state in {args.state}; pass --init with a full export first", file=sys.stderr)
+        return 2
+
+    # One timestamp for the whole run, so idle times agree between deltas and the verification
+    today = pd.Timestamp.now()
+    for delta in args.deltas:
+        start = time.perf_counter()
+        state, affected = apply_delta(state, read_quotations(delta, args.date_format), today)
+        print(f"{Path(delta).name:<10} {time.perf_counter() - start:8.3f}s  {len(affected)} customers updated")
+    save_state(state, args.state)
+
+    if args.out:
+        out_dir = Path(args.out)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        for fmt in args.format:
+            with open(out_dir / export_file_name('customers', fmt), 'wb') as sink:
+                write_export(state.customers, fmt, sink)
+
+    if args.verify:
+        start = time.perf_counter()
+        problems = verify_state(state, read_quotations(args.verify, args.date_format), today)
+        status = "OK" if not problems else f"FAILED: {len(problems)} differences"
+        print(f"{'verify':<10} {time.perf_counter() - start:8.3f}s  {status}")
+        for problem in problems:
+            print(f"  {problem}")
+        return 1 if problems else 0
+    return 0
+
+
+def history_command(args) -> int:
+    start = time.perf_counter()
+    data = read_quotations(args.input, args.date_format)
+    dates = month_ends(data['Date'], args.start, args.end)
+    if dates.empty:
+        print(f"No month ends between {args.start or 'the first'} and {args.end or 'the last'} quotation",
+              file=sys.stderr)
+        return 2
+    history = customer_history(data, dates)
+    outputs = {
+        'customer_history': history,
+        'history_summary': history_summary(history),
+        'segment_migration': segment_migration(history),
+    }
+    print(f"{'history':<10} {time.perf_counter() - start:8.3f}s  {len(dates)} month ends, {len(history)} rows")
+
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for name, frame in outputs.items():
+        for fmt in args.format:
+            with open(out_dir / export_file_name(name, fmt), 'wb') as sink:
+                write_export(frame, fmt, sink)
+    return 0
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == 'run':
+        return run_command(args)
+    if args.command == 'append':
+        return append_command(args)
+    if args.command == 'history':
+        return history_command(args)
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,190 @@
+import hashlib
+import os
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_MAX_BYTES = int(float(os.environ.get('CRA_CACHE_MAX_MB', '512')) * 1024 * 1024)
+DEFAULT_DISK_DIR = os.environ.get('CRA_CACHE_DIR') or None
+
+
+def _compute_code_version() -> str:
+    """Hash the source of every module in the processing package."""
+    digest = hashlib.sha256()
+    package_dir = Path(__file__).resolve().parent
+    for path in sorted(package_dir.glob('*.py')):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+CODE_VERSION = _compute_code_version()
+
+
+def content_key(data: bytes, *parts) -> str:
+    """Build a cache key from raw upload bytes, the processing code version and extra parts."""
+    digest = hashlib.sha256()
+    digest.update(CODE_VERSION.encode())
+    for part in parts:
+        digest.update(b'\x00')
+        digest.update(str(part).encode())
+    digest.update(b'\x00')
+    digest.update(data)
+    return digest.hexdigest()
+
+
+# Containers with more items than this are sized from an evenly spaced sample of their items
+SIZE_SAMPLE_ITEMS = 1000
+
+
+def _sampled_total(items: list, size) -> int:
+    if len(items) <= SIZE_SAMPLE_ITEMS:
+        return sum(size(item) for item in items)
+    step = len(items) / SIZE_SAMPLE_ITEMS
+    sample = [items[int(i * step)] for i in range(SIZE_SAMPLE_ITEMS)]
+    return int(sum(size(item) for item in sample) * step)
+
+
+def estimate_size(value, seen: dict | None = None) -> int:
+    """
+    Approximate resident size of a cached value in bytes, following containers, NumPy arrays and the
+    attributes of plain objects (such as the lookup indexes); large containers are sampled.
+    Objects already in `seen` (id -> object) count as zero, so a frame shared by several values is
+    only counted once when the same mapping is passed to each call.
+    """
+    if seen is None:
+        seen = {}
+    if id(value) in seen:
+        return 0
+    # Keep a reference so the id cannot be reused by another object during the walk
+    seen[id(value)] = value
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        if value.dtype == object:
+            return value.nbytes + _sampled_total(list(value.ravel()), sys.getsizeof)
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + _sampled_total(
+            list(value.items()), lambda item: estimate_size(item[0], seen) + estimate_size(item[1], seen)
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + _sampled_total(list(value), lambda item: estimate_size(item, seen))
+    if hasattr(value, '__dict__') and not callable(value):
+        return sys.getsizeof(value) + estimate_size(vars(value), seen)
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """
+    In-memory LRU cache bounded by an approximate byte budget.
+    Entries evicted from memory are spilled to `disk_dir` when one is configured,
+    and promoted back into memory on the next hit. An entry larger than the whole budget
+    is never kept in memory: it only goes to disk, or is not cached without a disk_dir.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, disk_dir: str | None = DEFAULT_DISK_DIR):
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}.pkl"
+
+    def _evict(self):
+        while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+            key, value = self._entries.popitem(last=False)
+            self.current_bytes -= self._sizes.pop(key)
+            self._spill(key, value)
+
+    def _spill(self, key: str, value):
+        if self.disk_dir is None:
+            return
+        path = self._disk_path(key)
+        if path.exists():
+            return
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as fh:
+            pickle.dump(value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def _store(self, key: str, value):
+        size = estimate_size(value)
+        if key in self._entries:
+            del self._entries[key]
+            self.current_bytes -= self._sizes.pop(key)
+        if size > self.max_bytes:
+            # Larger than the whole budget: only the disk copy is kept (nothing without a disk_dir)
+            self._spill(key, value)
+            return
+        self._entries[key] = value
+        self._sizes[key] = size
+        self.current_bytes += size
+        self._evict()
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            if self.disk_dir is not None and self._disk_path(key).exists():
+                with open(self._disk_path(key), 'rb') as fh:
+                    value = pickle.load(fh)
+                self.disk_hits += 1
+                self._store(key, value)
+                return value
+            self.misses += 1
+            return default
+
+    def put(self, key: str, value):
+        with self._lock:
+            self._store(key, value)
+
+    def get_or_compute(self, key: str, compute):
+        """Return the cached value for `key`, computing and storing it on a miss."""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries or (self.disk_dir is not None and self._disk_path(key).exists())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            'entries': len(self._entries),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+        }
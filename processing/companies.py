@@ -1,50 +1,96 @@
+import numpy as np
 import pandas as pd
-import streamlit as st
 
+from processing.ingest import prepare_quotations, rows_as_of
+from processing.profiling import Profiler, get_profiler
 
-def process_company_data(df: pd.DataFrame) -> pd.DataFrame:
-    """Process company-level data to generate company analytics."""
+
+COMPANY_KEYS = ['Company', 'Country']
+VALID_COUNTRIES = ['UAE', 'KSA', 'Gulf', 'Kuwait', 'Egypt', 'Oman', 'Lebanon', 'Levant', 'Out Side UAE', 'Jordan']
+OTHER_COUNTRY = 'Others'
+
+
+def map_countries(locations: pd.Series, valid_countries=VALID_COUNTRIES) -> pd.Series:
+    """
+    Categorical Country column from the Location column: stripped locations listed in
+    `valid_countries` are kept, everything else (including missing values) becomes 'Others'.
+    The mapping is computed once per distinct location rather than once per row.
+    """
+    locations = locations.astype('category')
+    stripped = locations.cat.categories.astype(str).str.strip()
+    mapped = np.where(stripped.isin(valid_countries), stripped, OTHER_COUNTRY)
+    countries = pd.Index(np.append(mapped, OTHER_COUNTRY)).unique().sort_values()
+    # Code -1 (missing location) picks the trailing 'Others' entry
+    lookup = np.append(countries.get_indexer(mapped), countries.get_loc(OTHER_COUNTRY))
+    codes = lookup[locations.cat.codes.to_numpy()]
+    return pd.Series(pd.Categorical.from_codes(codes, categories=countries), index=locations.index, name='Country')
+
+
+def _unique_sorted_lists(group_ids: np.ndarray, values: pd.Series, n_groups: int) -> tuple[list, np.ndarray]:
+    """
+    Sorted distinct non-missing `values` per group id, as Python lists, plus the list lengths.
+    Categorical `values` sort by their (lexically ordered) categories.
+    """
+    values = values.astype('category')
+    codes = values.cat.codes.to_numpy()
+    pairs = pd.DataFrame({'group': group_ids, 'code': codes})
+    pairs = pairs[(pairs['group'] >= 0) & (pairs['code'] >= 0)].drop_duplicates().sort_values(['group', 'code'])
+    counts = np.bincount(pairs['group'].to_numpy(), minlength=n_groups)
+    labels = values.cat.categories.to_numpy(dtype=object)[pairs['code'].to_numpy()]
+    lists = [chunk.tolist() for chunk in np.split(labels, np.cumsum(counts)[:-1])]
+    return lists, counts
+
+
+def process_company_data(df: pd.DataFrame, profiler: Profiler | None = None, as_of=None):
+    """
+    Process company-level data to generate company analytics.
+    With `as_of`, only quotations dated on or before it are rolled up.
+    Stages are recorded on `profiler`; without one, CRA_PROFILE=1 profiles the run and logs it as JSON.
+    Returns (company_df, error_message_or_None); company_df is empty on error.
+    """
+    owned = profiler is None
+    profiler = get_profiler(profiler, 'companies')
     try:
-        data = df.copy()
-        data.columns = data.columns.str.strip()
-
-        if 'Location' in data.columns:
-            data['Country'] = data['Location'].astype(str).str.strip()
-            valid_countries = ['UAE', 'KSA', 'Gulf', 'Kuwait', 'Egypt', 'Oman', 'Lebanon', 'Levant', 'Out Side UAE', 'Jordan']
-            data['Country'] = data['Country'].apply(lambda x: x if x in valid_countries else 'Others')
-        else:
-            data['Country'] = 'Unknown'
-
-        if 'Company' not in data.columns:
-            data['Company'] = 'Unknown'
-        if 'Client' not in data.columns:
-            data['Client'] = 'Unknown'
-        if 'ClientID' not in data.columns:
-            data['ClientID'] = 'Unknown'
-
-        numeric_columns = ['Taxable amount', 'converted to invoice (AMOUNT)']
-        existing_numeric_cols = [col for col in numeric_columns if col in data.columns]
-        data[existing_numeric_cols] = data[existing_numeric_cols].apply(pd.to_numeric, errors='coerce')
-
-        company_data = data.groupby(['Company', 'Country']).agg({
-            'Client': lambda x: sorted(x.dropna().unique().tolist()),
-            'ClientID': lambda x: sorted(x.dropna().unique().tolist()),
-            'Number': 'count',
-            'Estimate status': lambda x: (x == 'Closed').sum(),
-            'Taxable amount': 'sum',
-            'converted to invoice (AMOUNT)': 'sum'
-        }).reset_index()
-
-        company_data.columns = ['Company', 'Country', 'Representatives', 'ClientIDs',
-                                'Total_Quotes', 'Closed_Quotes', 'Total_Value',
-                                'Total_Revenue']
-
-        company_data['Total_Clients'] = company_data['ClientIDs'].apply(len)
+        data = profiler.call('companies.ingest', prepare_quotations, df)
+        if as_of is not None:
+            data = profiler.call('companies.as_of', rows_as_of, data, as_of)
+
+        with profiler.stage('companies.rollup', rows_in=len(data)) as stage:
+            keys = pd.DataFrame(index=data.index)
+            keys['Company'] = data['Company'] if 'Company' in data.columns else 'Unknown'
+            keys['Country'] = map_countries(data['Location']) if 'Location' in data.columns else 'Unknown'
+
+            values = keys.assign(
+                Number=data['Number'],
+                Closed=(data['Estimate status'] == 'Closed').astype('int64'),
+                Value=data['Taxable amount'],
+                Revenue=data['converted to invoice (AMOUNT)'],
+            )
+            groups = values.groupby(COMPANY_KEYS, observed=True)
+            company_data = groups.agg(
+                Total_Quotes=('Number', 'count'),
+                Closed_Quotes=('Closed', 'sum'),
+                Total_Value=('Value', 'sum'),
+                Total_Revenue=('Revenue', 'sum'),
+            ).reset_index()
+            stage.rows_out = len(company_data)
+
+        with profiler.stage('companies.client_lists', rows_in=len(data)) as stage:
+            clients = data['Client'] if 'Client' in data.columns else pd.Series('Unknown', index=data.index)
+            client_ids = data['ClientID'] if 'ClientID' in data.columns else pd.Series('Unknown', index=data.index)
+            # Rows with a blank Company belong to no group (NaN id); -1 leaves them out of the lists
+            group_ids = groups.ngroup().fillna(-1).to_numpy(dtype='int64')
+            company_data.insert(2, 'Representatives', _unique_sorted_lists(group_ids, clients, len(company_data))[0])
+            client_id_lists, client_counts = _unique_sorted_lists(group_ids, client_ids, len(company_data))
+            company_data.insert(3, 'ClientIDs', client_id_lists)
+            stage.rows_out = len(company_data)
+
+        company_data['Total_Clients'] = client_counts
         company_data['Win_Rate_%'] = (company_data['Closed_Quotes'] / company_data['Total_Quotes'] * 100).fillna(0)
         company_data = company_data.sort_values('Total_Revenue', ascending=False)
-        return company_data
+        return company_data, None
     except Exception as e:
-        st.error(f"Error processing company data: {str(e)}")
-        return pd.DataFrame()
-
-
+        return pd.DataFrame(), f"Error processing company data: {str(e)}"
+    finally:
+        if owned and profiler.enabled:
+            profiler.log()
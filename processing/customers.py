@@ -1,190 +1,232 @@
 import pandas as pd
 import numpy as np
 
+from processing.ingest import as_of_cutoff, prepare_quotations, rows_as_of
+from processing.profiling import NULL_PROFILER, Profiler, get_profiler
+from processing.services import SERVICE_COLUMNS, calculate_service_metrics, service_metric_columns, top_service
 
-def process_customer_data(df: pd.DataFrame):
-    """
-    Process raw customer data to generate analytics.
-    Returns (processed_df, error_message_or_None).
-    """
-    try:
-        data = df.copy()
-        data.columns = data.columns.str.strip()
-
-        service_columns = ['CME', 'Design', 'Med Com', 'Multichannel', 'Onsite Support',
-                           'Other Services', 'Video', 'Webinars', 'Websites']
-        numeric_columns = service_columns + ['Taxable amount', 'converted to invoice (AMOUNT)']
-        existing_numeric_cols = [col for col in numeric_columns if col in data.columns]
-        data[existing_numeric_cols] = data[existing_numeric_cols].apply(pd.to_numeric, errors='coerce')
-
-        try:
-            data['Date'] = pd.to_datetime(data['Date'], format='%d/%m/%Y')
-        except Exception:
-            data['Date'] = pd.to_datetime(data['Date'], errors='coerce')
-
-        if 'Number' in data.columns:
-            data['Project_Number'] = data['Number'].astype(str).str.split('.').str[3]
-
-            def extract_version(number_str):
-                try:
-                    parts = str(number_str).split('.')
-                    if len(parts) >= 5:
-                        version_str = parts[4]
-                        try:
-                            return float(version_str)
-                        except Exception:
-                            import re
-                            numeric = re.findall(r'\d+', version_str)
-                            if numeric:
-                                return float(numeric[0]) + 0.1
-                            return 1.0
-                    return 1.0
-                except Exception:
-                    return 1.0
-
-            data['Version_Number'] = data['Number'].apply(extract_version)
-            data['Quote_ID'] = data['Number'].astype(str).str.rsplit('.', n=1).str[0]
-        else:
-            data['Project_Number'] = range(len(data))
-            data['Quote_ID'] = range(len(data))
-            data['Version_Number'] = 1.0
 
-        data_latest = data.sort_values('Version_Number').groupby(['ClientID', 'Quote_ID']).tail(1).copy()
+# Highest precedence first: a quotation with any Closed version is Closed, then Pending, otherwise Rejected
+STATUS_PRECEDENCE = ('Closed', 'Pending', 'Rejected')
 
-        def get_project_status(group):
-            if (group['Estimate status'] == 'Closed').any():
-                return 'Closed'
-            return 'Rejected'
+QUOTE_KEYS = ['ClientID', 'Quote_ID']
+# Latest-version fields carried per quotation alongside the service columns
+QUOTE_FIELDS = ['Project_Number', 'Name', 'Taxable amount', 'converted to invoice (AMOUNT)']
 
-        if 'Estimate status' in data.columns:
-            project_status = data.groupby(['ClientID', 'Quote_ID']).apply(get_project_status).reset_index(name='Final_Project_Status')
-            data_latest = data_latest.merge(project_status[['ClientID', 'Quote_ID', 'Final_Project_Status']], on=['ClientID', 'Quote_ID'], how='left')
-            data_latest['Project_Status_For_Counting'] = data_latest['Final_Project_Status']
-        else:
-            data_latest['Project_Status_For_Counting'] = 'Unknown'
-
-        agg_dict = {
-            'Date': ['min', 'max'],
-            'Quote_ID': 'nunique',
-            'Project_Status_For_Counting': [
-                ('Closed', lambda x: (x == 'Closed').sum()),
-                ('Rejected', lambda x: (x == 'Rejected').sum()),
-            ],
-            'Taxable amount': 'sum' if 'Taxable amount' in data_latest.columns else (lambda x: 0),
-            'converted to invoice (AMOUNT)': 'sum' if 'converted to invoice (AMOUNT)' in data_latest.columns else (lambda x: 0),
-            'Name': 'nunique' if 'Name' in data_latest.columns else (lambda x: 1),
-            'Project_Number': 'nunique',
-        }
-
-        for col in service_columns:
-            if col in data_latest.columns:
-                agg_dict[col] = 'sum'
 
-        client_data = data_latest.groupby('ClientID').agg(agg_dict).reset_index()
+def _as_float_array(values, length: int) -> np.ndarray:
+    """Broadcast a column or scalar to a float array of the given length."""
+    return np.broadcast_to(np.asarray(values, dtype=float), (length,)).astype(float)
 
-        client_data.columns = ['_'.join(str(c) for c in col).strip() if isinstance(col, tuple) and col[1] else (col[0] if isinstance(col, tuple) else col) for col in client_data.columns.values]
 
-        client_data['First_Quote_Date'] = client_data['Date_min']
-        client_data['Last_Quote_Date'] = client_data['Date_max']
-        client_data['Years_Active'] = (client_data['Last_Quote_Date'] - client_data['First_Quote_Date']).dt.days / 365
-        client_data['Years_Active'] = client_data['Years_Active'].replace(0, 0.003)
+def calculate_projects_per_year(years_active, projects) -> np.ndarray:
+    """Projects per year; customers active for under a year keep their raw project count."""
+    years = np.asarray(years_active, dtype=float)
+    projects = _as_float_array(projects, len(years))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(years < 1, projects, projects / years)
 
-        today = pd.Timestamp.now()
-        client_data['Idle_Time_Days'] = (today - client_data['Last_Quote_Date']).dt.days
-        client_data['Idle_Time_Years'] = client_data['Idle_Time_Days'] / 365
 
-        try:
-            avg_days = data_latest.groupby('ClientID')['Date'].apply(lambda x: x.sort_values().diff().mean().days if len(x) > 1 else 0).reset_index(name='Average_Days_Between_Quotes')
-            client_data = client_data.merge(avg_days, on='ClientID', how='left')
-        except Exception:
-            client_data['Average_Days_Between_Quotes'] = 30
+def calculate_retention_rate(years_active, avg_days_between_quotes, total_quotations, converted_quotations) -> np.ndarray:
+    """
+    Retention score in [0, 1] blending conversion (50%), engagement cadence (20%) and tenure (30%).
+    Customers with a single quotation score 1.0 if it converted, else 0.0.
+    """
+    years = np.asarray(years_active, dtype=float)
+    n = len(years)
+    avg_days = _as_float_array(avg_days_between_quotes, n)
+    total = _as_float_array(total_quotations, n)
+    converted = _as_float_array(converted_quotations, n)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        conversion_factor = np.where(total > 0, converted / total, 0.0)
+    # NaN cadence falls through to the neutral 0.5 engagement, NaN tenure counts as fully active
+    engagement_factor = np.where(avg_days > 0, np.clip((365 - avg_days) / 365, 0, 1), 0.5)
+    activity_factor = np.fmin(1.0, years / 5.0)
+    retention = (conversion_factor * 0.5) + (engagement_factor * 0.2) + (activity_factor * 0.3)
+    retention = np.fmax(0.0, np.fmin(1.0, retention))
+
+    single_quote = np.where(converted > 0, 1.0, 0.0)
+    return np.where(total <= 1, single_quote, retention)
+
+
+def segment_customers(clv, win_rate, converted_quotations) -> np.ndarray:
+    """High / Medium / Low value segmentation; missing values are treated as 0."""
+    clv = np.nan_to_num(np.asarray(clv, dtype=float), nan=0.0)
+    win_rate = np.nan_to_num(np.asarray(win_rate, dtype=float), nan=0.0)
+    converted = np.nan_to_num(_as_float_array(converted_quotations, len(clv)), nan=0.0)
+    return np.select(
+        [
+            (clv >= 75000) & (win_rate >= 40),
+            (clv >= 30000) | ((win_rate >= 60) & (converted >= 3)),
+        ],
+        ['High', 'Medium'],
+        default='Low',
+    ).astype(object)
+
+
+def status_ranks(statuses: pd.Series, precedence=STATUS_PRECEDENCE) -> pd.Series:
+    """Rank of each status in `precedence` (0 = highest); statuses not listed rank lowest."""
+    lowest = len(precedence) - 1
+    lookup = {status: rank for rank, status in enumerate(precedence)}
+    if isinstance(statuses.dtype, pd.CategoricalDtype):
+        # Rank each category once; code -1 (missing) picks the trailing lowest rank
+        category_ranks = np.array([lookup.get(status, lowest) for status in statuses.cat.categories] + [lowest], dtype='int8')
+        return pd.Series(category_ranks[statuses.cat.codes.to_numpy()], index=statuses.index)
+    return statuses.map(lookup).fillna(lowest).astype('int8')
+
+
+def calculate_quote_cadence(client_ids: pd.Series, dates: pd.Series) -> pd.DataFrame:
+    """
+    Gap statistics between consecutive quotations of each client, in days, from one sort and a grouped diff.
+    Average_Days_Between_Quotes is floored to whole days; clients with a single quotation get 0 for every metric.
+    Returns a frame indexed by ClientID.
+    """
+    frame = pd.DataFrame({'ClientID': client_ids.reset_index(drop=True), 'Date': dates.reset_index(drop=True)})
+    frame = frame.sort_values(['ClientID', 'Date'], kind='stable')
+    gap_days = frame.groupby('ClientID', sort=False, observed=True)['Date'].diff() / pd.Timedelta(days=1)
 
-        def calculate_projects_per_year(row):
-            years = row['Years_Active']
-            projects = row.get('Project_Number_nunique', 1)
-            return projects if years < 1 else projects / years
+    grouped = gap_days.groupby(frame['ClientID'], sort=False, observed=True)
+    cadence = grouped.agg(['mean', 'median', 'max', 'last'])
+    cadence['mean'] = np.floor(cadence['mean'] + 1e-9)
+    cadence.columns = ['Average_Days_Between_Quotes', 'Median_Days_Between_Quotes',
+                       'Max_Days_Between_Quotes', 'Last_Days_Between_Quotes']
 
-        client_data['Projects_Per_Year'] = client_data.apply(calculate_projects_per_year, axis=1)
+    single_quote = grouped.size() <= 1
+    cadence.loc[single_quote, :] = 0
+    return cadence
 
-        client_data['Project_Diversity'] = client_data.get('Name_nunique', 1)
-        client_data['Total_Project_Value'] = client_data.get('Taxable amount_sum', 0).fillna(0)
-        client_data['CLV'] = client_data.get('converted to invoice (AMOUNT)_sum', 0).fillna(0)
-        client_data['Total_Quotations'] = client_data.get('Quote_ID_nunique', 1)
 
-        if 'Project_Status_For_Counting_Closed' in client_data.columns:
-            client_data['Converted_Quotations'] = client_data['Project_Status_For_Counting_Closed']
-        else:
-            client_data['Converted_Quotations'] = 0
-        if 'Project_Status_For_Counting_Rejected' in client_data.columns:
-            client_data['Lost_Quotations'] = client_data['Project_Status_For_Counting_Rejected']
+def _reduce_quotes(rows: pd.DataFrame) -> pd.DataFrame:
+    """
+    Collapse rows sharing (ClientID, Quote_ID) into one: the highest version's fields are kept
+    (later rows win ties), Status_Rank takes the minimum and the counters are summed.
+    """
+    rolled = [col for col in rows.columns if col in ('Offer_Count', 'Status_Rank') or col.startswith('AllVersions_')]
+    reducers = {col: ('min' if col == 'Status_Rank' else 'sum') for col in rolled}
+    totals = rows.groupby(QUOTE_KEYS, sort=False, observed=True)[rolled].agg(reducers)
+    latest = (
+        rows.drop(columns=rolled)
+        .sort_values('Version_Number', kind='stable')
+        .drop_duplicates(QUOTE_KEYS, keep='last')
+        .set_index(QUOTE_KEYS)
+    )
+    return latest.join(totals).reset_index()
+
+
+def build_quote_table(data: pd.DataFrame, status_precedence=STATUS_PRECEDENCE) -> pd.DataFrame:
+    """
+    Reduce prepared quotation rows to one row per (ClientID, Quote_ID) holding the latest version's
+    fields plus mergeable partial aggregates: Status_Rank (best status across versions), Offer_Count
+    (versions sent) and AllVersions_<service> (service sums across versions).
+    """
+    columns = QUOTE_KEYS + ['Date', 'Version_Number'] + [col for col in QUOTE_FIELDS + SERVICE_COLUMNS if col in data.columns]
+    rows = data[columns].copy()
+    rows['Offer_Count'] = data['Number'].notna().astype('int64') if 'Number' in data.columns else 1
+    if 'Estimate status' in data.columns:
+        rows['Status_Rank'] = status_ranks(data['Estimate status'], status_precedence)
+    for svc in SERVICE_COLUMNS:
+        if svc in rows.columns:
+            # Stored as float32 in the raw frame; aggregate in float64
+            rows[svc] = rows[svc].astype('float64')
+            rows[f'AllVersions_{svc}'] = rows[svc]
+    return _reduce_quotes(rows.dropna(subset=QUOTE_KEYS))
+
+
+def merge_quote_tables(tables) -> pd.DataFrame:
+    """Merge quote tables built from disjoint row batches (in file order) into one quote table."""
+    tables = [table for table in tables if table is not None]
+    if len(tables) == 1:
+        return tables[0]
+    return _reduce_quotes(pd.concat(tables, ignore_index=True))
+
+
+def add_idle_time(client_data: pd.DataFrame, today: pd.Timestamp):
+    """Set Idle_Time_Days/Years: time from each client's last quotation to `today`."""
+    client_data['Idle_Time_Days'] = (today - client_data['Last_Quote_Date']).dt.days
+    client_data['Idle_Time_Years'] = client_data['Idle_Time_Days'] / 365
+
+
+def summarize_clients(quotes: pd.DataFrame, status_precedence=STATUS_PRECEDENCE,
+                      profiler: Profiler = NULL_PROFILER, today: pd.Timestamp | None = None) -> pd.DataFrame:
+    """
+    Roll a quote table up to one analytics row per ClientID, timing each step on `profiler`.
+    Idle time is measured up to `today` (default: now).
+    """
+    with profiler.stage('customers.client_aggregates', rows_in=len(quotes)) as stage:
+        quotes = quotes.copy()
+        if 'Status_Rank' in quotes.columns:
+            final_status = np.asarray(status_precedence, dtype=object)[quotes['Status_Rank'].to_numpy(dtype=int)]
+            quotes['Is_Converted'] = final_status == 'Closed'
+            quotes['Is_Lost'] = final_status == 'Rejected'
         else:
-            client_data['Lost_Quotations'] = 0
+            quotes['Is_Converted'] = False
+            quotes['Is_Lost'] = False
+
+        aggregations = {
+            'First_Quote_Date': ('Date', 'min'),
+            'Last_Quote_Date': ('Date', 'max'),
+            'Total_Quotations': ('Quote_ID', 'size'),
+            'Converted_Quotations': ('Is_Converted', 'sum'),
+            'Lost_Quotations': ('Is_Lost', 'sum'),
+            'Project_Number_nunique': ('Project_Number', 'nunique'),
+            'Total_Offers_Sent': ('Offer_Count', 'sum'),
+        }
+        if 'Taxable amount' in quotes.columns:
+            aggregations['Total_Project_Value'] = ('Taxable amount', 'sum')
+        if 'converted to invoice (AMOUNT)' in quotes.columns:
+            aggregations['CLV'] = ('converted to invoice (AMOUNT)', 'sum')
+        if 'Name' in quotes.columns:
+            aggregations['Project_Diversity'] = ('Name', 'nunique')
+        client_data = quotes.groupby('ClientID', observed=True).agg(**aggregations).reset_index()
 
-        client_data['Win_Rate_%'] = (client_data['Converted_Quotations'] / client_data['Total_Quotations']) * 100
-        client_data['Loss_Rate_%'] = (client_data['Lost_Quotations'] / client_data['Total_Quotations']) * 100
+        client_data['Years_Active'] = (client_data['Last_Quote_Date'] - client_data['First_Quote_Date']).dt.days / 365
+        client_data['Years_Active'] = client_data['Years_Active'].replace(0, 0.003)
+
+        add_idle_time(client_data, pd.Timestamp.now() if today is None else today)
+        stage.rows_out = len(client_data)
+
+    with profiler.stage('customers.cadence', rows_in=len(quotes)) as stage:
+        cadence = calculate_quote_cadence(quotes['ClientID'], quotes['Date'])
+        client_data = client_data.join(cadence, on='ClientID')
+        stage.rows_out = len(client_data)
 
-        existing_service_cols = [col for col in service_columns if col in data_latest.columns]
+    with profiler.stage('customers.service_metrics', rows_in=len(quotes)) as stage:
+        existing_service_cols = [col for col in SERVICE_COLUMNS if col in quotes.columns]
         if existing_service_cols:
-            service_totals = data_latest.groupby('ClientID')[existing_service_cols].sum().fillna(0)
-            client_data['Top_Service_by_Volume'] = service_totals.apply(lambda row: row.idxmax() if row.max() > 0 else 'No Service', axis=1).values
-            client_data['Top_Service_by_Value'] = service_totals.apply(lambda row: row.idxmax() if row.max() > 0 else 'No Service', axis=1).values
-            client_data['Revenue_by_Service'] = service_totals.sum(axis=1).values
-
-            svc_rev_sum = service_totals.sum(axis=1).replace({0: np.nan})
-            service_revenue_pct = service_totals.div(svc_rev_sum, axis=0).fillna(0)
-            service_revenue_pct_dict = service_revenue_pct.apply(lambda row: {col: float(row[col]) for col in existing_service_cols if row[col] > 0}, axis=1).to_dict()
-            client_data['Service_Revenue_Breakdown'] = client_data['ClientID'].map(service_revenue_pct_dict).fillna({})
-
-            avg_service_rev = service_totals.div(client_data.set_index('ClientID')['Total_Quotations'].replace(0, np.nan), axis=0).fillna(0)
-            avg_service_rev_dict = avg_service_rev.apply(lambda row: {col: float(row[col]) for col in existing_service_cols if row[col] > 0}, axis=1).to_dict()
-            client_data['Service_Avg_Revenue_Per_Project'] = client_data['ClientID'].map(avg_service_rev_dict).fillna({})
-
-            service_total_rev_dict = service_totals.apply(lambda row: {col: float(row[col]) for col in existing_service_cols if row[col] != 0}, axis=1).to_dict()
-            client_data['Service_Total_Revenue'] = client_data['ClientID'].map(service_total_rev_dict).fillna({})
-
-            proj_diversity_pct_dict = {}
-            try:
-                proj_service_presence = data.groupby(['ClientID', 'Quote_ID'])[existing_service_cols].sum().gt(0).astype(int)
-                proj_service_counts = proj_service_presence.groupby('ClientID').sum()
-                total_projects_series = client_data.set_index('ClientID')['Total_Quotations'].replace(0, np.nan)
-                proj_diversity_pct = proj_service_counts.div(total_projects_series, axis=0).fillna(0)
-                proj_diversity_pct_dict = proj_diversity_pct.apply(lambda row: {col: float(row[col]) for col in existing_service_cols if row[col] > 0}, axis=1).to_dict()
-                client_data['Project_Diversity_Breakdown'] = client_data['ClientID'].map(proj_diversity_pct_dict).fillna({})
-            except Exception:
-                client_data['Project_Diversity_Breakdown'] = client_data['ClientID'].apply(lambda x: {})
-
-            for svc in existing_service_cols:
-                client_data[f'Total_{svc}'] = client_data['ClientID'].map(lambda cid: service_total_rev_dict.get(cid, {}).get(svc, 0.0))
-                client_data[f'AvgPerProject_{svc}'] = client_data['ClientID'].map(lambda cid: avg_service_rev_dict.get(cid, {}).get(svc, 0.0))
-                client_data[f'ProjectDiversity_{svc}'] = client_data['ClientID'].map(lambda cid: proj_diversity_pct_dict.get(cid, {}).get(svc, 0.0))
+            service_metrics = calculate_service_metrics(
+                quotes, existing_service_cols, client_data.set_index('ClientID')['Total_Quotations']
+            )
+            service_totals = service_metrics[[f'Total_{svc}' for svc in existing_service_cols]]
+            service_totals.columns = existing_service_cols
+            client_data['Top_Service_by_Volume'] = top_service(service_totals)
+            client_data['Top_Service_by_Value'] = client_data['Top_Service_by_Volume']
+            client_data['Revenue_by_Service'] = service_totals.sum(axis=1).to_numpy()
+            client_data = pd.concat([client_data, service_metrics.reset_index(drop=True)], axis=1)
         else:
             client_data['Top_Service_by_Volume'] = 'No Service'
             client_data['Top_Service_by_Value'] = 'No Service'
             client_data['Revenue_by_Service'] = 0
-            client_data['Service_Revenue_Breakdown'] = client_data['ClientID'].apply(lambda x: {})
-            client_data['Project_Diversity_Breakdown'] = client_data['ClientID'].apply(lambda x: {})
-            for svc in service_columns:
-                client_data[f'Total_{svc}'] = 0.0
-                client_data[f'AvgPerProject_{svc}'] = 0.0
-                client_data[f'ProjectDiversity_{svc}'] = 0.0
-
-        def calculate_retention_rate(row):
-            years_active = row['Years_Active']
-            avg_days = row.get('Average_Days_Between_Quotes', 0)
-            total_quotes = row['Total_Quotations']
-            converted = row['Converted_Quotations']
-            if total_quotes <= 1:
-                return 1.0 if converted > 0 else 0.0
-            conversion_factor = converted / total_quotes if total_quotes > 0 else 0
-            if avg_days > 0:
-                engagement_factor = max(0, min(1, (365 - avg_days) / 365))
-            else:
-                engagement_factor = 0.5
-            activity_factor = min(1.0, years_active / 5.0)
-            retention = (conversion_factor * 0.5) + (engagement_factor * 0.2) + (activity_factor * 0.3)
-            return max(0, min(1, retention))
-
-        client_data['Retention_Rate'] = client_data.apply(calculate_retention_rate, axis=1)
+        stage.rows_out = len(client_data)
+
+    with profiler.stage('customers.scoring', rows_in=len(client_data)) as stage:
+        client_data['Projects_Per_Year'] = calculate_projects_per_year(
+            client_data['Years_Active'], client_data['Project_Number_nunique']
+        )
+
+        client_data['Project_Diversity'] = client_data.get('Project_Diversity', 1)
+        client_data['Total_Project_Value'] = client_data.get('Total_Project_Value', 0)
+        client_data['CLV'] = client_data.get('CLV', 0)
+
+        client_data['Win_Rate_%'] = (client_data['Converted_Quotations'] / client_data['Total_Quotations']) * 100
+        client_data['Loss_Rate_%'] = (client_data['Lost_Quotations'] / client_data['Total_Quotations']) * 100
+
+        client_data['Retention_Rate'] = calculate_retention_rate(
+            client_data['Years_Active'],
+            client_data['Average_Days_Between_Quotes'],
+            client_data['Total_Quotations'],
+            client_data['Converted_Quotations'],
+        )
         client_data['Churn_Rate'] = 1 - client_data['Retention_Rate']
 
         client_data['Quote_to_Project_Ratio'] = np.where(
@@ -193,8 +235,6 @@ def process_customer_data(df: pd.DataFrame):
             client_data['Total_Quotations']
         )
 
-        all_quotes_per_client = data.groupby('ClientID')['Number'].count().to_dict()
-        client_data['Total_Offers_Sent'] = client_data['ClientID'].map(all_quotes_per_client).fillna(0)
         client_data['OCDS'] = np.where(
             client_data['Converted_Quotations'] > 0,
             client_data['Total_Offers_Sent'] / client_data['Converted_Quotations'],
@@ -206,33 +246,48 @@ def process_customer_data(df: pd.DataFrame):
             0
         )
 
-        def segment_customer(row):
-            clv = row['CLV'] if not pd.isna(row['CLV']) else 0
-            win_rate = row['Win_Rate_%'] if not pd.isna(row['Win_Rate_%']) else 0
-            converted_deals = row['Converted_Quotations'] if not pd.isna(row['Converted_Quotations']) else 0
-            if clv >= 75000 and win_rate >= 40:
-                return 'High'
-            elif clv >= 30000 or (win_rate >= 60 and converted_deals >= 3):
-                return 'Medium'
-            else:
-                return 'Low'
-
-        client_data['Customer_Segment'] = client_data.apply(segment_customer, axis=1)
-
-        final_columns = [
-            'ClientID', 'First_Quote_Date', 'Last_Quote_Date', 'Average_Days_Between_Quotes',
-            'Years_Active', 'Projects_Per_Year', 'Project_Diversity', 'Total_Project_Value',
-            'CLV', 'Total_Quotations', 'Converted_Quotations', 'Lost_Quotations',
-            'Win_Rate_%', 'Loss_Rate_%', 'Top_Service_by_Volume', 'Top_Service_by_Value',
-            'Revenue_by_Service', 'Retention_Rate', 'Churn_Rate',
-            'Quote_to_Project_Ratio', 'Customer_Segment', 'Idle_Time_Days', 'Idle_Time_Years',
-            'Total_Offers_Sent', 'OCDS', 'Avg_Offers_per_Project',
-            'Service_Revenue_Breakdown', 'Project_Diversity_Breakdown', 'Service_Total_Revenue', 'Service_Avg_Revenue_Per_Project'
-        ]
-        existing_final_columns = [col for col in final_columns if col in client_data.columns]
-        client_data_clean = client_data[existing_final_columns].copy()
-        return client_data_clean, None
+        client_data['Customer_Segment'] = segment_customers(
+            client_data['CLV'], client_data['Win_Rate_%'], client_data['Converted_Quotations']
+        )
+        stage.rows_out = len(client_data)
+
+    final_columns = [
+        'ClientID', 'First_Quote_Date', 'Last_Quote_Date', 'Average_Days_Between_Quotes',
+        'Median_Days_Between_Quotes', 'Max_Days_Between_Quotes', 'Last_Days_Between_Quotes',
+        'Years_Active', 'Projects_Per_Year', 'Project_Diversity', 'Total_Project_Value',
+        'CLV', 'Total_Quotations', 'Converted_Quotations', 'Lost_Quotations',
+        'Win_Rate_%', 'Loss_Rate_%', 'Top_Service_by_Volume', 'Top_Service_by_Value',
+        'Revenue_by_Service', 'Retention_Rate', 'Churn_Rate',
+        'Quote_to_Project_Ratio', 'Customer_Segment', 'Idle_Time_Days', 'Idle_Time_Years',
+        'Total_Offers_Sent', 'OCDS', 'Avg_Offers_per_Project',
+    ] + service_metric_columns(existing_service_cols)
+    client_data = client_data[final_columns].copy()
+    client_data['ClientID'] = client_data['ClientID'].astype(str)
+    return client_data
+
+
+def process_customer_data(df: pd.DataFrame, status_precedence=STATUS_PRECEDENCE, profiler: Profiler | None = None,
+                          as_of=None):
+    """
+    Process raw customer data to generate analytics.
+    `status_precedence` orders the statuses used to resolve each quotation's final status.
+    With `as_of` (a date or timestamp), only quotations dated on or before it are used and idle time is
+    measured up to it, reproducing the analytics as they stood on that date.
+    Stages are recorded on `profiler`; without one, CRA_PROFILE=1 profiles the run and logs it as JSON.
+    Returns (processed_df, error_message_or_None).
+    """
+    owned = profiler is None
+    profiler = get_profiler(profiler, 'customers')
+    try:
+        data = profiler.call('customers.ingest', prepare_quotations, df)
+        today = None
+        if as_of is not None:
+            data = profiler.call('customers.as_of', rows_as_of, data, as_of)
+            today = as_of_cutoff(as_of)
+        quotes = profiler.call('customers.quote_table', build_quote_table, data, status_precedence)
+        return summarize_clients(quotes, status_precedence, profiler, today), None
     except Exception as e:
         return None, str(e)
-
-
+    finally:
+        if owned and profiler.enabled:
+            profiler.log()
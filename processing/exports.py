@@ -0,0 +1,54 @@
+import gzip
+import io
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+EXPORT_CHUNK_ROWS = 10_000
+
+# format -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    'csv': ('.csv', 'text/csv'),
+    'csv.gz': ('.csv.gz', 'application/gzip'),
+    'parquet': ('.parquet', 'application/vnd.apache.parquet'),
+}
+
+
+def iter_csv_chunks(df: pd.DataFrame, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """Encoded CSV of `df` in pieces of `chunk_rows` rows (header in the first), never one full-table string."""
+    if df.empty:
+        yield df.to_csv(index=False).encode()
+        return
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows].to_csv(index=False, header=start == 0).encode()
+
+
+def write_export(df: pd.DataFrame, fmt: str, sink, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """Stream `df` to the binary file object `sink` as one of EXPORT_FORMATS, `chunk_rows` rows at a time."""
+    if fmt == 'csv':
+        for chunk in iter_csv_chunks(df, chunk_rows):
+            sink.write(chunk)
+    elif fmt == 'csv.gz':
+        with gzip.GzipFile(fileobj=sink, mode='wb') as compressed:
+            for chunk in iter_csv_chunks(df, chunk_rows):
+                compressed.write(chunk)
+    elif fmt == 'parquet':
+        schema = pa.Schema.from_pandas(df, preserve_index=False)
+        with pq.ParquetWriter(sink, schema) as writer:
+            for start in range(0, max(len(df), 1), chunk_rows):
+                chunk = df.iloc[start:start + chunk_rows]
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    else:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+
+def export_bytes(df: pd.DataFrame, fmt: str, chunk_rows: int = EXPORT_CHUNK_ROWS) -> bytes:
+    buffer = io.BytesIO()
+    write_export(df, fmt, buffer, chunk_rows)
+    return buffer.getvalue()
+
+
+def export_file_name(stem: str, fmt: str) -> str:
+    return stem + EXPORT_FORMATS[fmt][0]
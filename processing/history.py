@@ -0,0 +1,162 @@
+"""
+Historical customer analytics: the per-ClientID analytics as they stood at a series of as-of dates
+(month ends by default), computed in one sweep over the quotations sorted by date instead of a full
+recompute per date, plus the retention and segment-migration series derived from them.
+"""
+import numpy as np
+import pandas as pd
+
+from processing.customers import QUOTE_KEYS, STATUS_PRECEDENCE, add_idle_time, build_quote_table, summarize_clients
+from processing.ingest import as_of_cutoff, prepare_quotations
+
+
+SEGMENTS = ('High', 'Medium', 'Low')
+# Quote rows per summarize_clients call of the sweep; bounds memory when many customers quote every month
+SWEEP_BATCH_ROWS = 1_000_000
+# From_Segment of customers whose first quotation falls after the previous snapshot
+NEW_SEGMENT = 'New'
+
+
+def month_ends(dates: pd.Series, start=None, end=None) -> pd.DatetimeIndex:
+    """Month-end dates from the month of the first quotation to that of the last, clipped to [start, end]."""
+    dates = dates.dropna()
+    if dates.empty:
+        return pd.DatetimeIndex([])
+    first = pd.Timestamp(start) if start is not None else dates.min()
+    last = pd.Timestamp(end) if end is not None else dates.max()
+    ends = pd.date_range(first.normalize(), last.normalize() + pd.offsets.MonthEnd(0), freq='ME')
+    return ends[ends <= last] if end is not None else ends
+
+
+def customer_history(df: pd.DataFrame, as_of_dates=None, status_precedence=STATUS_PRECEDENCE) -> pd.DataFrame:
+    """
+    Customer analytics at each of `as_of_dates` (default: every month end covered by the data), stacked
+    with an `As_Of` column. Each snapshot matches process_customer_data(df, as_of=date): only quotations
+    dated on or before the date, idle time measured up to it.
+
+    One sweep instead of a full recompute per date: the quotations are bucketed by the first snapshot
+    they count towards and reduced once to quote events (a quote's row as of each snapshot in which it
+    got a version). A snapshot then only re-summarizes the customers quoted since the previous one,
+    stacked with those of other snapshots into a few summarize_clients calls; everyone else carries
+    their previous row forward with the idle time moved up.
+    """
+    data = prepare_quotations(df)
+    labels = month_ends(data['Date']) if as_of_dates is None else \
+        pd.DatetimeIndex(sorted({pd.Timestamp(date) for date in as_of_dates}))
+    cutoffs = pd.DatetimeIndex([as_of_cutoff(label) for label in labels])
+
+    # Snapshot bucket of each row: rows dated in (cutoff[i-1], cutoff[i]] first count towards snapshot i
+    bucket = np.searchsorted(cutoffs.to_numpy(), data['Date'].to_numpy(), side='left')
+    used = data['Date'].notna().to_numpy() & (bucket < len(cutoffs)) & data[QUOTE_KEYS].notna().all(axis=1).to_numpy()
+    rows, bucket = data[used], bucket[used]
+    if rows.empty:
+        return pd.DataFrame(columns=['As_Of', 'ClientID'])
+    client_of_row, client_ids = pd.factorize(rows['ClientID'].astype(str), sort=True)
+    quote_of_row = rows.groupby(QUOTE_KEYS, sort=False, observed=True).ngroup().to_numpy()
+    n_quotes = quote_of_row.max() + 1
+
+    # Each row counts towards every event of its quote from its own bucket on; rows stay in file order so
+    # ties between equal versions resolve as in a full run over the rows up to each date
+    events = pd.DataFrame({'quote': quote_of_row, 'event': bucket}).drop_duplicates()
+    expanded = pd.DataFrame({'row': np.arange(len(rows)), 'quote': quote_of_row, 'bucket': bucket})
+    expanded = expanded.merge(events, on='quote')
+    expanded = expanded[(expanded['event'] >= expanded['bucket']).to_numpy()].sort_values('row', kind='stable')
+    positions = expanded['row'].to_numpy()
+    event_rows = rows.take(positions).assign(ClientID=expanded['event'].to_numpy() * n_quotes + quote_of_row[positions])
+    quote_events = build_quote_table(event_rows, status_precedence)
+
+    event_key = quote_events['ClientID'].to_numpy(dtype='int64')
+    event_snapshot, event_quote = event_key // n_quotes, event_key % n_quotes
+    event_client = np.empty(n_quotes, dtype='int64')
+    event_client[quote_of_row] = client_of_row
+    event_client = event_client[event_quote]
+    # A quote event holds until the quote's next event (or through the last snapshot)
+    by_quote = np.lexsort((event_snapshot, event_quote))
+    valid_until = np.full(len(event_key), len(cutoffs))
+    later = event_quote[by_quote][1:] == event_quote[by_quote][:-1]
+    valid_until[by_quote[:-1][later]] = event_snapshot[by_quote[1:][later]]
+
+    summaries = []
+    batch = []
+    for snapshot in range(len(cutoffs)):
+        touched = np.zeros(len(client_ids), dtype=bool)
+        touched[event_client[event_snapshot == snapshot]] = True
+        current = touched[event_client] & (event_snapshot <= snapshot) & (valid_until > snapshot)
+        batch.append((snapshot, np.flatnonzero(current)))
+        if sum(len(selected) for _, selected in batch) >= SWEEP_BATCH_ROWS or snapshot == len(cutoffs) - 1:
+            summaries.append(_summarize_batch(quote_events, batch, event_client, len(client_ids), status_precedence))
+            batch = []
+    summaries = pd.concat(summaries, ignore_index=True)
+
+    # Walk the snapshots in order, pointing each customer at their latest summarized row
+    summary_snapshot = summaries.pop('Snapshot').to_numpy()
+    summary_client = summaries['ClientID'].to_numpy(dtype='int64')
+    bounds = np.searchsorted(summary_snapshot, np.arange(len(cutoffs) + 1), side='left')
+    latest = np.full(len(client_ids), -1)
+    snapshots = []
+    for snapshot, (label, cutoff) in enumerate(zip(labels, cutoffs)):
+        updated = np.arange(bounds[snapshot], bounds[snapshot + 1])
+        latest[summary_client[updated]] = updated
+        current = latest[latest >= 0]
+        if len(current) == 0:
+            continue
+        customers = summaries.take(current)
+        customers['ClientID'] = client_ids[summary_client[current]]
+        add_idle_time(customers, cutoff)
+        snapshots.append(customers.assign(As_Of=label))
+
+    history = pd.concat(snapshots, ignore_index=True)
+    return history[['As_Of'] + [col for col in history.columns if col != 'As_Of']]
+
+
+def _summarize_batch(quote_events: pd.DataFrame, batch, event_client: np.ndarray, n_clients: int,
+                     status_precedence) -> pd.DataFrame:
+    # One summarize_clients call for several snapshots, keyed by snapshot * n_clients + client
+    selected = np.concatenate([events for _, events in batch])
+    snapshot = np.concatenate([np.full(len(events), snapshot) for snapshot, events in batch])
+    stacked = quote_events.take(selected).assign(ClientID=snapshot * n_clients + event_client[selected])
+    summary = summarize_clients(stacked, status_precedence)
+    key = summary['ClientID'].to_numpy(dtype='int64')
+    summary['ClientID'] = key % n_clients
+    summary.insert(0, 'Snapshot', key // n_clients)
+    return summary
+
+
+def history_summary(history: pd.DataFrame) -> pd.DataFrame:
+    """One row per as-of date: customer count, average retention/churn, total CLV and customers per segment."""
+    if history.empty:
+        return pd.DataFrame(columns=['As_Of', 'Customers', 'Avg_Retention_Rate', 'Avg_Churn_Rate', 'Total_CLV']
+                            + [f'{segment}_Customers' for segment in SEGMENTS])
+    summary = history.groupby('As_Of').agg(
+        Customers=('ClientID', 'size'),
+        Avg_Retention_Rate=('Retention_Rate', 'mean'),
+        Avg_Churn_Rate=('Churn_Rate', 'mean'),
+        Total_CLV=('CLV', 'sum'),
+    )
+    segments = pd.crosstab(history['As_Of'], history['Customer_Segment'])
+    segments = segments.reindex(columns=list(SEGMENTS), fill_value=0).add_suffix('_Customers')
+    return summary.join(segments).fillna(0).reset_index()
+
+
+def segment_migration(history: pd.DataFrame) -> pd.DataFrame:
+    """
+    Customers moving between segments from each snapshot to the next: one row per (As_Of, From_Segment,
+    To_Segment), including customers that stayed put. Customers new since the previous snapshot come
+    from NEW_SEGMENT; the first snapshot has no predecessor and is left out.
+    """
+    columns = ['As_Of', 'From_Segment', 'To_Segment', 'Customers']
+    dates = pd.DatetimeIndex(sorted(history['As_Of'].unique())) if not history.empty else pd.DatetimeIndex([])
+    if len(dates) < 2:
+        return pd.DataFrame(columns=columns)
+
+    step = dates.get_indexer(history['As_Of'])
+    current = pd.DataFrame({'Step': step, 'ClientID': history['ClientID'].to_numpy(),
+                            'To_Segment': history['Customer_Segment'].to_numpy()})
+    # Shift every snapshot forward one step, so a single merge pairs each customer with its previous segment
+    previous = current.rename(columns={'To_Segment': 'From_Segment'}).assign(Step=step + 1)
+    pairs = current[current['Step'] > 0].merge(previous, on=['Step', 'ClientID'], how='left')
+    pairs['From_Segment'] = pairs['From_Segment'].fillna(NEW_SEGMENT)
+
+    migration = pairs.groupby(['Step', 'From_Segment', 'To_Segment']).size().rename('Customers').reset_index()
+    migration['As_Of'] = dates[migration['Step'].to_numpy()]
+    return migration[columns]
@@ -0,0 +1,144 @@
+"""
+Incremental (append) mode for customer analytics: fold a delta export of new quotations into the
+analytics of a previous run, recomputing only the customers the delta touches.
+"""
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from processing.cache import CODE_VERSION
+from processing.customers import (
+    STATUS_PRECEDENCE,
+    add_idle_time,
+    build_quote_table,
+    merge_quote_tables,
+    summarize_clients,
+)
+from processing.ingest import prepare_quotations
+from processing.snapshots import read_frame, read_metadata, write_frame
+
+
+# Bump when the layout of the stored state changes; older state must then be rebuilt from a full export
+STATE_VERSION = 1
+STATE_FRAMES = ('quotes', 'customers')
+# Relative tolerance for float metrics in verify_state (sums are accumulated in a different order)
+VERIFY_RTOL = 1e-9
+
+
+@dataclass
+class CustomerState:
+    """
+    Everything needed to fold in more quotations: the quote table (one row per (ClientID, Quote_ID) with
+    the latest version's fields, first-class status, offer counts and per-service sums across versions)
+    and the per-ClientID analytics derived from it.
+    """
+    quotes: pd.DataFrame
+    customers: pd.DataFrame
+    status_precedence: tuple = STATUS_PRECEDENCE
+
+
+def _plain_keys(quotes: pd.DataFrame) -> pd.DataFrame:
+    # Categorical columns of different uploads have different categories; store plain strings instead
+    categorical = [col for col in quotes.columns if isinstance(quotes[col].dtype, pd.CategoricalDtype)]
+    return quotes.astype({col: 'str' for col in categorical}) if categorical else quotes
+
+
+def build_state(df: pd.DataFrame, status_precedence=STATUS_PRECEDENCE,
+                today: pd.Timestamp | None = None) -> CustomerState:
+    """Initial state from a full quotation export (raw or already prepared)."""
+    quotes = _plain_keys(build_quote_table(prepare_quotations(df), status_precedence))
+    customers = summarize_clients(quotes, status_precedence, today=today)
+    return CustomerState(quotes, customers, tuple(status_precedence))
+
+
+def apply_delta(state: CustomerState, delta: pd.DataFrame,
+                today: pd.Timestamp | None = None) -> tuple[CustomerState, np.ndarray]:
+    """
+    Fold the quotation rows of `delta` (rows added after everything already in `state`) into the state.
+    Only the customers with a quotation in the delta are re-summarized, from their merged quote rows;
+    every other customer's row is kept and only its idle time is brought up to `today` (default: now).
+    Returns (new_state, affected_client_ids).
+    """
+    today = pd.Timestamp.now() if today is None else today
+    delta_quotes = _plain_keys(build_quote_table(prepare_quotations(delta), state.status_precedence))
+    affected = pd.unique(delta_quotes['ClientID'].to_numpy())
+
+    touched = state.quotes['ClientID'].isin(affected).to_numpy()
+    # Existing rows first: on equal versions the later (delta) row wins, as in a full run over the combined file
+    merged = _plain_keys(merge_quote_tables([state.quotes[touched], delta_quotes]))
+    quotes = pd.concat([state.quotes[~touched], merged], ignore_index=True)
+
+    updated = summarize_clients(merged, state.status_precedence, today=today)
+    kept = state.customers[~state.customers['ClientID'].isin(affected)]
+    customers = pd.concat([kept, updated], ignore_index=True)
+    customers = customers.sort_values('ClientID', kind='stable', ignore_index=True)
+    add_idle_time(customers, today)
+    return CustomerState(quotes, customers, state.status_precedence), affected
+
+
+def verify_state(state: CustomerState, full: pd.DataFrame, today: pd.Timestamp | None = None,
+                 rtol: float = VERIFY_RTOL) -> list[str]:
+    """
+    Compare the state's customer analytics with a full recompute over `full` (the initial export plus
+    every delta, in order). Returns human-readable differences; an empty list means they match.
+    """
+    today = pd.Timestamp.now() if today is None else today
+    current = state.customers.copy()
+    add_idle_time(current, today)
+    expected = build_state(full, state.status_precedence, today).customers
+
+    problems = []
+    if list(current.columns) != list(expected.columns):
+        problems.append(f"columns differ: {sorted(set(current.columns) ^ set(expected.columns))}")
+    if not current['ClientID'].equals(expected['ClientID']):
+        missing = sorted(set(expected['ClientID']) - set(current['ClientID']))
+        extra = sorted(set(current['ClientID']) - set(expected['ClientID']))
+        problems.append(f"customers differ: {len(missing)} missing {missing[:5]}, {len(extra)} unexpected {extra[:5]}")
+        return problems
+
+    for col in [col for col in expected.columns if col in current.columns]:
+        left, right = current[col], expected[col]
+        if pd.api.types.is_float_dtype(right):
+            same = np.isclose(left.to_numpy(dtype=float), right.to_numpy(dtype=float), rtol=rtol, equal_nan=True)
+        else:
+            same = (left == right).to_numpy() | (left.isna() & right.isna()).to_numpy()
+        if not same.all():
+            clients = current.loc[~same, 'ClientID'].head(5).tolist()
+            problems.append(f"{col}: {int((~same).sum())} customers differ, e.g. {clients}")
+    return problems
+
+
+def save_state(state: CustomerState, directory):
+    """Write the state as Arrow files in `directory` (one per frame)."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    metadata = {'state_version': STATE_VERSION, 'code_version': CODE_VERSION,
+                'status_precedence': list(state.status_precedence)}
+    write_frame(state.quotes, directory / 'quotes.arrow', metadata)
+    write_frame(state.customers, directory / 'customers.arrow', metadata)
+
+
+def has_state(directory) -> bool:
+    return all((Path(directory) / f"{name}.arrow").exists() for name in STATE_FRAMES)
+
+
+def load_state(directory) -> CustomerState:
+    """
+    Read a state written by save_state; raises ValueError for state of another layout version. Customer
+    analytics saved by other processing code are re-derived from the stored quote table, so they are never
+    mixed with rows the current code summarizes.
+    """
+    directory = Path(directory)
+    metadata = read_metadata(directory / 'quotes.arrow')
+    if metadata.get('state_version') != STATE_VERSION:
+        raise ValueError(f"Incremental state in {directory} has layout version {metadata.get('state_version')}, "
+                         f"expected {STATE_VERSION}; rebuild it from a full export")
+    status_precedence = tuple(metadata['status_precedence'])
+    quotes = read_frame(directory / 'quotes.arrow')[0]
+    if metadata.get('code_version') != CODE_VERSION:
+        customers = summarize_clients(quotes, status_precedence)
+    else:
+        customers = read_frame(directory / 'customers.arrow')[0]
+    return CustomerState(quotes, customers, status_precedence)
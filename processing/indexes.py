@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+
+from processing.parsing import PARSED_NUMBER_COLUMNS
+
+
+# Raw columns that are never shown as per-project service values
+PROJECT_EXCLUDED_COLUMNS = ['Date', 'Number', 'Estimate status', 'Taxable amount', 'ClientID',
+                            'converted to invoice (AMOUNT)', 'Name'] + PARSED_NUMBER_COLUMNS
+
+
+def project_value_columns(df: pd.DataFrame) -> list[str]:
+    """Numeric raw columns summed per project in the Project Explorer (the service columns in practice)."""
+    return [col for col in df.columns if col not in PROJECT_EXCLUDED_COLUMNS and pd.api.types.is_numeric_dtype(df[col])]
+
+
+def _group_positions(group_ids: np.ndarray, keys: pd.DataFrame) -> dict:
+    """
+    Map each group's key tuple to its row positions (in row order) with one stable argsort,
+    rather than GroupBy.indices, which is slow for multi-column keys.
+    Rows with group id -1 (missing keys) are skipped.
+    """
+    order = np.argsort(group_ids, kind='stable')
+    order = order[group_ids[order] >= 0]
+    if len(order) == 0:
+        return {}
+    sorted_ids = group_ids[order]
+    starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+    ends = np.r_[starts[1:], len(order)]
+    first_rows = order[starts]
+    key_values = [keys[col].to_numpy()[first_rows] for col in keys.columns]
+    return {key: order[start:end] for key, start, end in zip(zip(*key_values), starts, ends)}
+
+
+class ClientIndex:
+    """
+    Lookup structure over the raw quotation frame, built once per dataset:
+    ClientID -> row positions, and (ClientID, Name) -> row positions plus per-project value totals.
+    Lookups cost O(rows for that client) instead of a scan of the whole upload.
+    """
+
+    def __init__(self, df_raw: pd.DataFrame):
+        self.df = df_raw
+        self.value_columns = project_value_columns(df_raw)
+        self.client_positions = df_raw.groupby('ClientID', observed=True, sort=False).indices
+        self.project_positions = {}
+        self.project_names = {}
+        self.project_totals = None
+        if 'Name' in df_raw.columns:
+            projects = df_raw.groupby(['ClientID', 'Name'], observed=True, sort=False)
+            self.project_positions = _group_positions(projects.ngroup().to_numpy(), df_raw[['ClientID', 'Name']])
+            for client_id, name in self.project_positions:
+                self.project_names.setdefault(client_id, []).append(name)
+            for names in self.project_names.values():
+                names.sort()
+            self.project_totals = projects[self.value_columns].sum()
+
+    def __contains__(self, client_id) -> bool:
+        return client_id in self.client_positions
+
+    def client_rows(self, client_id) -> pd.DataFrame:
+        positions = self.client_positions.get(client_id, np.empty(0, dtype=np.intp))
+        return self.df.iloc[positions]
+
+    def client_projects(self, client_id) -> list:
+        """Sorted project names quoted for this client."""
+        return self.project_names.get(client_id, [])
+
+    def project_versions(self, client_id, name) -> pd.DataFrame:
+        """All quotation rows of one project, ordered by parsed version number when available."""
+        positions = self.project_positions.get((client_id, name), np.empty(0, dtype=np.intp))
+        rows = self.df.iloc[positions]
+        if 'Version_Number' in rows.columns:
+            rows = rows.sort_values('Version_Number', kind='stable')
+        return rows
+
+    def project_service_totals(self, client_id, name) -> pd.Series:
+        """Per-column value totals of one project (indexed by value column)."""
+        if self.project_totals is None or (client_id, name) not in self.project_positions:
+            return pd.Series(0.0, index=self.value_columns)
+        return self.project_totals.loc[(client_id, name)]
+
+
+class SortIndex:
+    """
+    Precomputed ascending argsorts of a frame's sortable columns (missing values last), built once per
+    dataset so sorting a filtered view is a boolean gather instead of a full sort on every rerun.
+    """
+
+    def __init__(self, df: pd.DataFrame, columns):
+        self.length = len(df)
+        self.positions = {}
+        self.missing = {}
+        for col in columns:
+            values = df[col].to_numpy(dtype=float, na_value=np.nan)
+            order = np.argsort(values, kind='stable')
+            self.missing[col] = int(np.isnan(values).sum())
+            self.positions[col] = order
+
+    def order(self, column: str, ascending: bool = True, mask: np.ndarray | None = None) -> np.ndarray:
+        """Row positions sorted by `column`, limited to rows where `mask` is True; missing values stay last."""
+        order = self.positions[column]
+        if not ascending:
+            present = order[:self.length - self.missing[column]]
+            order = np.concatenate([present[::-1], order[len(present):]])
+        if mask is not None:
+            order = order[np.asarray(mask, dtype=bool)[order]]
+        return order
+
+
+class NavigationIndex:
+    """
+    Country -> Company -> Client navigation over the company rollup, built once per dataset.
+    Each level is a sorted list per parent node with per-node totals, so every dropdown and the company
+    drill-down are dict lookups; customer rows come from the processed customers by position, never from
+    the raw quotations.
+    """
+
+    def __init__(self, companies: pd.DataFrame, customers: pd.DataFrame | None = None):
+        self.customers = customers
+        self.customer_positions = {}
+        if customers is not None:
+            self.customer_positions = dict(zip(customers['ClientID'], range(len(customers))))
+        self.company_names = {}
+        self.company_totals = {}
+        self.company_clients = {}
+        self.country_totals = {}
+        if companies is None or companies.empty:
+            self.countries = []
+            return
+
+        nodes = companies.astype({'Country': str, 'Company': str}).sort_values(['Country', 'Company'], kind='stable')
+        for country, group in nodes.groupby('Country', sort=True):
+            self.company_names[country] = group['Company'].tolist()
+            clients = set()
+            for company, row in zip(group['Company'], group.to_dict('records')):
+                self.company_totals[(country, company)] = row
+                self.company_clients[(country, company)] = list(row['ClientIDs'])
+                clients.update(row['ClientIDs'])
+            self.country_totals[country] = {
+                'Companies': len(group),
+                'Total_Clients': len(clients),
+                'Total_Quotes': int(group['Total_Quotes'].sum()),
+                'Total_Revenue': float(group['Total_Revenue'].sum()),
+            }
+        self.countries = sorted(self.company_names)
+
+    def companies(self, country) -> list:
+        """Sorted company names in `country`."""
+        return self.company_names.get(country, [])
+
+    def clients(self, country, company) -> list:
+        """Sorted ClientIDs quoted under `company` in `country`."""
+        return self.company_clients.get((country, company), [])
+
+    def company_summary(self, country, company) -> dict:
+        """The company's rollup row (quotes, closed quotes, value, revenue, representatives, win rate...)."""
+        return self.company_totals.get((country, company), {})
+
+    def company_customers(self, country, company) -> pd.DataFrame:
+        """Processed customer rows of the company's clients, in ClientID order."""
+        if self.customers is None:
+            return pd.DataFrame()
+        positions = [self.customer_positions[client_id] for client_id in self.clients(country, company)
+                     if client_id in self.customer_positions]
+        return self.customers.iloc[positions]
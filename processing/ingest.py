@@ -0,0 +1,46 @@
+import pandas as pd
+
+from processing.parsing import add_quote_number_columns, has_parsed_numbers
+from processing.schema import apply_ingest_schema, has_ingest_schema
+
+
+def is_prepared(df: pd.DataFrame) -> bool:
+    """True when `df` is already the output of prepare_quotations."""
+    return has_ingest_schema(df) and has_parsed_numbers(df)
+
+
+def prepare_quotations(df: pd.DataFrame, date_format: str | None = None, first_row: int = 0) -> pd.DataFrame:
+    """
+    Shared ingest stage of the customer and company pipelines: the raw quotation frame with the
+    ingest schema applied and the quote number columns parsed. A frame that is already prepared is
+    returned as is (not copied), so callers must treat the result as read-only; anything else is copied.
+    Without a Number column every row is its own quote, numbered by position from `first_row` (the
+    offset of `df` in the file, so chunks of one file get distinct ids).
+    """
+    if is_prepared(df):
+        return df
+    data = apply_ingest_schema(df, date_format)
+
+    if 'Number' in data.columns:
+        add_quote_number_columns(data)
+    else:
+        data['Project_Number'] = range(first_row, first_row + len(data))
+        data['Quote_ID'] = range(first_row, first_row + len(data))
+        data['Version_Number'] = 1.0
+    return data
+
+
+def as_of_cutoff(as_of) -> pd.Timestamp:
+    """Latest timestamp included by `as_of`: a plain date includes that whole day."""
+    cutoff = pd.Timestamp(as_of)
+    if cutoff == cutoff.normalize():
+        cutoff += pd.Timedelta(days=1) - pd.Timedelta(1, unit='ns')
+    return cutoff
+
+
+def rows_as_of(data: pd.DataFrame, as_of) -> pd.DataFrame:
+    """Prepared quotation rows dated on or before `as_of` (rows without a date are left out)."""
+    rows = data[(data['Date'] <= as_of_cutoff(as_of)).to_numpy()]
+    if rows.empty:
+        raise ValueError(f"No quotations on or before {pd.Timestamp(as_of).date()}")
+    return rows
@@ -0,0 +1,69 @@
+import pandas as pd
+
+
+PARSED_NUMBER_COLUMNS = ['Country_Prefix', 'Client_Code', 'Doc_Type', 'Project_Number', 'Version', 'Version_Number', 'Quote_ID']
+
+# Canonical quote numbers look like KSA.Abb.QU.1002.1 (country.client.doctype.project.version)
+_CANONICAL_NUMBER = (
+    r'^(?P<Quote_ID>(?P<Country_Prefix>[^.]*)\.(?P<Client_Code>[^.]*)\.(?P<Doc_Type>[^.]*)\.(?P<Project_Number>[^.]*))'
+    r'\.(?P<Version>[^.]*)$'
+)
+
+
+def parse_versions(versions: pd.Series) -> pd.Series:
+    """
+    Convert version suffixes to numbers: plain numbers parse as-is, a letter suffix adds 0.1
+    to the leading digits (e.g. '2a' -> 2.1), and anything without digits or missing is 1.0.
+    """
+    numeric = pd.to_numeric(versions, errors='coerce')
+    leading_digits = versions.str.extract(r'(\d+)', expand=False)
+    suffixed = pd.to_numeric(leading_digits, errors='coerce') + 0.1
+    return numeric.fillna(suffixed).fillna(1.0).astype(float)
+
+
+_PART_COLUMNS = ['Country_Prefix', 'Client_Code', 'Doc_Type', 'Project_Number', 'Version']
+
+
+def _parse_irregular_numbers(numbers: pd.Series) -> pd.DataFrame:
+    """Fallback for numbers that don't have exactly five dot-separated parts; missing parts are NA."""
+    parts = numbers.str.split('.', expand=True).reindex(columns=range(len(_PART_COLUMNS)))
+    parts.columns = _PART_COLUMNS
+    parts['Quote_ID'] = numbers.str.rsplit('.', n=1).str[0]
+    return parts
+
+
+def parse_quote_numbers(numbers: pd.Series) -> pd.DataFrame:
+    """
+    Parse quotation numbers into their components in one vectorized pass.
+    Returns a frame aligned with `numbers` holding PARSED_NUMBER_COLUMNS; Quote_ID is the
+    number without its version suffix and identifies all versions of the same quotation.
+    """
+    numbers = numbers.astype(str)
+    parsed = numbers.str.extract(_CANONICAL_NUMBER)
+
+    irregular = parsed['Quote_ID'].isna() & numbers.notna()
+    if irregular.any():
+        fallback = _parse_irregular_numbers(numbers[irregular])
+        # Column by column, cast to the extracted dtypes (an all-missing part would otherwise be float)
+        for col in fallback.columns:
+            parsed.loc[irregular, col] = fallback[col].astype(parsed[col].dtype)
+
+    parsed['Version_Number'] = parse_versions(parsed['Version'])
+    return parsed[PARSED_NUMBER_COLUMNS]
+
+
+def has_parsed_numbers(df: pd.DataFrame) -> bool:
+    return all(col in df.columns for col in PARSED_NUMBER_COLUMNS)
+
+
+def add_quote_number_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add the parsed quote number columns to `df` in place (no-op when already present) and return it.
+    Call once per upload so downstream processing and UI reuse the same parse.
+    """
+    if 'Number' not in df.columns or has_parsed_numbers(df):
+        return df
+    parsed = parse_quote_numbers(df['Number'])
+    for col in PARSED_NUMBER_COLUMNS:
+        df[col] = parsed[col].to_numpy()
+    return df
@@ -0,0 +1,111 @@
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pandas as pd
+
+from processing.cache import CODE_VERSION
+from processing.companies import process_company_data
+from processing.customers import STATUS_PRECEDENCE, process_customer_data
+from processing.exports import write_export
+from processing.ingest import prepare_quotations
+from processing.profiling import Profiler
+from processing.schema import read_quotations
+from processing.snapshots import write_frame
+from processing.streaming import process_company_csv, process_customer_csv
+
+
+OUTPUT_FORMATS = ('csv', 'parquet')
+
+
+@dataclass
+class StageResult:
+    """Outcome of one pipeline stage: wall time, rows produced and the error message if it failed."""
+    name: str
+    seconds: float
+    rows: int = 0
+    error: str | None = None
+
+
+@dataclass
+class PipelineResult:
+    """Frames produced by run_pipeline plus per-stage results; frames of failed stages are None."""
+    customers: pd.DataFrame | None = None
+    companies: pd.DataFrame | None = None
+    stages: list[StageResult] = field(default_factory=list)
+
+    @property
+    def errors(self) -> dict:
+        return {stage.name: stage.error for stage in self.stages if stage.error}
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def frames(self) -> dict:
+        return {name: df for name, df in (('customers', self.customers), ('companies', self.companies))
+                if df is not None}
+
+    def timings(self) -> dict:
+        return {stage.name: stage.seconds for stage in self.stages}
+
+
+def run_stage(result: PipelineResult, name: str, func):
+    """Time `func()` (returning (value, error_or_None)) and record it as a stage of `result`."""
+    start = time.perf_counter()
+    try:
+        value, error = func()
+    except Exception as e:
+        value, error = None, str(e)
+    rows = len(value) if isinstance(value, pd.DataFrame) else 0
+    result.stages.append(StageResult(name, time.perf_counter() - start, rows, error))
+    return None if error else value
+
+
+def run_pipeline(source, status_precedence=STATUS_PRECEDENCE, date_format: str | None = None,
+                 profiler: Profiler | None = None, as_of=None, chunksize: int | None = None,
+                 **read_csv_kwargs) -> PipelineResult:
+    """
+    Run the ingest, customer and company stages on a quotation CSV (path or file-like) without any UI.
+    Stage failures are recorded in the result rather than raised; later stages are skipped if ingest fails.
+    `profiler` additionally records the sub-stages of the customer and company pipelines.
+    `as_of` restricts both stages to the quotations dated on or before it.
+    With `chunksize`, the file is never loaded whole: each stage streams it in chunks of that many rows
+    (there is no ingest stage and no sub-stage profile).
+    """
+    result = PipelineResult()
+    if chunksize:
+        result.customers = run_stage(result, 'customers', lambda: process_customer_csv(
+            source, chunksize, status_precedence, date_format, as_of, **read_csv_kwargs))
+        result.companies = run_stage(result, 'companies', lambda: process_company_csv(
+            source, chunksize, date_format, as_of, **read_csv_kwargs))
+        return result
+
+    data = run_stage(result, 'ingest', lambda: (
+        prepare_quotations(read_quotations(source, date_format, **read_csv_kwargs)), None))
+    if data is None:
+        return result
+    result.customers = run_stage(
+        result, 'customers', lambda: process_customer_data(data, status_precedence, profiler, as_of))
+    result.companies = run_stage(result, 'companies', lambda: process_company_data(data, profiler, as_of))
+    return result
+
+
+def write_outputs(result: PipelineResult, out_dir, formats=OUTPUT_FORMATS) -> list[Path]:
+    """
+    Write every frame of `result` to `out_dir` as <name>.<fmt> for each of `formats` (see EXPORT_FORMATS).
+    Returns the paths written.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    for name, df in result.frames().items():
+        for fmt in formats:
+            path = out_dir / f"{name}.{fmt}"
+            if fmt == 'parquet':
+                write_frame(df, path, {'name': name, 'code_version': CODE_VERSION})
+            else:
+                with open(path, 'wb') as sink:
+                    write_export(df, fmt, sink)
+            written.append(path)
+    return written
@@ -0,0 +1,137 @@
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+
+import pandas as pd
+
+
+# Set CRA_PROFILE=1 to profile every pipeline run and log the report as JSON
+PROFILE_ENV = 'CRA_PROFILE'
+logger = logging.getLogger('processing.profiling')
+
+try:
+    _PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = None
+
+
+def profiling_enabled() -> bool:
+    return os.environ.get(PROFILE_ENV, '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def resident_memory_mb() -> float | None:
+    """Current resident set size in MB, or None where /proc is unavailable."""
+    if _PAGE_SIZE is None:
+        return None
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE / 1e6
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+@dataclass
+class StageRecord:
+    """One profiled stage: wall time, rows in/out and resident memory change (MB, None if unknown)."""
+    name: str
+    seconds: float = 0.0
+    rows_in: int | None = None
+    rows_out: int | None = None
+    memory_delta_mb: float | None = None
+
+
+def _rows(value) -> int | None:
+    return len(value) if isinstance(value, (pd.DataFrame, pd.Series)) else None
+
+
+class Profiler:
+    """
+    Collects named stage records. Use `with profiler.stage(name, rows_in=...) as record:` and set
+    `record.rows_out`, or `profiler.call(name, func, frame, ...)`, which takes the rows from the
+    first argument and the result.
+    """
+
+    enabled = True
+
+    def __init__(self, label: str = 'pipeline'):
+        self.label = label
+        self.records: list[StageRecord] = []
+
+    @contextmanager
+    def stage(self, name: str, rows_in: int | None = None):
+        record = StageRecord(name, rows_in=rows_in)
+        memory_before = resident_memory_mb()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds = time.perf_counter() - start
+            memory_after = resident_memory_mb()
+            if memory_before is not None and memory_after is not None:
+                record.memory_delta_mb = memory_after - memory_before
+            self.records.append(record)
+
+    def call(self, name: str, func, *args, **kwargs):
+        with self.stage(name, rows_in=_rows(args[0]) if args else None) as record:
+            result = func(*args, **kwargs)
+            record.rows_out = _rows(result)
+        return result
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(record.seconds for record in self.records)
+
+    def to_frame(self) -> pd.DataFrame:
+        frame = pd.DataFrame([asdict(record) for record in self.records],
+                             columns=list(StageRecord.__dataclass_fields__))
+        return frame.astype({'rows_in': 'Int64', 'rows_out': 'Int64'})
+
+    def to_dict(self) -> dict:
+        return {'label': self.label, 'total_seconds': self.total_seconds,
+                'stages': [asdict(record) for record in self.records]}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
+
+    def log(self, level: int = logging.INFO):
+        """Emit the report as a single JSON line for log collection."""
+        logger.log(level, self.to_json())
+
+
+class NullProfiler(Profiler):
+    """Profiler that records nothing, used when profiling is off."""
+
+    enabled = False
+
+    @contextmanager
+    def stage(self, name: str, rows_in: int | None = None):
+        yield StageRecord(name, rows_in=rows_in)
+
+    def call(self, name: str, func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+
+NULL_PROFILER = NullProfiler()
+
+
+def _ensure_log_output():
+    """Make the JSON reports visible: INFO on our logger, and a stderr handler unless logging is configured."""
+    if logger.getEffectiveLevel() > logging.INFO:
+        logger.setLevel(logging.INFO)
+    if not logger.hasHandlers():
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+
+
+def get_profiler(profiler: Profiler | None = None, label: str = 'pipeline') -> Profiler:
+    """`profiler` if given, else a fresh Profiler when CRA_PROFILE is set, else the no-op profiler."""
+    if profiler is not None:
+        return profiler
+    if not profiling_enabled():
+        return NULL_PROFILER
+    _ensure_log_output()
+    return Profiler(label)
@@ -0,0 +1,102 @@
+import pandas as pd
+
+from processing.services import SERVICE_COLUMNS
+
+
+# Declared ingest schema for the quotation export (see README "Data Format")
+DATE_COLUMN = 'Date'
+CATEGORICAL_COLUMNS = ['ClientID', 'Estimate status', 'Location', 'Company', 'Client', 'Name']
+AMOUNT_COLUMNS = ['Taxable amount', 'converted to invoice (AMOUNT)']
+SERVICE_AMOUNT_DTYPE = 'float32'
+
+# Tried in order against a sample of the Date column; DD/MM/YYYY is the documented format
+DATE_FORMATS = ('%d/%m/%Y', '%d-%m-%Y', '%d/%m/%y', '%Y-%m-%d', '%m/%d/%Y')
+DATE_SAMPLE_SIZE = 1000
+
+
+def detect_date_format(values: pd.Series, sample_size: int = DATE_SAMPLE_SIZE) -> str | None:
+    """Return the first of DATE_FORMATS that parses every sampled value, or None if none do."""
+    sample = values.dropna().astype(str).head(sample_size)
+    if sample.empty:
+        return None
+    for fmt in DATE_FORMATS:
+        if pd.to_datetime(sample, format=fmt, errors='coerce').notna().all():
+            return fmt
+    return None
+
+
+def parse_dates(values: pd.Series, date_format: str | None = None) -> pd.Series:
+    """Parse a date column once, using `date_format` or the detected format; unparseable values become NaT."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    date_format = date_format or detect_date_format(values)
+    if date_format is None:
+        return pd.to_datetime(values, errors='coerce')
+    return pd.to_datetime(values, format=date_format, errors='coerce')
+
+
+def _to_category(values: pd.Series) -> pd.Series:
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        if not (pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values)):
+            # Identifiers are strings even when the export happens to make them look numeric
+            values = values.astype(str).where(values.notna())
+        values = values.astype('category')
+    categories = values.cat.categories
+    if not categories.is_monotonic_increasing:
+        # Keep category order lexical so sorted groupbys match plain string ordering
+        values = values.cat.reorder_categories(categories.sort_values())
+    return values
+
+
+def apply_ingest_schema(df: pd.DataFrame, date_format: str | None = None, copy: bool = True) -> pd.DataFrame:
+    """
+    Return a raw quotation frame with stripped column names and the declared dtypes:
+    categorical identifiers/labels, float32 service amounts, numeric amounts and a parsed Date column.
+    Columns that are already typed are left as they are. With copy=False `df` is converted in place.
+    """
+    data = df.copy() if copy else df
+    data.columns = data.columns.str.strip()
+
+    for col in CATEGORICAL_COLUMNS:
+        if col in data.columns:
+            data[col] = _to_category(data[col])
+    for col in AMOUNT_COLUMNS:
+        if col in data.columns and not pd.api.types.is_numeric_dtype(data[col]):
+            data[col] = pd.to_numeric(data[col], errors='coerce')
+    for col in SERVICE_COLUMNS:
+        if col in data.columns and data[col].dtype != SERVICE_AMOUNT_DTYPE:
+            data[col] = pd.to_numeric(data[col], errors='coerce').astype(SERVICE_AMOUNT_DTYPE)
+    if DATE_COLUMN in data.columns:
+        data[DATE_COLUMN] = parse_dates(data[DATE_COLUMN], date_format)
+    return data
+
+
+def has_ingest_schema(df: pd.DataFrame) -> bool:
+    """True when `df` already carries the declared dtypes, so apply_ingest_schema would change nothing."""
+    if not all(col == col.strip() for col in df.columns):
+        return False
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and not (isinstance(df[col].dtype, pd.CategoricalDtype)
+                                      and df[col].cat.categories.is_monotonic_increasing):
+            return False
+    for col in AMOUNT_COLUMNS:
+        if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
+            return False
+    for col in SERVICE_COLUMNS:
+        if col in df.columns and df[col].dtype != SERVICE_AMOUNT_DTYPE:
+            return False
+    return DATE_COLUMN not in df.columns or pd.api.types.is_datetime64_any_dtype(df[DATE_COLUMN])
+
+
+def read_csv_dtypes(overrides: dict | None = None) -> dict:
+    """dtype mapping for pd.read_csv so categorical columns are never materialized as Python strings."""
+    dtype = {col: 'category' for col in CATEGORICAL_COLUMNS}
+    dtype.update(overrides or {})
+    return dtype
+
+
+def read_quotations(source, date_format: str | None = None, **read_csv_kwargs) -> pd.DataFrame:
+    """Read a quotation CSV with the ingest schema applied at read time."""
+    dtype = read_csv_dtypes(read_csv_kwargs.pop('dtype', None))
+    df = pd.read_csv(source, dtype=dtype, **read_csv_kwargs)
+    return apply_ingest_schema(df, date_format, copy=False)
@@ -0,0 +1,210 @@
+import numpy as np
+import pandas as pd
+
+
+# Raw columns searched for customers -> label shown for a match in that column
+SEARCH_FIELDS = {'ClientID': 'Client ID', 'Company': 'Company', 'Client': 'Client representative', 'Name': 'Project'}
+# Share of the query's trigrams (weighted by rarity) a value must contain to match; lower tolerates more typos
+MIN_COVERAGE = 0.5
+SEARCH_RESULT_COLUMNS = ['ClientID', 'Field', 'Match', 'Score']
+
+
+def normalize(text) -> str:
+    return ' '.join(str(text).lower().split())
+
+
+def word_trigrams(word: str) -> set[str]:
+    """Character trigrams of one word, padded like PostgreSQL's pg_trgm ('  a', ' ab', ..., 'yz ')."""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def trigrams(text) -> set[str]:
+    grams = set()
+    for word in normalize(text).split():
+        grams |= word_trigrams(word)
+    return grams
+
+
+class SearchIndex:
+    """
+    Typo-tolerant customer search over the raw quotation frame, built once per dataset.
+    Every distinct value of the SEARCH_FIELDS columns is a term with trigram postings and the customers it
+    belongs to; a query only scores the terms found in the postings of its rarest trigrams, so its cost
+    depends on the query and the matching terms, not on the number of values or quotation rows. Trigrams are weighted
+    by inverse document frequency, so words shared by most values ("client", "project") barely count.
+    Values containing the query as a plain substring always match, whatever their trigram coverage.
+    """
+
+    def __init__(self, df_raw: pd.DataFrame, fields: dict = SEARCH_FIELDS):
+        client_codes, clients = pd.factorize(df_raw['ClientID'])
+        self.clients = np.asarray(clients, dtype=object)
+        n_clients = max(len(self.clients), 1)
+
+        field_labels, values, client_chunks, count_chunks = [], [], [], []
+        for col, label in fields.items():
+            if col not in df_raw.columns:
+                continue
+            value_codes, distinct = pd.factorize(df_raw[col])
+            valid = (value_codes >= 0) & (client_codes >= 0)
+            # Distinct (value, customer) pairs, sorted by value so each value's customers are one slice
+            pairs = np.unique(value_codes[valid].astype(np.int64) * n_clients + client_codes[valid])
+            if len(pairs) == 0:
+                continue
+            pair_values = pairs // n_clients
+            starts = np.flatnonzero(np.r_[True, pair_values[1:] != pair_values[:-1]])
+            client_chunks.append(pairs % n_clients)
+            count_chunks.append(np.diff(np.r_[starts, len(pairs)]))
+            values.extend(np.asarray(distinct, dtype=object)[pair_values[starts]])
+            field_labels.extend([label] * len(starts))
+
+        self.term_fields = np.asarray(field_labels, dtype=object)
+        self.term_values = np.asarray(values, dtype=object)
+        # Customers of term t: term_clients[term_client_starts[t]:term_client_starts[t] + term_client_counts[t]]
+        self.term_clients = np.concatenate(client_chunks) if client_chunks else np.empty(0, dtype=np.int64)
+        self.term_client_counts = np.concatenate(count_chunks) if count_chunks else np.empty(0, dtype=np.int64)
+        self.term_client_starts = np.cumsum(self.term_client_counts) - self.term_client_counts
+
+        postings = {}
+        gram_counts = np.zeros(len(self.term_values), dtype=np.int64)
+        for term_id, value in enumerate(self.term_values):
+            grams = trigrams(value)
+            gram_counts[term_id] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(term_id)
+        self.term_gram_counts = gram_counts
+        self.term_texts = pd.Series([normalize(value) for value in self.term_values], dtype='str')
+        self.postings = {gram: np.asarray(ids, dtype=np.int64) for gram, ids in postings.items()}
+        self.weights = {gram: np.log1p(len(self.term_values) / len(ids)) for gram, ids in self.postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.term_values)
+
+    def _has_gram(self, gram: str, term_ids: np.ndarray) -> np.ndarray:
+        """Which of the sorted `term_ids` contain `gram` (postings are sorted, so a binary search each)."""
+        ids = self.postings.get(gram)
+        if ids is None or len(ids) == 0:
+            return np.zeros(len(term_ids), dtype=bool)
+        positions = np.minimum(np.searchsorted(ids, term_ids), len(ids) - 1)
+        return ids[positions] == term_ids
+
+    def _candidate_prefix(self, grams: list[str], total: float, min_coverage: float) -> list[np.ndarray]:
+        """
+        Postings of a word's rarest trigrams, enough that a term missing all of them cannot reach `min_coverage`
+        of the word: the remaining trigrams weigh less than min_coverage (prefix filtering).
+        """
+        grams = sorted(grams, key=lambda gram: len(self.postings[gram]))
+        remaining = sum(self.weights[gram] for gram in grams) / total
+        prefix = []
+        for gram in grams:
+            # The margin keeps rounding from dropping a term sitting exactly at min_coverage
+            if remaining < min_coverage - 1e-9:
+                break
+            prefix.append(self.postings[gram])
+            remaining -= self.weights[gram] / total
+        return prefix
+
+    def _substring_candidates(self, words: list[str]) -> np.ndarray:
+        """
+        Terms that may contain the query words: those holding the rarest trigram found inside any one word, or
+        for words all under three characters, those with a (padded) trigram containing the first word.
+        """
+        inner = {word[i:i + 3] for word in words for i in range(len(word) - 2)}
+        if inner:
+            if not inner <= self.postings.keys():
+                return np.empty(0, dtype=np.int64)
+            return min((self.postings[gram] for gram in inner), key=len)
+        # Short words sit inside some padded trigram of every value containing them
+        lists = [ids for gram, ids in self.postings.items() if words[0] in gram]
+        return np.unique(np.concatenate(lists)) if lists else np.empty(0, dtype=np.int64)
+
+    def _score_terms(self, query: str, min_coverage: float) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Ids and scores of the terms matching every word of the query, i.e. containing at least `min_coverage`
+        of each word's (weighted) trigrams, plus the terms containing the whole query. Only terms found in
+        the postings of the query's rarest trigrams are scored.
+        """
+        words = normalize(query).split()
+        if not words:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        word_grams = []
+        for word in words:
+            grams = word_trigrams(word)
+            known = [gram for gram in grams if gram in self.postings]
+            if not known:
+                word_grams = []
+                break
+            # Trigrams found in no value (typos) weigh as much as the word's average known trigram
+            total = sum(self.weights[gram] for gram in known) * len(grams) / len(known)
+            word_grams.append((known, total))
+
+        if not word_grams:
+            matched = np.empty(0, dtype=np.int64)
+        elif min_coverage <= 0:
+            matched = np.arange(len(self.term_values))
+        else:
+            # Candidates come from the most selective word; every word's coverage is then checked on them alone
+            prefixes = [self._candidate_prefix(known, total, min_coverage) for known, total in word_grams]
+            prefix = min(prefixes, key=lambda lists: sum(map(len, lists)))
+            matched = np.unique(np.concatenate(prefix)) if prefix else np.empty(0, dtype=np.int64)
+        coverage = np.zeros(len(matched))
+        for known, total in word_grams:
+            word_coverage = np.zeros(len(matched))
+            remaining = sum(self.weights[gram] for gram in known) / total
+            for gram in sorted(known, key=lambda gram: len(self.postings[gram])):
+                word_coverage[self._has_gram(gram, matched)] += self.weights[gram] / total
+                remaining -= self.weights[gram] / total
+                # Drop terms that can no longer reach min_coverage, so the common trigrams check few terms
+                keep = word_coverage + remaining >= min_coverage - 1e-9
+                matched, coverage, word_coverage = matched[keep], coverage[keep], word_coverage[keep]
+            keep = word_coverage >= min_coverage
+            matched, coverage = matched[keep], coverage[keep] + word_coverage[keep] / len(words)
+
+        # Substring hits (e.g. '1002' in 'CL10023', whose edge trigrams differ) match as in a plain contains filter
+        candidates = self._substring_candidates(words)
+        contained = candidates[self.term_texts.iloc[candidates].str.contains(' '.join(words), regex=False)
+                               .to_numpy(dtype=bool)]
+        term_ids = np.union1d(matched, contained)
+        term_coverage = np.ones(len(term_ids))
+        term_coverage[np.searchsorted(term_ids, matched)] = coverage
+        term_coverage[np.searchsorted(term_ids, contained)] = 1.0
+
+        grams = trigrams(query)
+        shared = np.zeros(len(term_ids), dtype=np.int64)
+        for gram in grams & self.postings.keys():
+            shared += self._has_gram(gram, term_ids)
+        # Coverage rewards values containing the query; the Jaccard part ranks closer (shorter) values first
+        jaccard = shared / (len(grams) + self.term_gram_counts[term_ids] - shared)
+        return term_ids, (2 * term_coverage + jaccard) / 3
+
+    def _best_client_matches(self, query: str, min_coverage: float):
+        """Per matching customer: client code, best-scoring term id and its score, ranked best first."""
+        term_ids, scores = self._score_terms(query, min_coverage)
+        counts = self.term_client_counts[term_ids]
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        client_codes = self.term_clients[np.repeat(self.term_client_starts[term_ids], counts) + offsets]
+        term_ids, scores = np.repeat(term_ids, counts), np.repeat(scores, counts)
+        # Best term per customer: sort by customer then score descending, keep the first row of each customer
+        order = np.lexsort((-scores, client_codes))
+        first = order[np.r_[True, client_codes[order][1:] != client_codes[order][:-1]]] if len(order) else order
+        ranked = first[np.lexsort((client_codes[first], -scores[first]))]
+        return client_codes[ranked], term_ids[ranked], scores[ranked]
+
+    def search(self, query: str, limit: int | None = 20, min_coverage: float = MIN_COVERAGE) -> pd.DataFrame:
+        """
+        Customers matching `query`, best first: one row per customer with the field and value that matched best
+        and a score in (0, 1], where 1 is an exact match.
+        """
+        client_codes, term_ids, scores = self._best_client_matches(query, min_coverage)
+        if limit is not None:
+            client_codes, term_ids, scores = client_codes[:limit], term_ids[:limit], scores[:limit]
+        return pd.DataFrame({
+            'ClientID': self.clients[client_codes],
+            'Field': self.term_fields[term_ids],
+            'Match': self.term_values[term_ids],
+            'Score': scores.round(3),
+        }, columns=SEARCH_RESULT_COLUMNS)
+
+    def matching_clients(self, query: str, min_coverage: float = MIN_COVERAGE) -> np.ndarray:
+        """Every customer matching `query` (unranked use, e.g. filtering a table)."""
+        return self.clients[self._best_client_matches(query, min_coverage)[0]]
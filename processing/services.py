@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+
+SERVICE_COLUMNS = ['CME', 'Design', 'Med Com', 'Multichannel', 'Onsite Support',
+                   'Other Services', 'Video', 'Webinars', 'Websites']
+
+# Per-service metrics are stored as dense float columns named <prefix><service> on the processed frame.
+# Each breakdown maps to its column prefix and whether zero-valued services are dropped from the dict view.
+SERVICE_BREAKDOWNS = {
+    'Service_Total_Revenue': ('Total_', 'nonzero'),
+    'Service_Avg_Revenue_Per_Project': ('AvgPerProject_', 'positive'),
+    'Project_Diversity_Breakdown': ('ProjectDiversity_', 'positive'),
+    'Service_Revenue_Breakdown': ('RevenueShare_', 'positive'),
+}
+
+LONG_FORMAT_COLUMNS = {
+    'Total_': 'Total',
+    'AvgPerProject_': 'Avg_Per_Project',
+    'ProjectDiversity_': 'Frequency',
+    'RevenueShare_': 'Revenue_Share',
+}
+
+
+def service_metric_columns(services) -> list[str]:
+    return [f'{prefix}{svc}' for prefix, _ in SERVICE_BREAKDOWNS.values() for svc in services]
+
+
+def calculate_service_metrics(quotes: pd.DataFrame, services, total_quotations: pd.Series) -> pd.DataFrame:
+    """
+    Dense per-client service metrics, indexed like `total_quotations` (by ClientID).
+    `quotes` is a quote table: one row per quotation with its latest version's service amounts
+    and AllVersions_<service> sums across versions.
+    """
+    grouped = quotes.groupby('ClientID', observed=True)
+    totals = grouped[services].sum().fillna(0).reindex(total_quotations.index, fill_value=0.0)
+    quotations = total_quotations.replace(0, np.nan)
+
+    revenue = totals.sum(axis=1).replace({0: np.nan})
+    shares = totals.div(revenue, axis=0).fillna(0)
+    averages = totals.div(quotations, axis=0).fillna(0)
+
+    presence = quotes[[f'AllVersions_{svc}' for svc in services]].gt(0)
+    presence.columns = services
+    frequency = presence.groupby(quotes['ClientID'], observed=True).sum().reindex(total_quotations.index, fill_value=0)
+    frequency = frequency.div(quotations, axis=0).fillna(0)
+
+    metrics = {}
+    for prefix, frame in (('Total_', totals), ('AvgPerProject_', averages),
+                          ('ProjectDiversity_', frequency), ('RevenueShare_', shares)):
+        for svc in services:
+            metrics[f'{prefix}{svc}'] = frame[svc].to_numpy(dtype=float)
+    return pd.DataFrame(metrics, index=total_quotations.index)
+
+
+def top_service(totals: pd.DataFrame) -> np.ndarray:
+    """Name of each row's largest service column, or 'No Service' when nothing was spent."""
+    values = totals.to_numpy(dtype=float)
+    names = np.asarray(totals.columns, dtype=object)
+    return np.where(values.max(axis=1) > 0, names[values.argmax(axis=1)], 'No Service')
+
+
+def service_breakdown(customer_data: pd.Series, breakdown: str) -> dict:
+    """
+    Build one customer's {service: value} dict for `breakdown` (a SERVICE_BREAKDOWNS key)
+    from the dense metric columns of a processed row.
+    """
+    prefix, keep = SERVICE_BREAKDOWNS[breakdown]
+    result = {}
+    for svc in SERVICE_COLUMNS:
+        value = customer_data.get(f'{prefix}{svc}')
+        if value is None or pd.isna(value):
+            continue
+        if (keep == 'nonzero' and value != 0) or (keep == 'positive' and value > 0):
+            result[svc] = float(value)
+    return result
+
+
+def service_metrics_long(client_data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Long-format (ClientID, Service, Total, Avg_Per_Project, Frequency, Revenue_Share) table
+    with one row per customer and service that has any activity.
+    """
+    services = [svc for svc in SERVICE_COLUMNS if f'Total_{svc}' in client_data.columns]
+    columns = ['ClientID', 'Service'] + list(LONG_FORMAT_COLUMNS.values())
+    if not services:
+        return pd.DataFrame(columns=columns)
+
+    n_clients = len(client_data)
+    long = pd.DataFrame({
+        'ClientID': np.repeat(client_data['ClientID'].to_numpy(), len(services)),
+        'Service': np.tile(np.asarray(services, dtype=object), n_clients),
+    })
+    for prefix, name in LONG_FORMAT_COLUMNS.items():
+        block = client_data[[f'{prefix}{svc}' for svc in services]].to_numpy(dtype=float)
+        long[name] = block.reshape(-1)
+    active = (long[list(LONG_FORMAT_COLUMNS.values())] != 0).any(axis=1)
+    return long[active].reset_index(drop=True)[columns]
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from processing.cache import CODE_VERSION
+
+
+# Bump when the layout of stored frames changes; older snapshots are then rebuilt
+SNAPSHOT_SCHEMA_VERSION = 1
+METADATA_KEY = b'cra_snapshot'
+
+DEFAULT_SNAPSHOT_DIR = os.environ.get('CRA_SNAPSHOT_DIR') or None
+
+
+def dataset_key(data: bytes) -> str:
+    """Identify an upload by the hash of its bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def write_frame(df: pd.DataFrame, path, metadata: dict | None = None):
+    """
+    Write `df` as an uncompressed Arrow IPC file (.arrow, memory-mappable) or a Parquet file (.parquet),
+    embedding `metadata` as JSON in the schema.
+    """
+    path = Path(path)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    schema_metadata = dict(table.schema.metadata or {})
+    schema_metadata[METADATA_KEY] = json.dumps(metadata or {}).encode()
+    table = table.replace_schema_metadata(schema_metadata)
+
+    tmp_path = path.with_name(path.name + '.tmp')
+    if path.suffix == '.parquet':
+        pq.write_table(table, tmp_path)
+    else:
+        with pa.OSFile(str(tmp_path), 'wb') as sink, ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def read_metadata(path) -> dict:
+    path = Path(path)
+    if path.suffix == '.parquet':
+        schema = pq.read_schema(path)
+    else:
+        with pa.memory_map(str(path), 'r') as source:
+            schema = ipc.open_file(source).schema
+    raw = (schema.metadata or {}).get(METADATA_KEY)
+    return json.loads(raw) if raw else {}
+
+
+def read_frame(path) -> tuple[pd.DataFrame, dict]:
+    """
+    Read a frame written by write_frame through a memory map. Returns (df, metadata).
+    Numeric, datetime and string columns of an Arrow file stay views of the mapped file (only the pages
+    touched are read), so the frame is read-only: replace columns rather than assigning into them.
+    """
+    path = Path(path)
+    if path.suffix == '.parquet':
+        table = pq.read_table(path, memory_map=True)
+    else:
+        with pa.memory_map(str(path), 'r') as source:
+            table = ipc.open_file(source).read_all()
+    schema = table.schema
+    raw = (schema.metadata or {}).get(METADATA_KEY)
+    # One block per column lets pandas wrap the Arrow buffers instead of copying them into 2-D blocks
+    df = table.to_pandas(split_blocks=True, self_destruct=True)
+    del table
+    for field in schema:
+        if pa.types.is_list(field.type):
+            # Arrow lists come back as NumPy arrays; restore the plain lists the app works with
+            df[field.name] = df[field.name].map(list, na_action='ignore')
+    return df, (json.loads(raw) if raw else {})
+
+
+class SnapshotStore:
+    """
+    Directory of columnar snapshots, one sub-directory per dataset key, one file per named frame
+    (e.g. 'raw', 'customers', 'companies'). Snapshots written by another schema version or by different
+    processing code are treated as missing; that includes 'raw', whose parsed quote number columns and
+    dtypes come from the ingest code.
+    """
+
+    def __init__(self, root, fmt: str = 'arrow'):
+        self.root = Path(root)
+        self.fmt = fmt
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key: str, name: str) -> Path:
+        return self.root / key / f"{name}.{self.fmt}"
+
+    def _expected_metadata(self, name: str) -> dict:
+        return {'schema_version': SNAPSHOT_SCHEMA_VERSION, 'name': name, 'code_version': CODE_VERSION}
+
+    def is_fresh(self, key: str, name: str) -> bool:
+        path = self.path(key, name)
+        if not path.exists():
+            return False
+        try:
+            metadata = read_metadata(path)
+        except (OSError, pa.ArrowInvalid):
+            return False
+        expected = self._expected_metadata(name)
+        return all(metadata.get(k) == v for k, v in expected.items())
+
+    def save(self, key: str, frames: dict):
+        (self.root / key).mkdir(parents=True, exist_ok=True)
+        for name, df in frames.items():
+            if df is not None:
+                write_frame(df, self.path(key, name), self._expected_metadata(name))
+
+    def load(self, key: str, names) -> dict | None:
+        """Load the named frames for `key`, or None if any is missing or stale."""
+        if not all(self.is_fresh(key, name) for name in names):
+            return None
+        return {name: read_frame(self.path(key, name))[0] for name in names}
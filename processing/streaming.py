@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+
+from processing.companies import COMPANY_KEYS, process_company_data
+from processing.customers import (
+    QUOTE_KEYS,
+    STATUS_PRECEDENCE,
+    build_quote_table,
+    merge_quote_tables,
+    summarize_clients,
+)
+from processing.ingest import as_of_cutoff, prepare_quotations
+from processing.schema import DATE_COLUMN, detect_date_format, read_csv_dtypes
+
+
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def iter_quotation_chunks(source, chunksize: int = DEFAULT_CHUNKSIZE, date_format: str | None = None, as_of=None,
+                          **read_csv_kwargs):
+    """
+    Prepared quotation frames of at most `chunksize` rows from a CSV path or seekable file, in file order.
+    With `as_of`, rows dated after it (or without a date) are dropped from each chunk.
+    """
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    cutoff = as_of_cutoff(as_of) if as_of is not None else None
+    dtype = read_csv_dtypes(read_csv_kwargs.pop('dtype', None))
+    rows_read = 0
+    for chunk in pd.read_csv(source, chunksize=chunksize, dtype=dtype, **read_csv_kwargs):
+        if date_format is None and DATE_COLUMN in chunk.columns:
+            # Detected once from the first chunk so every chunk is parsed the same way
+            date_format = detect_date_format(chunk[DATE_COLUMN])
+        # Positional quote ids (exports without Number) continue across chunks, as in a whole-file run
+        data = prepare_quotations(chunk, date_format, first_row=rows_read)
+        rows_read += len(chunk)
+        if cutoff is not None:
+            data = data[(data['Date'] <= cutoff).to_numpy()]
+        yield data
+
+
+def _fold_quote_tables(running: pd.DataFrame | None, partial: pd.DataFrame) -> pd.DataFrame:
+    # Keys as plain strings: each chunk's categoricals have their own categories
+    partial = partial.astype({key: 'str' for key in QUOTE_KEYS})
+    if running is None:
+        return partial
+    # Only quotes with versions in both tables need re-reducing; the rest of the running table is reused
+    revised = pd.MultiIndex.from_frame(running[QUOTE_KEYS]).isin(pd.MultiIndex.from_frame(partial[QUOTE_KEYS]))
+    merged = merge_quote_tables([running[revised], partial])
+    return pd.concat([running[~revised], merged], ignore_index=True)
+
+
+def build_quote_table_chunked(source, chunksize: int = DEFAULT_CHUNKSIZE, status_precedence=STATUS_PRECEDENCE,
+                              date_format: str | None = None, as_of=None, **read_csv_kwargs) -> pd.DataFrame:
+    """
+    Read a quotation CSV in chunks of `chunksize` rows and fold each chunk into a running per-(ClientID,
+    Quote_ID) quote table, so only one raw chunk and the quote table itself are resident at a time.
+    """
+    quotes = None
+    for data in iter_quotation_chunks(source, chunksize, date_format, as_of, **read_csv_kwargs):
+        if len(data):
+            quotes = _fold_quote_tables(quotes, build_quote_table(data, status_precedence))
+    if quotes is None:
+        raise ValueError("No rows found in the uploaded file")
+    return quotes
+
+
+def process_customer_csv(source, chunksize: int = DEFAULT_CHUNKSIZE, status_precedence=STATUS_PRECEDENCE,
+                         date_format: str | None = None, as_of=None, **read_csv_kwargs):
+    """
+    Streaming equivalent of process_customer_data for CSV sources too large to load at once.
+    Returns (processed_df, error_message_or_None).
+    """
+    try:
+        quotes = build_quote_table_chunked(source, chunksize, status_precedence, date_format, as_of,
+                                           **read_csv_kwargs)
+        today = as_of_cutoff(as_of) if as_of is not None else None
+        return summarize_clients(quotes, status_precedence, today=today), None
+    except Exception as e:
+        return None, str(e)
+
+
+def _fold_company_rollups(running: pd.DataFrame | None, partial: pd.DataFrame) -> pd.DataFrame:
+    # Counts and sums add up across chunks; the representative and ClientID lists are unioned
+    rollups = partial if running is None else pd.concat([running, partial], ignore_index=True)
+    rollups = rollups.astype({'Country': 'str'})
+    groups = rollups.groupby(COMPANY_KEYS, sort=False)
+    folded = groups[['Total_Quotes', 'Closed_Quotes', 'Total_Value', 'Total_Revenue']].sum()
+    for col in ('Representatives', 'ClientIDs'):
+        values = rollups[COMPANY_KEYS + [col]].explode(col).dropna().drop_duplicates()
+        lists = values.sort_values(col).groupby(COMPANY_KEYS, sort=False)[col].agg(list)
+        folded[col] = lists.reindex(folded.index).map(lambda names: names if isinstance(names, list) else [])
+    return folded.reset_index()
+
+
+def process_company_csv(source, chunksize: int = DEFAULT_CHUNKSIZE, date_format: str | None = None, as_of=None,
+                        **read_csv_kwargs):
+    """
+    Streaming equivalent of process_company_data: each chunk is rolled up on its own and folded into a
+    running rollup (one row per company and country). Returns (company_df, error_message_or_None).
+    """
+    try:
+        rollup = None
+        for data in iter_quotation_chunks(source, chunksize, date_format, as_of, **read_csv_kwargs):
+            if not len(data):
+                continue
+            partial, error = process_company_data(data)
+            if error:
+                raise ValueError(error)
+            rollup = _fold_company_rollups(rollup, partial)
+        if rollup is None:
+            raise ValueError("No rows found in the uploaded file")
+
+        company_data = rollup[COMPANY_KEYS + ['Representatives', 'ClientIDs', 'Total_Quotes', 'Closed_Quotes',
+                                              'Total_Value', 'Total_Revenue']].copy()
+        company_data['Country'] = company_data['Country'].astype('category')
+        company_data['Total_Clients'] = np.fromiter(map(len, company_data['ClientIDs']), dtype='int64',
+                                                    count=len(company_data))
+        company_data['Win_Rate_%'] = (company_data['Closed_Quotes'] / company_data['Total_Quotes'] * 100).fillna(0)
+        company_data = company_data.sort_values('Total_Revenue', ascending=False)
+        return company_data, None
+    except Exception as e:
+        return pd.DataFrame(), f"Error processing company data: {str(e)}"
@@ -0,0 +1,47 @@
+import numpy as np
+
+from processing import cache
+from processing.cache import ResultCache, content_key
+
+
+def _value(n_bytes):
+    return np.zeros(n_bytes, dtype=np.uint8)
+
+
+def test_least_recently_used_entries_are_evicted_first():
+    results = ResultCache(max_bytes=300, disk_dir=None)
+    for key in 'abc':
+        results.put(key, _value(100))
+    results.get('a')
+    results.put('d', _value(100))
+    assert 'b' not in results and all(key in results for key in 'acd')
+    assert results.current_bytes == 300
+
+
+def test_budget_holds_and_oversize_entries_are_not_resident():
+    results = ResultCache(max_bytes=300, disk_dir=None)
+    results.put('a', _value(200))
+    results.put('b', _value(200))
+    assert len(results) == 1 and results.current_bytes == 200
+    results.put('big', _value(1000))
+    assert 'big' not in results and results.current_bytes == 200
+
+
+def test_spilled_entries_reload_from_disk(tmp_path):
+    results = ResultCache(max_bytes=300, disk_dir=tmp_path)
+    results.put('a', _value(200))
+    results.put('b', _value(200) + 1)
+    results.put('big', _value(1000))
+    assert results.stats()['entries'] == 1 and results.current_bytes == 200
+    assert (results.get('a') == 0).all() and results.disk_hits == 1
+    # The oversize entry is served from disk every time and never counted against the budget
+    assert len(results.get('big')) == 1000 and results.disk_hits == 2
+    assert results.current_bytes <= results.max_bytes
+
+
+def test_keys_change_with_the_processing_code(monkeypatch):
+    key = content_key(b'ClientID\nC1\n', 'customers')
+    assert content_key(b'ClientID\nC1\n', 'customers') == key
+    assert content_key(b'ClientID\nC1\n', 'companies') != key
+    monkeypatch.setattr(cache, 'CODE_VERSION', 'other-code')
+    assert content_key(b'ClientID\nC1\n', 'customers') != key
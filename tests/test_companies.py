@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+
+from processing.companies import process_company_data
+
+
+def test_blank_company_rows_are_left_out():
+    df = pd.DataFrame({
+        'ClientID': ['C1', 'C2', 'C3', 'C4'],
+        'Date': ['2024-01-05', '2024-02-05', '2024-03-05', '2024-04-05'],
+        'Number': ['KSA.Abb.QU.1.1', 'KSA.Abb.QU.2.1', 'KSA.Abb.QU.3.1', 'KSA.Abb.QU.4.1'],
+        'Company': ['Acme', np.nan, 'Acme', 'Beta'],
+        'Client': ['Ann', 'Bob', 'Cy', 'Di'],
+        'Location': ['UAE', 'UAE', 'UAE', 'Mars'],
+        'Estimate status': ['Closed', 'Closed', 'Sent', 'Closed'],
+        'Taxable amount': [100.0, 200.0, 300.0, 400.0],
+        'converted to invoice (AMOUNT)': [100.0, 200.0, 0.0, 400.0],
+    })
+    companies, error = process_company_data(df)
+    assert error is None
+    companies = companies.set_index('Company')
+    assert sorted(companies.index) == ['Acme', 'Beta']
+    assert companies.loc['Acme', 'ClientIDs'] == ['C1', 'C3']
+    assert companies.loc['Acme', 'Representatives'] == ['Ann', 'Cy']
+    assert companies.loc['Acme', 'Total_Quotes'] == 2
+    assert companies.loc['Beta', 'Country'] == 'Others'
+    assert companies.loc['Beta', 'Total_Clients'] == 1
@@ -0,0 +1,37 @@
+import pandas as pd
+
+from benchmarks.synthetic import generate_quotations
+from processing import incremental
+from processing.incremental import apply_delta, build_state, load_state, save_state, verify_state
+
+
+TODAY = pd.Timestamp('2024-06-30')
+
+
+def _split(n_rows=2000, n_delta=300):
+    full = generate_quotations(n_rows, seed=3)
+    return full, full.iloc[:-n_delta].reset_index(drop=True), full.iloc[-n_delta:].reset_index(drop=True)
+
+
+def test_apply_delta_matches_a_full_recompute(tmp_path):
+    full, history, delta = _split()
+    save_state(build_state(history, today=TODAY), tmp_path)
+    state, affected = apply_delta(load_state(tmp_path), delta, today=TODAY)
+
+    assert set(affected) == set(delta['ClientID'])
+    assert verify_state(state, full, today=TODAY) == []
+    # A delta that was never applied shows up as differences
+    assert verify_state(build_state(history, today=TODAY), full, today=TODAY)
+
+
+def test_state_from_other_processing_code_rederives_customers(tmp_path, monkeypatch):
+    full, history, delta = _split()
+    state = build_state(history, today=TODAY)
+    stale = state.customers.drop(columns=['CLV']).assign(Total_Project_Value=-1.0)
+    monkeypatch.setattr(incremental, 'CODE_VERSION', 'older-code')
+    save_state(incremental.CustomerState(state.quotes, stale, state.status_precedence), tmp_path)
+    monkeypatch.undo()
+
+    loaded = load_state(tmp_path)
+    assert 'CLV' in loaded.customers.columns and (loaded.customers['Total_Project_Value'] >= 0).all()
+    assert verify_state(apply_delta(loaded, delta, today=TODAY)[0], full, today=TODAY) == []
@@ -0,0 +1,50 @@
+import re
+
+import pandas as pd
+
+from processing.customers import process_customer_data
+from processing.parsing import PARSED_NUMBER_COLUMNS, parse_quote_numbers
+
+
+def reference_version(number) -> float:
+    # Row-wise version extraction of the original customer pipeline
+    parts = str(number).split('.')
+    if len(parts) < 5:
+        return 1.0
+    try:
+        return float(parts[4])
+    except ValueError:
+        numeric = re.findall(r'\d+', parts[4])
+        return float(numeric[0]) + 0.1 if numeric else 1.0
+
+
+NUMBERS = ['KSA.Abb.QU.1002.1', 'KSA.Abb.QU.1002.2a', 'KSA.Abb.QU.1002.x', 'A.B.C.D', 'A.B.C', 'Q1234',
+           'A.B.C.D.E.2', '']
+
+
+def test_irregular_numbers_parse():
+    parsed = parse_quote_numbers(pd.Series(NUMBERS))
+    assert list(parsed.columns) == PARSED_NUMBER_COLUMNS
+    assert parsed['Version_Number'].tolist() == [reference_version(number) for number in NUMBERS]
+    assert parsed['Quote_ID'].tolist() == [number.rsplit('.', 1)[0] for number in NUMBERS]
+
+
+def test_four_and_one_part_numbers():
+    parsed = parse_quote_numbers(pd.Series(['A.B.C.D.1', 'A.B.C.D', 'Q1234']))
+    assert parsed['Version_Number'].tolist() == [1.0, 1.0, 1.0]
+    assert parsed['Project_Number'].tolist()[:2] == ['D', 'D']
+    assert parsed['Country_Prefix'].tolist() == ['A', 'A', 'Q1234']
+    assert parsed.loc[1:, 'Version'].isna().all()
+    assert parsed.loc[2, ['Client_Code', 'Doc_Type', 'Project_Number']].isna().all()
+
+
+def test_upload_with_irregular_numbers_processes():
+    df = pd.DataFrame({
+        'ClientID': ['C1', 'C1', 'C2'],
+        'Date': ['2024-01-05', '2024-02-05', '2024-03-05'],
+        'Number': ['KSA.Abb.QU.1002.1', 'KSA.Abb.QU.1002', 'Q77'],
+        'Estimate status': ['Closed', 'Sent', 'Rejected'],
+    })
+    customers, error = process_customer_data(df)
+    assert error is None
+    assert customers['ClientID'].tolist() == ['C1', 'C2']
@@ -0,0 +1,42 @@
+import json
+import logging
+import os
+import subprocess
+import sys
+
+import pandas as pd
+
+from processing.customers import process_customer_data
+from processing.profiling import PROFILE_ENV, logger
+
+
+QUOTATIONS = pd.DataFrame({
+    'ClientID': ['C1', 'C1', 'C2'],
+    'Date': ['2024-01-05', '2024-02-05', '2024-03-05'],
+    'Number': ['KSA.Abb.QU.1.1', 'KSA.Abb.QU.1.2', 'UAE.Bcd.QU.2.1'],
+    'Company': ['Acme', 'Acme', 'Beta'],
+    'Estimate status': ['Rejected', 'Closed', 'Closed'],
+    'Taxable amount': [100.0, 120.0, 300.0],
+    'converted to invoice (AMOUNT)': [0.0, 120.0, 300.0],
+})
+
+
+def test_profiled_run_logs_one_json_report(monkeypatch, caplog):
+    monkeypatch.setenv(PROFILE_ENV, '1')
+    # Root at its default WARNING level: enabling profiling alone must let the INFO report through
+    logger.setLevel(logging.NOTSET)
+    _, error = process_customer_data(QUOTATIONS)
+    assert error is None
+    reports = [record for record in caplog.records if record.name == 'processing.profiling']
+    assert len(reports) == 1 and reports[0].levelno == logging.INFO
+    report = json.loads(reports[0].getMessage())
+    assert report['label'] == 'customers'
+    assert 'customers.scoring' in [stage['name'] for stage in report['stages']]
+
+
+def test_profiled_run_without_logging_config_writes_to_stderr():
+    script = ("import pandas as pd; from processing.customers import process_customer_data; "
+              f"process_customer_data(pd.DataFrame({QUOTATIONS.to_dict('list')!r}))")
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True,
+                            env={**os.environ, PROFILE_ENV: '1'})
+    assert json.loads(result.stderr.strip().splitlines()[-1])['label'] == 'customers'
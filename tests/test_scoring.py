@@ -0,0 +1,82 @@
+"""Vectorized customer scoring against the original row-wise (DataFrame.apply) implementations."""
+import numpy as np
+import pandas as pd
+
+from processing.customers import calculate_projects_per_year, calculate_retention_rate, segment_customers
+
+
+def reference_projects_per_year(row):
+    years = row['Years_Active']
+    projects = row.get('Project_Number_nunique', 1)
+    return projects if years < 1 else projects / years
+
+
+def reference_retention_rate(row):
+    years_active = row['Years_Active']
+    avg_days = row.get('Average_Days_Between_Quotes', 0)
+    total_quotes = row['Total_Quotations']
+    converted = row['Converted_Quotations']
+    if total_quotes <= 1:
+        return 1.0 if converted > 0 else 0.0
+    conversion_factor = converted / total_quotes if total_quotes > 0 else 0
+    if avg_days > 0:
+        engagement_factor = max(0, min(1, (365 - avg_days) / 365))
+    else:
+        engagement_factor = 0.5
+    activity_factor = min(1.0, years_active / 5.0)
+    retention = (conversion_factor * 0.5) + (engagement_factor * 0.2) + (activity_factor * 0.3)
+    return max(0, min(1, retention))
+
+
+def reference_segment(row):
+    clv = row['CLV'] if not pd.isna(row['CLV']) else 0
+    win_rate = row['Win_Rate_%'] if not pd.isna(row['Win_Rate_%']) else 0
+    converted_deals = row['Converted_Quotations'] if not pd.isna(row['Converted_Quotations']) else 0
+    if clv >= 75000 and win_rate >= 40:
+        return 'High'
+    elif clv >= 30000 or (win_rate >= 60 and converted_deals >= 3):
+        return 'Medium'
+    else:
+        return 'Low'
+
+
+# Edge rows: single quote (converted or not), zero quotations, NaN cadence, NaN tenure, the 0.003-year
+# floor, cadence at 0 / 365 / beyond a year, tenure at and past the 5-year cap, and a perfect score
+CLIENTS = pd.DataFrame({
+    'Years_Active': [0.003, 0.003, 0.003, 2.0, np.nan, 0.5, 1.0, 5.0, 12.0, 3.0, 0.99, 7.0],
+    'Average_Days_Between_Quotes': [0, 0, 0, np.nan, 40, 365, 366, 10, 1000, 0, 1, 1],
+    'Total_Quotations': [1, 1, 0, 4, 3, 2, 5, 10, 8, 6, 2, 20],
+    'Converted_Quotations': [1, 0, 0, 2, 1, 0, 5, 3, 0, 6, 2, 20],
+    'Project_Number_nunique': [1, 1, 0, 3, 2, 2, 4, 9, 8, 5, 2, 18],
+    'CLV': [75000, 74999.99, 0, np.nan, 30000, 29999, 80000, 10, 0, 75000, 0, 1e6],
+    'Win_Rate_%': [40, 100, np.nan, 50, 0, 60, 39.99, 60, 100, 100, 100, 100],
+})
+
+
+def test_retention_rate_matches_row_wise():
+    expected = CLIENTS.apply(reference_retention_rate, axis=1).to_numpy(dtype=float)
+    actual = calculate_retention_rate(CLIENTS['Years_Active'], CLIENTS['Average_Days_Between_Quotes'],
+                                      CLIENTS['Total_Quotations'], CLIENTS['Converted_Quotations'])
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-12)
+    assert ((actual >= 0) & (actual <= 1)).all()
+
+
+def test_segments_match_row_wise():
+    expected = CLIENTS.apply(reference_segment, axis=1).tolist()
+    actual = segment_customers(CLIENTS['CLV'], CLIENTS['Win_Rate_%'], CLIENTS['Converted_Quotations'])
+    assert list(actual) == expected
+
+
+def test_projects_per_year_matches_row_wise():
+    expected = CLIENTS.apply(reference_projects_per_year, axis=1).to_numpy(dtype=float)
+    actual = calculate_projects_per_year(CLIENTS['Years_Active'], CLIENTS['Project_Number_nunique'])
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-12)
+
+
+def test_scalar_column_defaults_broadcast():
+    # summarize_clients passes scalars when a column is missing from the upload
+    expected = CLIENTS.drop(columns='Project_Number_nunique').apply(reference_projects_per_year, axis=1)
+    actual = calculate_projects_per_year(CLIENTS['Years_Active'], 1)
+    np.testing.assert_allclose(actual, expected.to_numpy(dtype=float))
+    expected = CLIENTS.assign(Converted_Quotations=0).apply(reference_segment, axis=1).tolist()
+    assert list(segment_customers(CLIENTS['CLV'], CLIENTS['Win_Rate_%'], 0)) == expected
@@ -0,0 +1,35 @@
+import pandas as pd
+
+from processing.search import SearchIndex
+
+
+def _index():
+    df = pd.DataFrame({
+        'ClientID': ['CL10023', 'CL20045', 'CL30067', 'CL40089'],
+        'Company': ['Northwind Pharma', 'Northwind Pharmacy Group', 'Contoso Labs', 'Fabrikam'],
+        'Client': ['Ann Lee', 'Bob Stone', 'Cy Young', 'Di Moss'],
+        'Name': ['Launch 1', 'Congress 2', 'Congress 3', 'Portal 4'],
+    })
+    return SearchIndex(df)
+
+
+def test_exact_value_ranks_before_longer_and_misspelled_values():
+    results = _index().search('northwind pharma')
+    assert list(results['ClientID']) == ['CL10023', 'CL20045']
+    assert results['Score'].iloc[0] == 1.0
+    assert results['Score'].iloc[0] > results['Score'].iloc[1]
+
+    typo = _index().search('contosso')
+    assert list(typo['ClientID']) == ['CL30067']
+    assert typo['Field'].iloc[0] == 'Company'
+
+
+def test_substring_matches_whatever_the_trigram_coverage():
+    index = _index()
+    # '1002' shares no padded trigram with 'CL10023', yet is a plain substring of it
+    results = index.search('1002')
+    assert list(results['ClientID']) == ['CL10023']
+    assert results['Match'].iloc[0] == 'CL10023'
+    assert sorted(index.matching_clients('ngress')) == ['CL20045', 'CL30067']
+    assert sorted(index.matching_clients('l4')) == ['CL40089']
+    assert len(index.search('zzz')) == 0
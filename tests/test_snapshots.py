@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from processing.snapshots import read_frame, write_frame
+
+
+def test_frames_round_trip_with_metadata(tmp_path):
+    df = pd.DataFrame({
+        'ClientID': ['C1', 'C2', None],
+        'Total': [1.5, np.nan, 3.0],
+        'Date': pd.to_datetime(['2024-01-05', None, '2024-03-05']),
+        'ClientIDs': [['C1'], [], ['C2', 'C3']],
+    })
+    for suffix in ('.arrow', '.parquet'):
+        path = tmp_path / f"frame{suffix}"
+        write_frame(df, path, {'name': 'customers'})
+        read, metadata = read_frame(path)
+        pd.testing.assert_frame_equal(read, df, check_dtype=False)
+        assert metadata == {'name': 'customers'}
+
+
+def test_arrow_numeric_columns_are_not_copied(tmp_path):
+    n_rows = 1_000_000
+    path = tmp_path / 'frame.arrow'
+    write_frame(pd.DataFrame({'Count': np.arange(n_rows), 'Value': np.ones(n_rows)}), path)
+    allocated = pa.total_allocated_bytes()
+    df, _ = read_frame(path)
+    # A copy would allocate the 16 MB of column data (in Arrow's pool); views of the memory map allocate none
+    assert (pa.total_allocated_bytes() - allocated) / 1e6 < 1
+    assert df['Count'].iloc[-1] == n_rows - 1 and df['Value'].sum() == n_rows
@@ -0,0 +1,29 @@
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate_quotations
+from processing.customers import process_customer_data
+from processing.schema import read_quotations
+from processing.streaming import process_customer_csv
+
+
+AS_OF = '2023-12-31'
+
+
+def _sorted(customers: pd.DataFrame) -> pd.DataFrame:
+    return customers.sort_values('ClientID', ignore_index=True)
+
+
+@pytest.mark.parametrize('with_number', [True, False])
+def test_chunked_run_matches_in_memory_run(tmp_path, with_number):
+    quotations = generate_quotations(3000, seed=5)
+    if not with_number:
+        quotations = quotations.drop(columns=['Number'])
+    path = tmp_path / 'quotations.csv'
+    quotations.to_csv(path, index=False)
+
+    expected, error = process_customer_data(read_quotations(path), as_of=AS_OF)
+    assert error is None
+    chunked, error = process_customer_csv(path, chunksize=700, as_of=AS_OF)
+    assert error is None
+    pd.testing.assert_frame_equal(_sorted(chunked), _sorted(expected), check_dtype=False, check_categorical=False)
@@ -0,0 +1,63 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# Above this many customers the dashboard charts switch to pre-binned histograms and sampled WebGL scatters
+LARGE_DATA_THRESHOLD = int(os.environ.get('CRA_LARGE_DATA_ROWS', 5000))
+MAX_SCATTER_POINTS = int(os.environ.get('CRA_MAX_SCATTER_POINTS', 5000))
+
+
+def is_large(df: pd.DataFrame, threshold: int = LARGE_DATA_THRESHOLD) -> bool:
+    return len(df) > threshold
+
+
+def histogram_counts(values, nbins: int, groups=None):
+    """
+    Bin `values` into `nbins` equal-width bins over their finite range, optionally split by `groups`.
+    Returns (edges, group_labels, counts) where counts has one row per group label (in order of first
+    appearance, like plotly's color grouping) and one column per bin; without groups there is a single row.
+    Non-finite values are dropped.
+    """
+    values = np.asarray(values, dtype=float)
+    if groups is None:
+        codes, labels = np.zeros(len(values), dtype=np.intp), [None]
+    else:
+        codes, labels = pd.factorize(pd.Series(groups), use_na_sentinel=False)
+        labels = list(labels)
+    finite = np.isfinite(values)
+    values, codes = values[finite], codes[finite]
+    if len(values) == 0:
+        return np.array([0.0, 1.0]), labels, np.zeros((len(labels), 1), dtype=np.int64)
+
+    edges = np.histogram_bin_edges(values, bins=nbins)
+    # Same bin assignment as np.histogram: right edge of the last bin is inclusive
+    bins = np.clip(np.searchsorted(edges, values, side='right') - 1, 0, nbins - 1)
+    counts = np.bincount(codes * nbins + bins, minlength=len(labels) * nbins).reshape(len(labels), nbins)
+    return edges, labels, counts
+
+
+def downsample(df: pd.DataFrame, max_points: int = MAX_SCATTER_POINTS, stratify: str | None = None,
+               seed: int = 0) -> pd.DataFrame:
+    """
+    About `max_points` rows of `df`, sampled without replacement with a fixed seed so reruns show
+    the same points. With `stratify`, every group keeps its share of the rows (rounded down, but at least one row).
+    """
+    if len(df) <= max_points:
+        return df
+    if stratify is None:
+        return df.sample(n=max_points, random_state=seed)
+    fraction = max_points / len(df)
+    rng = np.random.default_rng(seed)
+    keys = rng.random(len(df))
+    codes = pd.factorize(df[stratify], use_na_sentinel=False)[0]
+    # Rank rows within their group by a random key and keep the lowest ranks of each group
+    order = np.lexsort((keys, codes))
+    group_sizes = np.bincount(codes)
+    starts = np.concatenate(([0], np.cumsum(group_sizes)[:-1]))
+    rank = np.empty(len(df), dtype=np.int64)
+    rank[order] = np.arange(len(df)) - np.repeat(starts, group_sizes)
+    quota = np.maximum(1, np.floor(group_sizes * fraction)).astype(np.int64)
+    keep = rank < quota[codes]
+    return df[keep]
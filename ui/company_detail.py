@@ -0,0 +1,72 @@
+import streamlit as st
+
+from processing.indexes import NavigationIndex
+from ui.figure_cache import plot_cached
+
+
+COMPANY_CUSTOMER_COLUMNS = ['ClientID', 'Customer_Segment', 'CLV', 'Win_Rate_%', 'Retention_Rate', 'Total_Quotations',
+                            'Last_Quote_Date']
+TOP_COMPANY_CLIENTS = 20
+
+
+def display_company_overview(navigation: NavigationIndex, country: str, company: str, fingerprint: str | None = None):
+    """Company drill-down from the navigation index: rollup KPIs, its customers and their CLV."""
+    # Plotly is imported on first use, see ui.visualizations
+    import plotly.express as px
+
+    summary = navigation.company_summary(country, company)
+    if not summary:
+        st.warning("No data found for the selected company.")
+        return
+    country_revenue = navigation.country_totals[country]['Total_Revenue']
+    revenue_share = summary['Total_Revenue'] / country_revenue * 100 if country_revenue else 0
+
+    st.markdown(f"""
+    <div class="customer-highlight">
+        <h2>🏢 {company} ({country})</h2>
+    </div>
+    """, unsafe_allow_html=True)
+
+    col1, col2, col3, col4 = st.columns(4)
+    for col, title, value in [
+        (col1, "👥 Clients", f"{summary['Total_Clients']:,}"),
+        (col2, "📁 Quotations", f"{summary['Total_Quotes']:,}"),
+        (col3, "🎯 Win Rate", f"{summary['Win_Rate_%']:.1f}%"),
+        (col4, "💰 Revenue", f"E£{summary['Total_Revenue']:,.0f}"),
+    ]:
+        with col:
+            st.markdown(f"""
+            <div class="metric-card">
+                <h3>{title}</h3>
+                <h2>{value}</h2>
+            </div>
+            """, unsafe_allow_html=True)
+
+    representatives = ', '.join(map(str, summary['Representatives'])) or '—'
+    st.markdown(f"""
+    <div class="stats-container">
+        <h4>📄 Quoted Value: <span style="color: #4facfe; font-weight: bold;">E£{summary['Total_Value']:,.2f}</span></h4>
+        <h4>🌍 Share of {country} Revenue: <span style="color: #43e97b; font-weight: bold;">{revenue_share:.1f}%</span></h4>
+        <h4>🤝 Client Representatives: <span style="color: #667eea; font-weight: bold;">{representatives}</span></h4>
+    </div>
+    """, unsafe_allow_html=True)
+
+    customers = navigation.company_customers(country, company)
+    if customers.empty:
+        st.info("No processed customer analytics for this company's clients.")
+        return
+    customers = customers[[col for col in COMPANY_CUSTOMER_COLUMNS if col in customers.columns]]
+    customers = customers.sort_values('CLV', ascending=False)
+
+    def build_company_clv():
+        top = customers.head(TOP_COMPANY_CLIENTS)
+        fig = px.bar(top, x='ClientID', y='CLV', color='Customer_Segment',
+                     title=f"💰 Customer Lifetime Value ({company})",
+                     color_discrete_map={'High': '#4facfe', 'Medium': '#43e97b', 'Low': '#fa709a'})
+        fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', xaxis_title="Customer",
+                          yaxis_title="CLV (E£)")
+        return fig
+
+    plot_cached(fingerprint, 'company_clv', (country, company), build_company_clv, width='stretch')
+    st.dataframe(customers.style.format({'CLV': 'E£{:,.2f}', 'Win_Rate_%': '{:.1f}%', 'Retention_Rate': '{:.2f}'}),
+                 width='stretch', hide_index=True)
@@ -1,10 +1,18 @@
 import pandas as pd
 import streamlit as st
-import plotly.express as px
+from processing.indexes import ClientIndex
+from processing.parsing import add_quote_number_columns, has_parsed_numbers
+from processing.services import service_breakdown
+from ui.figure_cache import plot_cached
 from ui.helpers import get_segment_color_class, get_retention_color_class
+from ui.sections import section
 
 
-def display_individual_customer(customer_data: pd.Series, selected_customer: str, df_raw: pd.DataFrame | None = None):
+def display_individual_customer(customer_data: pd.Series, selected_customer: str, df_raw: pd.DataFrame | None = None,
+                                client_index: ClientIndex | None = None, fingerprint: str | None = None):
+    # Plotly is imported on first use, see ui.visualizations
+    import plotly.express as px
+
     segment_class = get_segment_color_class(customer_data['Customer_Segment'])
     retention_class = get_retention_color_class(customer_data['Retention_Rate'])
 
@@ -116,37 +124,46 @@ def display_individual_customer(customer_data: pd.Series, selected_customer: str
         """, unsafe_allow_html=True)
 
         try:
-            svc_tot = customer_data.get('Service_Total_Revenue', {})
+            svc_tot = service_breakdown(customer_data, 'Service_Total_Revenue')
             if isinstance(svc_tot, dict) and len(svc_tot) > 0:
                 labels = list(svc_tot.keys())
                 values = [v for v in svc_tot.values()]
-                fig_rev = px.pie(names=labels, values=values, title="💸 Total Spent by Service (E£)", color_discrete_sequence=['#4facfe', '#43e97b', '#fa709a', '#ffbe0b', '#8338ec', '#3a86ff'])
-                fig_rev.update_traces(textinfo='label+value', textfont_size=14)
-                fig_rev.update_layout(title_font_size=18, font=dict(size=14))
-                st.plotly_chart(fig_rev, width='stretch')
+                def build_rev():
+                    fig_rev = px.pie(names=labels, values=values, title="💸 Total Spent by Service (E£)", color_discrete_sequence=['#4facfe', '#43e97b', '#fa709a', '#ffbe0b', '#8338ec', '#3a86ff'])
+                    fig_rev.update_traces(textinfo='label+value', textfont_size=14)
+                    fig_rev.update_layout(title_font_size=18, font=dict(size=14))
+                    return fig_rev
+
+                plot_cached(fingerprint, 'service_revenue_pie', (selected_customer, labels, values), build_rev, width='stretch')
 
-            avg_rev = customer_data.get('Service_Avg_Revenue_Per_Project', {})
+            avg_rev = service_breakdown(customer_data, 'Service_Avg_Revenue_Per_Project')
             if isinstance(avg_rev, dict) and len(avg_rev) > 0:
                 labels = list(avg_rev.keys())
                 values = [v for v in avg_rev.values()]
-                fig_avg_rev = px.pie(names=labels, values=values, title="💵 Avg Revenue per Project by Service (E£)", color_discrete_sequence=['#667eea', '#43e97b', '#fa709a', '#ffbe0b', '#8338ec', '#3a86ff'])
-                fig_avg_rev.update_traces(textinfo='label+value', textfont_size=14)
-                fig_avg_rev.update_layout(title_font_size=18, font=dict(size=14))
-                st.plotly_chart(fig_avg_rev, width='stretch')
+                def build_avg_rev():
+                    fig_avg_rev = px.pie(names=labels, values=values, title="💵 Avg Revenue per Project by Service (E£)", color_discrete_sequence=['#667eea', '#43e97b', '#fa709a', '#ffbe0b', '#8338ec', '#3a86ff'])
+                    fig_avg_rev.update_traces(textinfo='label+value', textfont_size=14)
+                    fig_avg_rev.update_layout(title_font_size=18, font=dict(size=14))
+                    return fig_avg_rev
 
-            proj_div = customer_data.get('Project_Diversity_Breakdown', {})
+                plot_cached(fingerprint, 'service_avg_revenue_pie', (selected_customer, labels, values), build_avg_rev, width='stretch')
+
+            proj_div = service_breakdown(customer_data, 'Project_Diversity_Breakdown')
             if isinstance(proj_div, dict) and len(proj_div) > 0:
                 labels = list(proj_div.keys())
                 values = [v for v in proj_div.values()]
-                fig_freq = px.pie(names=labels, values=values, title="📊 Service Frequency per User (%)", color_discrete_sequence=['#4facfe', '#43e97b', '#fa709a', '#ffbe0b', '#8338ec', '#3a86ff'])
-                fig_freq.update_traces(textinfo='label+percent', textfont_size=14)
-                fig_freq.update_layout(title_font_size=18, font=dict(size=14))
-                st.plotly_chart(fig_freq, width='stretch')
+                def build_freq():
+                    fig_freq = px.pie(names=labels, values=values, title="📊 Service Frequency per User (%)", color_discrete_sequence=['#4facfe', '#43e97b', '#fa709a', '#ffbe0b', '#8338ec', '#3a86ff'])
+                    fig_freq.update_traces(textinfo='label+percent', textfont_size=14)
+                    fig_freq.update_layout(title_font_size=18, font=dict(size=14))
+                    return fig_freq
+
+                plot_cached(fingerprint, 'service_frequency_pie', (selected_customer, labels, values), build_freq, width='stretch')
 
             try:
-                totals = customer_data.get('Service_Total_Revenue', {})
-                avgs = customer_data.get('Service_Avg_Revenue_Per_Project', {})
-                freqs = customer_data.get('Project_Diversity_Breakdown', {})
+                totals = svc_tot
+                avgs = avg_rev
+                freqs = proj_div
                 all_services = sorted(set(list(totals.keys()) + list(avgs.keys()) + list(freqs.keys())))
                 if all_services:
                     table_rows = []
@@ -171,114 +188,122 @@ def display_individual_customer(customer_data: pd.Series, selected_customer: str
             st.write(f"Error creating service/project charts: {e}")
 
     if df_raw is not None:
-        st.markdown("---")
-        st.markdown("""
-        <div class="stats-container">
-            <h3>📋 Project Explorer</h3>
-            <p>Select a project to view its services and quotation details</p>
-        </div>
-        """, unsafe_allow_html=True)
+        project_explorer(selected_customer, df_raw, client_index)
 
-        try:
-            customer_projects = df_raw[df_raw['ClientID'] == selected_customer].copy()
-            if len(customer_projects) > 0:
-                if 'Number' in customer_projects.columns:
-                    customer_projects['Quote_ID'] = customer_projects['Number'].astype(str).str.rsplit('.', n=1).str[0]
-                    customer_projects['Version_Number'] = customer_projects['Number'].astype(str).str.rsplit('.', n=1).str[1]
-                else:
-                    customer_projects['Quote_ID'] = customer_projects.index.astype(str)
-                    customer_projects['Version_Number'] = '1'
-
-                if 'Name' in customer_projects.columns:
-                    project_mapping = customer_projects.groupby('Name')['Quote_ID'].first().to_dict()
-                    unique_project_names = sorted(project_mapping.keys())
-                    project_options = ["-- Select Project --"] + unique_project_names
-                    selected_project_name = st.selectbox(
-                        "Choose a project:", options=project_options, key=f"project_selector_{selected_customer}"
-                    )
-
-                    if selected_project_name and selected_project_name != "-- Select Project --":
-                        project_data = customer_projects[customer_projects['Name'] == selected_project_name].copy()
-                        num_quotations = len(project_data)
-                        project_id = project_data['Quote_ID'].iloc[0] if 'Quote_ID' in project_data.columns else "N/A"
-                        statuses = project_data['Estimate status'].unique() if 'Estimate status' in project_data.columns else ['Unknown']
-                        final_status = 'Closed' if 'Closed' in statuses else (statuses[0] if len(statuses) > 0 else 'Unknown')
-
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            st.markdown(f"""
-                            <div class="stats-container">
-                                <h4>📝 Project Name</h4>
-                                <h3 style="color: #4facfe;">{selected_project_name}</h3>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        with col2:
-                            st.markdown(f"""
-                            <div class="stats-container">
-                                <h4>📊 Quotations Sent</h4>
-                                <h3 style="color: #43e97b;">{num_quotations}</h3>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        with col3:
-                            status_color = '#43e97b' if final_status == 'Closed' else '#fa709a'
-                            st.markdown(f"""
-                            <div class="stats-container">
-                                <h4>✅ Status</h4>
-                                <h3 style="color: {status_color};">{final_status}</h3>
-                            </div>
-                            """, unsafe_allow_html=True)
 
+@section('project_explorer')
+def project_explorer(selected_customer: str, df_raw: pd.DataFrame, client_index: ClientIndex | None = None):
+    st.markdown("---")
+    st.markdown("""
+    <div class="stats-container">
+        <h3>📋 Project Explorer</h3>
+        <p>Select a project to view its services and quotation details</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    try:
+        if client_index is None:
+            client_index = ClientIndex(df_raw)
+        customer_projects = client_index.client_rows(selected_customer)
+        if len(customer_projects) > 0:
+            if 'Number' in customer_projects.columns:
+                # Reuses the columns parsed once per upload; only parses this customer's rows otherwise
+                if not has_parsed_numbers(customer_projects):
+                    customer_projects = add_quote_number_columns(customer_projects.copy())
+            else:
+                customer_projects = customer_projects.copy()
+                customer_projects['Quote_ID'] = customer_projects.index.astype(str)
+                customer_projects['Version'] = '1'
+
+            if 'Name' in customer_projects.columns:
+                unique_project_names = client_index.client_projects(selected_customer)
+                project_options = ["-- Select Project --"] + unique_project_names
+                selected_project_name = st.selectbox(
+                    "Choose a project:", options=project_options, key=f"project_selector_{selected_customer}"
+                )
+
+                if selected_project_name and selected_project_name != "-- Select Project --":
+                    project_data = customer_projects.loc[client_index.project_versions(selected_customer, selected_project_name).index]
+                    num_quotations = len(project_data)
+                    project_id = project_data['Quote_ID'].iloc[0] if 'Quote_ID' in project_data.columns else "N/A"
+                    statuses = project_data['Estimate status'].unique() if 'Estimate status' in project_data.columns else ['Unknown']
+                    final_status = 'Closed' if 'Closed' in statuses else (statuses[0] if len(statuses) > 0 else 'Unknown')
+
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        st.markdown(f"""
+                        <div class="stats-container">
+                            <h4>📝 Project Name</h4>
+                            <h3 style="color: #4facfe;">{selected_project_name}</h3>
+                        </div>
+                        """, unsafe_allow_html=True)
+                    with col2:
                         st.markdown(f"""
                         <div class="stats-container">
-                            <h4>📁 Project ID</h4>
-                            <p style="font-size: 16px; color: #667eea; font-weight: bold;">{project_id}</p>
+                            <h4>📊 Quotations Sent</h4>
+                            <h3 style="color: #43e97b;">{num_quotations}</h3>
+                        </div>
+                        """, unsafe_allow_html=True)
+                    with col3:
+                        status_color = '#43e97b' if final_status == 'Closed' else '#fa709a'
+                        st.markdown(f"""
+                        <div class="stats-container">
+                            <h4>✅ Status</h4>
+                            <h3 style="color: {status_color};">{final_status}</h3>
+                        </div>
+                        """, unsafe_allow_html=True)
+
+                    st.markdown(f"""
+                    <div class="stats-container">
+                        <h4>📁 Project ID</h4>
+                        <p style="font-size: 16px; color: #667eea; font-weight: bold;">{project_id}</p>
+                    </div>
+                    """, unsafe_allow_html=True)
+
+                    service_cols = client_index.value_columns
+                    service_totals = client_index.project_service_totals(selected_customer, selected_project_name)
+
+                    if service_cols:
+                        st.markdown("""
+                        <div class="stats-container">
+                            <h4>🛠️ Services in this Project</h4>
                         </div>
                         """, unsafe_allow_html=True)
 
-                        exclude_cols = ['Date', 'Number', 'Estimate status', 'Taxable amount', 'ClientID', 'converted to invoice (AMOUNT)', 'Name', 'Quote_ID', 'Version_Number']
-                        service_cols = [col for col in project_data.columns if col not in exclude_cols and pd.api.types.is_numeric_dtype(project_data[col])]
-
-                        if service_cols:
-                            st.markdown("""
-                            <div class="stats-container">
-                                <h4>🛠️ Services in this Project</h4>
-                            </div>
-                            """, unsafe_allow_html=True)
-
-                        service_summary = []
-                        for svc in service_cols:
-                            total_value = project_data[svc].sum()
-                            if total_value > 0:
-                                service_summary.append({'Service': svc, 'Total_Value': total_value})
-
-                        if service_summary:
-                            service_df = pd.DataFrame(service_summary).sort_values('Total_Value', ascending=False)
-                            cols = st.columns(min(3, len(service_summary)))
-                            for i, (idx, row) in enumerate(service_df.iterrows()):
-                                with cols[i % 3]:
-                                    st.markdown(f"""
-                                    <div class="stats-container" style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white;">
-                                        <h4>{row['Service']}</h4>
-                                        <p><strong>Total:</strong> E£{row['Total_Value']:,.2f}</p>
-                                    </div>
-                                    """, unsafe_allow_html=True)
-
-                            st.markdown("---")
-                            st.markdown("**📜 Quotation Version History**")
-                            version_display = project_data[['Version_Number', 'Date', 'Estimate status', 'Taxable amount'] + service_cols].copy()
-                            if 'Date' in version_display.columns:
-                                version_display['Date'] = pd.to_datetime(version_display['Date'], errors='coerce').dt.strftime('%Y-%m-%d')
-                            for col in ['Taxable amount'] + service_cols:
-                                if col in version_display.columns:
-                                    version_display[col] = version_display[col].apply(lambda x: f"E£{x:,.2f}" if pd.notna(x) and x > 0 else "-")
-                            st.dataframe(version_display, width='stretch')
-                        else:
-                            st.info("No services found with values > 0 for this project.")
-                else:
-                    st.info("No 'Name' column found in data. Cannot search by project name.")
+                    service_summary = []
+                    for svc in service_cols:
+                        total_value = service_totals[svc]
+                        if total_value > 0:
+                            service_summary.append({'Service': svc, 'Total_Value': total_value})
+
+                    if service_summary:
+                        service_df = pd.DataFrame(service_summary).sort_values('Total_Value', ascending=False)
+                        cols = st.columns(min(3, len(service_summary)))
+                        for i, (idx, row) in enumerate(service_df.iterrows()):
+                            with cols[i % 3]:
+                                st.markdown(f"""
+                                <div class="stats-container" style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white;">
+                                    <h4>{row['Service']}</h4>
+                                    <p><strong>Total:</strong> E£{row['Total_Value']:,.2f}</p>
+                                </div>
+                                """, unsafe_allow_html=True)
+
+                        st.markdown("---")
+                        st.markdown("**📜 Quotation Version History**")
+                        version_display = project_data[['Version', 'Date', 'Estimate status', 'Taxable amount'] + service_cols].copy()
+                        if 'Date' in version_display.columns:
+                            version_display['Date'] = pd.to_datetime(version_display['Date'], errors='coerce').dt.strftime('%Y-%m-%d')
+                        for col in ['Taxable amount'] + service_cols:
+                            if col in version_display.columns:
+                                version_display[col] = version_display[col].apply(lambda x: f"E£{x:,.2f}" if pd.notna(x) and x > 0 else "-")
+                        st.dataframe(version_display, width='stretch')
+                    else:
+                        st.info("No services found with values > 0 for this project.")
             else:
-                st.warning("No project data found for this customer.")
-        except Exception as e:
-            st.error(f"Error loading project data: {e}")
+                st.info("No 'Name' column found in data. Cannot search by project name.")
+        else:
+            st.warning("No project data found for this customer.")
+    except Exception as e:
+        st.error(f"Error loading project data: {e}")
 
 
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+EXPLORER_SORT_COLUMNS = ['CLV', 'Win_Rate_%', 'Retention_Rate', 'Churn_Rate', 'Total_Quotations', 'Years_Active',
+                         'Projects_Per_Year']
+PAGE_SIZES = [25, 50, 100, 250]
+
+HIGHLIGHT = 'color: white; font-weight: bold; background-color: '
+SEGMENT_STYLES = {'High': HIGHLIGHT + '#4facfe', 'Medium': HIGHLIGHT + '#43e97b'}
+OTHER_SEGMENT_STYLE = HIGHLIGHT + '#fa709a'
+EXPLORER_FORMATS = {
+    'CLV': 'E£{:,.2f}',
+    'Total_Project_Value': 'E£{:,.2f}',
+    'Revenue_by_Service': 'E£{:,.2f}',
+    'Win_Rate_%': '{:.1f}%', 'Loss_Rate_%': '{:.1f}%',
+    'Retention_Rate': '{:.2f}',
+    'Churn_Rate': '{:.2f}',
+    'Years_Active': '{:.1f}',
+    'Projects_Per_Year': '{:.1f}',
+}
+
+
+def page_styles(page: pd.DataFrame) -> pd.DataFrame:
+    """CSS for every cell of one page, computed with column-wise masks instead of a call per cell."""
+    styles = pd.DataFrame('', index=page.index, columns=page.columns)
+    if 'Customer_Segment' in page.columns:
+        segments = page['Customer_Segment'].to_numpy()
+        styles['Customer_Segment'] = np.select(
+            [segments == 'High', segments == 'Medium'], list(SEGMENT_STYLES.values()), OTHER_SEGMENT_STYLE
+        )
+    if 'Retention_Rate' in page.columns:
+        retention = page['Retention_Rate'].to_numpy(dtype=float)
+        styles['Retention_Rate'] = np.select(
+            [retention >= 0.7, retention >= 0.4], [HIGHLIGHT + '#00ff88', HIGHLIGHT + '#ffaa00'], HIGHLIGHT + '#ff4757'
+        )
+    if 'CLV' in page.columns:
+        styles['CLV'] = np.where(page['CLV'].to_numpy(dtype=float) >= 75000, HIGHLIGHT + '#667eea', '')
+    if 'Win_Rate_%' in page.columns:
+        styles['Win_Rate_%'] = np.where(page['Win_Rate_%'].to_numpy(dtype=float) >= 70, HIGHLIGHT + '#764ba2', '')
+    return styles
+
+
+def style_page(page: pd.DataFrame):
+    formats = {col: fmt for col, fmt in EXPLORER_FORMATS.items() if col in page.columns}
+    return page.style.apply(page_styles, axis=None).format(formats)
+
+
+def page_bounds(total_rows: int, key: str = 'explorer') -> tuple[int, int]:
+    """Page size and page number controls; returns the [start, stop) row range of the visible page."""
+    col1, col2, col3 = st.columns([1, 1, 2])
+    with col1:
+        page_size = st.selectbox("Rows per page:", PAGE_SIZES, index=1, key=f"{key}_page_size")
+    page_count = max(1, -(-total_rows // page_size))
+    with col2:
+        page = st.number_input("Page:", min_value=1, max_value=page_count, value=1, step=1, key=f"{key}_page")
+    start = (int(page) - 1) * page_size
+    stop = min(start + page_size, total_rows)
+    with col3:
+        st.caption(f"Rows {start + 1:,}–{stop:,} of {total_rows:,} (page {int(page)} of {page_count:,})")
+    return start, stop
@@ -0,0 +1,56 @@
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from processing.cache import DEFAULT_DISK_DIR, ResultCache, content_key
+from processing.exports import EXPORT_FORMATS, export_bytes, export_file_name
+
+
+EXPORT_CACHE_MAX_BYTES = int(float(os.environ.get('CRA_EXPORT_CACHE_MB', '256')) * 1024 * 1024)
+FORMAT_LABELS = {'CSV': 'csv', 'CSV (gzip)': 'csv.gz', 'Parquet': 'parquet'}
+FORMAT_NAMES = {fmt: label for label, fmt in FORMAT_LABELS.items()}
+
+
+@st.cache_resource
+def get_export_cache():
+    return ResultCache(max_bytes=EXPORT_CACHE_MAX_BYTES, disk_dir=DEFAULT_DISK_DIR)
+
+
+def frame_fingerprint(df: pd.DataFrame, dataset_fingerprint: str, rows: np.ndarray | None = None) -> str:
+    """
+    Identify a filtered/sorted view of a dataset by its row labels (in order) and columns; with `rows`,
+    the view is df.iloc[rows] and is identified by those positions without gathering it.
+    """
+    labels = np.asarray(df.index) if rows is None else np.asarray(rows, dtype='int64')
+    return content_key(labels.tobytes(), dataset_fingerprint, tuple(df.columns), rows is not None)
+
+
+def export_format_selector(key: str) -> str:
+    label = st.radio("File format:", options=list(FORMAT_LABELS), horizontal=True, key=key)
+    return FORMAT_LABELS[label]
+
+
+def export_download_button(df: pd.DataFrame, label: str, file_stem: str, fmt: str, dataset_fingerprint: str,
+                           key: str | None = None, rows: np.ndarray | None = None):
+    """
+    Download button whose file is only generated when clicked (streamed in chunks) and then kept in the
+    export cache per view fingerprint and format, so reruns never serialize the table.
+    With `rows` (positions, e.g. a filtered sort order), the export is df.iloc[rows], gathered only on click.
+    """
+    cache = get_export_cache()
+    cache_key = content_key(frame_fingerprint(df, dataset_fingerprint, rows).encode(), fmt)
+
+    def build():
+        return export_bytes(df if rows is None else df.iloc[rows], fmt)
+
+    st.download_button(
+        label=f"{label} ({FORMAT_NAMES[fmt]})",
+        data=lambda: cache.get_or_compute(cache_key, build),
+        file_name=export_file_name(f"{file_stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}", fmt),
+        mime=EXPORT_FORMATS[fmt][1],
+        key=key,
+        on_click='ignore',
+    )
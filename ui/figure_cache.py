@@ -0,0 +1,33 @@
+import json
+import os
+
+import streamlit as st
+
+from processing.cache import ResultCache, content_key
+
+
+FIGURE_CACHE_MAX_BYTES = int(float(os.environ.get('CRA_FIGURE_CACHE_MB', '64')) * 1024 * 1024)
+
+
+@st.cache_resource
+def get_figure_cache():
+    # Serialized figure specs only (JSON strings), so the byte budget is exact; never spilled to disk
+    return ResultCache(max_bytes=FIGURE_CACHE_MAX_BYTES, disk_dir=None)
+
+
+def cached_figure(fingerprint: str | None, name: str, inputs, build):
+    """
+    Figure spec for chart `name` of the dataset identified by `fingerprint`, built with `build()` on the
+    first request and served from the figure cache on later reruns with the same `inputs`.
+    Without a fingerprint the figure is built every time.
+    """
+    if fingerprint is None:
+        return build()
+    key = content_key(fingerprint.encode(), name, repr(inputs))
+    spec = get_figure_cache().get_or_compute(key, lambda: build().to_json())
+    return json.loads(spec)
+
+
+def plot_cached(fingerprint: str | None, name: str, inputs, build, **plotly_chart_kwargs):
+    """st.plotly_chart of a cached figure spec (see cached_figure)."""
+    st.plotly_chart(cached_figure(fingerprint, name, inputs, build), **plotly_chart_kwargs)
@@ -0,0 +1,49 @@
+import functools
+import time
+from collections import deque
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+
+SECTION_LOG_KEY = 'section_timings'
+SECTION_LOG_LENGTH = 200
+
+
+def is_fragment_rerun() -> bool:
+    """True while Streamlit re-executes only fragments (a widget inside a section changed)."""
+    ctx = get_script_run_ctx()
+    return bool(ctx is not None and getattr(ctx, 'fragment_ids_this_run', None))
+
+
+def record_section(name: str, seconds: float):
+    log = st.session_state.setdefault(SECTION_LOG_KEY, deque(maxlen=SECTION_LOG_LENGTH))
+    log.append({'section': name, 'seconds': seconds, 'rerun': 'section' if is_fragment_rerun() else 'full'})
+
+
+def section(name: str):
+    """
+    Dashboard section that re-executes on its own: a widget inside it reruns just this function (an
+    st.fragment) instead of the whole script. Every execution is timed into the session's section log.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record_section(name, time.perf_counter() - start)
+        return st.fragment(timed)
+    return decorate
+
+
+def section_timings() -> pd.DataFrame:
+    """Per section and rerun kind: runs, last and median seconds from the session's section log."""
+    log = pd.DataFrame(list(st.session_state.get(SECTION_LOG_KEY, [])), columns=['section', 'rerun', 'seconds'])
+    if log.empty:
+        return pd.DataFrame(columns=['section', 'rerun', 'runs', 'last_seconds', 'median_seconds'])
+    return log.groupby(['section', 'rerun'], sort=False)['seconds'].agg(
+        runs='size', last_seconds='last', median_seconds='median'
+    ).reset_index()
@@ -0,0 +1,76 @@
+import pandas as pd
+import streamlit as st
+
+from processing.cache import estimate_size
+
+
+SESSION_ARTIFACTS_KEY = 'upload_artifacts'
+# Readout order: frames first, so the indexes are charged only for what they add on top of them
+ARTIFACT_LABELS = {
+    'raw': 'Raw quotations',
+    'customers': 'Customer analytics',
+    'companies': 'Company rollup',
+    'index': 'Client/project index',
+    'sort_index': 'Explorer sort index',
+    'search': 'Search index',
+    'navigation': 'Navigation index',
+}
+
+
+def file_identity(uploaded_file) -> tuple:
+    """Identity of an upload: Streamlit assigns a new file_id to every upload, even of the same file."""
+    return getattr(uploaded_file, 'file_id', None), uploaded_file.name, uploaded_file.size
+
+
+def get_session_artifacts(uploaded_file, load) -> dict:
+    """
+    Artifacts of the current upload for this session, computed with `load(uploaded_file)` only when the
+    upload changes. Widget reruns return them straight from session state, without reading or hashing the
+    file; uploading another file replaces (and releases) the previous artifacts.
+    """
+    identity = file_identity(uploaded_file)
+    entry = st.session_state.get(SESSION_ARTIFACTS_KEY)
+    if entry is None or entry['identity'] != identity:
+        st.session_state.pop(SESSION_ARTIFACTS_KEY, None)
+        entry = {'identity': identity, 'artifacts': load(uploaded_file), 'reruns': 0, 'memory': None}
+        st.session_state[SESSION_ARTIFACTS_KEY] = entry
+    else:
+        entry['reruns'] += 1
+    return entry['artifacts']
+
+
+def clear_session_artifacts():
+    st.session_state.pop(SESSION_ARTIFACTS_KEY, None)
+
+
+def artifact_memory(artifacts: dict) -> pd.DataFrame:
+    """Approximate memory per artifact; objects shared between artifacts are counted once, at first use."""
+    seen = {}
+    rows = []
+    for name in ARTIFACT_LABELS:
+        if name not in artifacts or artifacts[name] is None:
+            continue
+        rows.append({'Artifact': ARTIFACT_LABELS[name], 'Type': type(artifacts[name]).__name__,
+                     'MB': estimate_size(artifacts[name], seen) / 1024 / 1024})
+    return pd.DataFrame(rows, columns=['Artifact', 'Type', 'MB'])
+
+
+def display_session_memory(cache_stats: dict | None = None):
+    """Sidebar readout of what this session holds (sizes are measured once per upload)."""
+    entry = st.session_state.get(SESSION_ARTIFACTS_KEY)
+    if entry is None:
+        return
+    with st.sidebar.expander("🧠 Session Memory", expanded=False):
+        if entry['memory'] is None:
+            entry['memory'] = artifact_memory(entry['artifacts'])
+        memory = entry['memory']
+        file_name, size = entry['identity'][1], entry['identity'][2]
+        st.caption(f"{file_name} ({size / 1024 / 1024:.1f} MB upload), reused for {entry['reruns']:,} reruns.")
+        st.dataframe(memory.round({'MB': 1}), hide_index=True, width='stretch')
+        st.write(f"**Session total:** {memory['MB'].sum():,.1f} MB")
+        if cache_stats is not None:
+            st.caption(
+                f"Shared result cache (all sessions): {cache_stats['entries']} uploads, "
+                f"{cache_stats['bytes'] / 1024 / 1024:,.1f} of {cache_stats['max_bytes'] / 1024 / 1024:,.0f} MB. "
+                "Session artifacts reference the cached results rather than copying them."
+            )
@@ -1,37 +1,113 @@
+import numpy as np
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
 
+from ui.chart_data import MAX_SCATTER_POINTS, downsample, histogram_counts, is_large
+from ui.figure_cache import plot_cached
+
+
+SEGMENT_COLORS = ['#4facfe', '#43e97b', '#fa709a']
+
+
+def binned_histogram(df, x: str, nbins: int, title: str, color: str | None = None, colors=SEGMENT_COLORS):
+    """
+    Stacked histogram figure built from counts binned server-side with NumPy,
+    so only bin edges and counts are sent to the browser instead of every row.
+    """
+    import plotly.graph_objects as go
+
+    edges, labels, counts = histogram_counts(df[x], nbins, df[color] if color else None)
+    centers = (edges[:-1] + edges[1:]) / 2
+    fig = go.Figure()
+    for i, label in enumerate(labels):
+        fig.add_trace(go.Bar(
+            x=centers, y=counts[i], width=edges[1:] - edges[:-1], name=str(label) if color else x,
+            marker_color=colors[i % len(colors)], showlegend=color is not None,
+            customdata=np.column_stack([edges[:-1], edges[1:]]),
+            hovertemplate='%{customdata[0]:.4g} – %{customdata[1]:.4g}<br>%{y}<extra>%{fullData.name}</extra>',
+        ))
+    fig.update_layout(title=title, barmode='stack', bargap=0, legend_title_text=color or '')
+    return fig
+
+
+def create_visualizations(df, large_data: bool | None = None, fingerprint: str | None = None):
+    """
+    Dashboard overview charts. In large-data mode (default: more than LARGE_DATA_THRESHOLD customers)
+    histograms are pre-binned and scatters are WebGL traces over a per-segment sample.
+    With the dataset `fingerprint`, figures are served from the figure cache on reruns.
+    """
+    # Plotly is imported on first use so the landing page (no upload, no charts) starts without it
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    if large_data is None:
+        large_data = is_large(df)
+    scatter_data = downsample(df, MAX_SCATTER_POINTS, stratify='Customer_Segment') if large_data else df
+    render_mode = 'webgl' if large_data else 'auto'
+    inputs = (len(df), large_data, len(scatter_data))
 
-def create_visualizations(df):
     col1, col2 = st.columns(2)
 
     with col1:
-        segment_counts = df['Customer_Segment'].value_counts()
-        colors = ['#4facfe', '#43e97b', '#fa709a']
-        fig_pie = px.pie(
-            values=segment_counts.values,
-            names=segment_counts.index,
-            title="🎯 Customer Segment Distribution",
-            color_discrete_sequence=colors,
-        )
-        fig_pie.update_traces(textposition='inside', textinfo='percent+label', textfont_size=16, marker=dict(line=dict(color='#FFFFFF', width=3)))
-        fig_pie.update_layout(title_font_size=18, font=dict(size=14), title_x=0.5, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
-        st.plotly_chart(fig_pie, width='stretch')
+        def build_pie():
+            segment_counts = df['Customer_Segment'].value_counts()
+            colors = SEGMENT_COLORS
+            fig_pie = px.pie(
+                values=segment_counts.values,
+                names=segment_counts.index,
+                title="🎯 Customer Segment Distribution",
+                color_discrete_sequence=colors,
+            )
+            fig_pie.update_traces(textposition='inside', textinfo='percent+label', textfont_size=16, marker=dict(line=dict(color='#FFFFFF', width=3)))
+            fig_pie.update_layout(title_font_size=18, font=dict(size=14), title_x=0.5, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
+            return fig_pie
+
+        plot_cached(fingerprint, 'segment_pie', inputs, build_pie, width='stretch')
 
     with col2:
-        fig_hist = px.histogram(
-            df,
+        def build_hist():
+            if large_data:
+                fig_hist = binned_histogram(df, 'Win_Rate_%', 20, "📈 Win Rate Distribution", color='Customer_Segment')
+            else:
+                fig_hist = px.histogram(
+                    df,
+                    x='Win_Rate_%',
+                    nbins=20,
+                    title="📈 Win Rate Distribution",
+                    color='Customer_Segment',
+                    color_discrete_sequence=SEGMENT_COLORS,
+                )
+            fig_hist.update_layout(
+                xaxis_title="Win Rate (%)",
+                yaxis_title="Number of Customers",
+                title_font_size=18,
+                font=dict(size=14),
+                title_x=0.5,
+                paper_bgcolor='rgba(0,0,0,0)',
+                plot_bgcolor='rgba(0,0,0,0)',
+                xaxis=dict(gridcolor='lightgray'),
+                yaxis=dict(gridcolor='lightgray'),
+            )
+            return fig_hist
+
+        plot_cached(fingerprint, 'win_rate_histogram', inputs, build_hist, width='stretch')
+
+    def build_scatter():
+        fig_scatter = px.scatter(
+            scatter_data,
             x='Win_Rate_%',
-            nbins=20,
-            title="📈 Win Rate Distribution",
+            y='CLV',
+            size='Total_Quotations',
             color='Customer_Segment',
-            color_discrete_sequence=['#4facfe', '#43e97b', '#fa709a'],
+            hover_data=['ClientID', 'Projects_Per_Year', 'Retention_Rate', 'Churn_Rate'],
+            title="💰 Customer Lifetime Value vs Win Rate",
+            color_discrete_sequence=SEGMENT_COLORS,
+            render_mode=render_mode,
         )
-        fig_hist.update_layout(
+        fig_scatter.update_layout(
             xaxis_title="Win Rate (%)",
-            yaxis_title="Number of Customers",
-            title_font_size=18,
+            yaxis_title="Customer Lifetime Value (E£)",
+            height=500,
+            title_font_size=20,
             font=dict(size=14),
             title_x=0.5,
             paper_bgcolor='rgba(0,0,0,0)',
@@ -39,137 +115,138 @@ def create_visualizations(df):
             xaxis=dict(gridcolor='lightgray'),
             yaxis=dict(gridcolor='lightgray'),
         )
-        st.plotly_chart(fig_hist, width='stretch')
-
-    fig_scatter = px.scatter(
-        df,
-        x='Win_Rate_%',
-        y='CLV',
-        size='Total_Quotations',
-        color='Customer_Segment',
-        hover_data=['ClientID', 'Projects_Per_Year', 'Retention_Rate', 'Churn_Rate'],
-        title="💰 Customer Lifetime Value vs Win Rate",
-        color_discrete_sequence=['#4facfe', '#43e97b', '#fa709a'],
-    )
-    fig_scatter.update_layout(
-        xaxis_title="Win Rate (%)",
-        yaxis_title="Customer Lifetime Value (E£)",
-        height=500,
-        title_font_size=20,
-        font=dict(size=14),
-        title_x=0.5,
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        xaxis=dict(gridcolor='lightgray'),
-        yaxis=dict(gridcolor='lightgray'),
-    )
-    fig_scatter.update_traces(marker=dict(line=dict(width=2, color='white'), opacity=0.8))
-    st.plotly_chart(fig_scatter, width='stretch')
+        fig_scatter.update_traces(marker=dict(line=dict(width=2, color='white'), opacity=0.8))
+        return fig_scatter
+
+    plot_cached(fingerprint, 'clv_win_rate_scatter', inputs, build_scatter, width='stretch')
+    if len(scatter_data) < len(df):
+        st.caption(f"Scatter plots show a per-segment sample of {len(scatter_data):,} of {len(df):,} customers.")
 
     col3, col4 = st.columns(2)
 
     with col3:
-        fig_retention = px.histogram(
-            df,
-            x='Retention_Rate',
-            nbins=15,
-            title="🎯 Customer Retention Rate Distribution",
-            color='Customer_Segment',
-            color_discrete_sequence=['#4facfe', '#43e97b', '#fa709a'],
-        )
-        fig_retention.update_layout(
-            xaxis_title="Retention Rate",
-            yaxis_title="Number of Customers",
-            title_font_size=18,
-            font=dict(size=14),
-            title_x=0.5,
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            xaxis=dict(gridcolor='lightgray'),
-            yaxis=dict(gridcolor='lightgray'),
-        )
-        st.plotly_chart(fig_retention, width='stretch')
+        def build_retention():
+            if large_data:
+                fig_retention = binned_histogram(df, 'Retention_Rate', 15, "🎯 Customer Retention Rate Distribution",
+                                                 color='Customer_Segment')
+            else:
+                fig_retention = px.histogram(
+                    df,
+                    x='Retention_Rate',
+                    nbins=15,
+                    title="🎯 Customer Retention Rate Distribution",
+                    color='Customer_Segment',
+                    color_discrete_sequence=SEGMENT_COLORS,
+                )
+            fig_retention.update_layout(
+                xaxis_title="Retention Rate",
+                yaxis_title="Number of Customers",
+                title_font_size=18,
+                font=dict(size=14),
+                title_x=0.5,
+                paper_bgcolor='rgba(0,0,0,0)',
+                plot_bgcolor='rgba(0,0,0,0)',
+                xaxis=dict(gridcolor='lightgray'),
+                yaxis=dict(gridcolor='lightgray'),
+            )
+            return fig_retention
+
+        plot_cached(fingerprint, 'retention_histogram', inputs, build_retention, width='stretch')
 
     with col4:
-        top_services = df['Top_Service_by_Volume'].value_counts().head(10)
-        fig_bar = px.bar(
-            x=top_services.index,
-            y=top_services.values,
-            title="🌟 Most Popular Services",
-            color=top_services.values,
-            color_continuous_scale='Viridis',
-        )
-        fig_bar.update_layout(
-            xaxis_title="Service",
-            yaxis_title="Number of Customers",
-            title_font_size=18,
-            font=dict(size=14),
-            title_x=0.5,
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            xaxis=dict(gridcolor='lightgray'),
-            yaxis=dict(gridcolor='lightgray'),
-        )
-        fig_bar.update_xaxes(tickangle=45)
-        st.plotly_chart(fig_bar, width='stretch')
+        def build_bar():
+            top_services = df['Top_Service_by_Volume'].value_counts().head(10)
+            fig_bar = px.bar(
+                x=top_services.index,
+                y=top_services.values,
+                title="🌟 Most Popular Services",
+                color=top_services.values,
+                color_continuous_scale='Viridis',
+            )
+            fig_bar.update_layout(
+                xaxis_title="Service",
+                yaxis_title="Number of Customers",
+                title_font_size=18,
+                font=dict(size=14),
+                title_x=0.5,
+                paper_bgcolor='rgba(0,0,0,0)',
+                plot_bgcolor='rgba(0,0,0,0)',
+                xaxis=dict(gridcolor='lightgray'),
+                yaxis=dict(gridcolor='lightgray'),
+            )
+            fig_bar.update_xaxes(tickangle=45)
+            return fig_bar
+
+        plot_cached(fingerprint, 'top_services_bar', inputs, build_bar, width='stretch')
 
     st.subheader("📊 Project Analysis")
     col5, col6 = st.columns(2)
 
     with col5:
-        fig_projects = px.histogram(
-            df,
-            x='Total_Quotations',
-            nbins=20,
-            title="📁 Projects per Customer Distribution",
-            color='Customer_Segment',
-            color_discrete_sequence=['#4facfe', '#43e97b', '#fa709a'],
-        )
-        fig_projects.update_layout(
-            xaxis_title="Number of Projects",
-            yaxis_title="Number of Customers",
-            title_font_size=18,
-            font=dict(size=14),
-            title_x=0.5,
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            xaxis=dict(gridcolor='lightgray'),
-            yaxis=dict(gridcolor='lightgray'),
-        )
-        st.plotly_chart(fig_projects, width='stretch')
+        def build_projects():
+            if large_data:
+                fig_projects = binned_histogram(df, 'Total_Quotations', 20, "📁 Projects per Customer Distribution",
+                                                color='Customer_Segment')
+            else:
+                fig_projects = px.histogram(
+                    df,
+                    x='Total_Quotations',
+                    nbins=20,
+                    title="📁 Projects per Customer Distribution",
+                    color='Customer_Segment',
+                    color_discrete_sequence=SEGMENT_COLORS,
+                )
+            fig_projects.update_layout(
+                xaxis_title="Number of Projects",
+                yaxis_title="Number of Customers",
+                title_font_size=18,
+                font=dict(size=14),
+                title_x=0.5,
+                paper_bgcolor='rgba(0,0,0,0)',
+                plot_bgcolor='rgba(0,0,0,0)',
+                xaxis=dict(gridcolor='lightgray'),
+                yaxis=dict(gridcolor='lightgray'),
+            )
+            return fig_projects
+
+        plot_cached(fingerprint, 'projects_histogram', inputs, build_projects, width='stretch')
 
     with col6:
-        fig_conversion = px.scatter(
-            df,
-            x='Total_Quotations',
-            y='Converted_Quotations',
-            color='Customer_Segment',
-            size='CLV',
-            title="🎯 Project Conversion Analysis",
-            color_discrete_sequence=['#4facfe', '#43e97b', '#fa709a'],
-            hover_data=['ClientID', 'Win_Rate_%'],
-        )
-        fig_conversion.update_layout(
-            xaxis_title="Total Quotations",
-            yaxis_title="Converted Projects",
-            title_font_size=18,
-            font=dict(size=14),
-            title_x=0.5,
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            xaxis=dict(gridcolor='lightgray'),
-            yaxis=dict(gridcolor='lightgray'),
-        )
-        fig_conversion.add_trace(
-            go.Scatter(
-                x=[0, df['Total_Quotations'].max()],
-                y=[0, df['Total_Quotations'].max()],
-                mode='lines',
-                line=dict(dash='dash', color='gray'),
-                name='100% Conversion',
-                showlegend=True,
+        def build_conversion():
+            fig_conversion = px.scatter(
+                scatter_data,
+                x='Total_Quotations',
+                y='Converted_Quotations',
+                color='Customer_Segment',
+                size='CLV',
+                title="🎯 Project Conversion Analysis",
+                color_discrete_sequence=SEGMENT_COLORS,
+                hover_data=['ClientID', 'Win_Rate_%'],
+                render_mode=render_mode,
             )
-        )
-        st.plotly_chart(fig_conversion, width='stretch')
+            fig_conversion.update_layout(
+                xaxis_title="Total Quotations",
+                yaxis_title="Converted Projects",
+                title_font_size=18,
+                font=dict(size=14),
+                title_x=0.5,
+                paper_bgcolor='rgba(0,0,0,0)',
+                plot_bgcolor='rgba(0,0,0,0)',
+                xaxis=dict(gridcolor='lightgray'),
+                yaxis=dict(gridcolor='lightgray'),
+            )
+            fig_conversion.add_trace(
+                go.Scatter(
+                    x=[0, df['Total_Quotations'].max()],
+                    y=[0, df['Total_Quotations'].max()],
+                    mode='lines',
+                    line=dict(dash='dash', color='gray'),
+                    name='100% Conversion',
+                    showlegend=True,
+                )
+            )
+            return fig_conversion
+
+        plot_cached(fingerprint, 'conversion_scatter', inputs, build_conversion, width='stretch')
 
 